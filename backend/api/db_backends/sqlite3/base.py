@@ -0,0 +1,17 @@
+"""
+SQLite backend that starts transactions with BEGIN IMMEDIATE
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Transactions take the write lock up front. With a plain BEGIN, a transaction
+    that reads and then writes (the database cache's get-then-set) fails with
+    "database is locked" if another process wrote in between, and the cache
+    silently drops the write. BEGIN IMMEDIATE waits for the lock instead.
+    (Django 5.1+ offers this as OPTIONS['transaction_mode'].)
+    """
+    
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
@@ -0,0 +1,53 @@
+"""
+Train a zstd dictionary on the values currently in the Redis cache.
+Point CACHE_ZSTD_DICT at the output file to compress cache values against it.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from api.utils.cache_compressors import ZstdCompressor, pyzstd
+
+
+class Command(BaseCommand):
+    help = 'Train a zstd dictionary for cached values (see CACHE_ZSTD_DICT)'
+    
+    # Values too small to teach the dictionary anything (locks, flags, IDs)
+    MIN_SAMPLE_SIZE = 64
+    
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Path to write the dictionary to')
+        parser.add_argument('--samples', type=int, default=1000, help='Maximum cached values to train on')
+        parser.add_argument('--size', type=int, default=131072, help='Dictionary size in bytes')
+    
+    def handle(self, *args, **options):
+        if pyzstd is None:
+            raise CommandError('pyzstd is not installed')
+        try:
+            from django_redis import get_redis_connection
+            redis_conn = get_redis_connection('default')
+        except (ImportError, NotImplementedError):
+            raise CommandError('The default cache is not Redis (set REDIS_URL)')
+        
+        # Samples are the serialized values, i.e. what the compressor sees
+        compressor = ZstdCompressor(settings.CACHES['default'].get('OPTIONS', {}))
+        samples = []
+        for key in redis_conn.scan_iter(match=cache.make_key('*'), count=500):
+            if redis_conn.type(key) != b'string':
+                continue
+            value = redis_conn.get(key)
+            if not value or len(value) < self.MIN_SAMPLE_SIZE:
+                continue
+            samples.append(compressor.decompress(value))
+            if len(samples) >= options['samples']:
+                break
+        
+        if not samples:
+            raise CommandError('No cached values to train on - run the app to populate the cache first')
+        
+        zstd_dict = pyzstd.train_dict(samples, options['size'])
+        with open(options['output'], 'wb') as dict_file:
+            dict_file.write(zstd_dict.dict_content)
+        self.stdout.write(
+            f'Wrote {len(zstd_dict.dict_content)} byte dictionary (id {zstd_dict.dict_id}) '
+            f'trained on {len(samples)} cached values to {options["output"]}'
+        )
@@ -3,15 +3,61 @@ Cached YouTube Service Wrapper
 Adds caching, quota management, and rate limiting to YouTube API calls
 """
 from typing import List, Dict, Optional
-from api.services.youtube_service import YouTubeService
+from api.services.youtube_service import YouTubeService, USE_SEARCH_API, _live_sort_key
 from api.utils.api_cache import APICache
 from api.utils.quota_manager import QuotaManager
 from api.utils.rate_limiter import RateLimiter
 from django.conf import settings
+from django.core.cache import cache
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import threading
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Shared executor for stale-while-revalidate background refreshes
+_refresh_executor = None
+_refresh_lock = threading.Lock()
+_refreshing = set()
+
+# Quota bucket charged by the API call running on this thread, so refunds made
+# while it runs (_refund_unused_quota) go back to that bucket
+_current_charge = threading.local()
+
+
+def _get_refresh_executor():
+    """Lazily create the background refresh executor"""
+    global _refresh_executor
+    with _refresh_lock:
+        if _refresh_executor is None:
+            _refresh_executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'CACHE_REFRESH_WORKERS', 4),
+                thread_name_prefix='yt-cache-refresh'
+            )
+    return _refresh_executor
+
+
+# Straight-line updaters for the fields refreshed from real-time stats
+def _apply_trending_fields(dst, src):
+    """Copy refreshed trending stats from src into dst in place"""
+    dst['view_count'] = src.get('view_count', 0)
+    dst['like_count'] = src.get('like_count', 0)
+    dst['comment_count'] = src.get('comment_count', 0)
+    dst['trending_score'] = src.get('trending_score', 0)
+    dst['hours_since_publish'] = src.get('hours_since_publish', 0)
+
+
+def _apply_live_fields(dst, src):
+    """Copy refreshed live stats from src into dst in place"""
+    dst['view_count'] = src.get('view_count', 0)
+    dst['live_viewers'] = src.get('live_viewers')
+    dst['is_live'] = src.get('is_live', False)
+    dst['like_count'] = src.get('like_count', 0)
+    dst['comment_count'] = src.get('comment_count', 0)
+
+
 class CachedYouTubeService:
     """
     Wrapper around YouTubeService that adds:
@@ -28,8 +74,21 @@ class CachedYouTubeService:
         'search.list': 100,  # Very expensive!
     }
     
+    # videos.list accepts up to 50 IDs per call
+    VIDEOS_PER_BATCH = 50
+    VIDEO_STATS_KEY_PREFIX = 'youtube_api:vidstat'
+    # Channels analyzed at once by fetch_channels_videos
+    MAX_CONCURRENT_CHANNELS = 10
+    # Single-flight on cache misses: one worker fetches a key while the others wait
+    # (up to FILL_LOCK_WAIT seconds) for it to land in the cache
+    FILL_LOCK_TIMEOUT = 30
+    FILL_LOCK_WAIT = 25
+    FILL_POLL_INTERVAL = 0.2
+    
     def __init__(self):
         self.youtube_service = YouTubeService()
+        # Lookups the service makes by itself (video links -> channel) go through the quota
+        self.youtube_service.metered_call = self._call_api
         self.quota_manager = QuotaManager(
             daily_limit=settings.YOUTUBE_QUOTA_LIMIT,
             warning_threshold=settings.YOUTUBE_QUOTA_WARNING_THRESHOLD
@@ -39,80 +98,168 @@ class CachedYouTubeService:
             max_per_minute=settings.YOUTUBE_API_RATE_LIMIT['max_requests_per_minute']
         )
     
-    def _make_api_call(self, endpoint, params, func, quota_cost, bypass_cache=True):
+    def _make_api_call(self, endpoint, params, func, quota_cost, bypass_cache=False):
         """
         Make an API call with caching, quota checking, and rate limiting.
         
+        Uses stale-while-revalidate: fresh cache entries are returned immediately,
+        stale entries are returned immediately while a background refresh runs,
+        and only a true miss blocks on the API call.
+        
         Args:
             endpoint: Cache endpoint identifier
             params: Parameters for cache key generation
             func: Function to call if cache miss
             quota_cost: Quota units this call will consume
-            bypass_cache: If True, skip cache check and always make API call (DEFAULT: True - CACHE DISABLED FOR DEBUGGING)
+            bypass_cache: If True, skip cache check and always make API call
         """
-        # TEMPORARILY DISABLE CACHE FOR DEBUGGING
+        # Key is built once and reused for the lookup, the refresh and the write
+        cache_key = APICache._generate_cache_key(endpoint, params)
+        
         # Check cache first (unless bypassed)
-        if False and not bypass_cache:  # Force bypass - cache disabled
-            cached_data, is_cached = APICache.get(endpoint, params)
-            if is_cached:
+        if not bypass_cache:
+            cached_data, _ = APICache.get(endpoint, params, cache_key=cache_key)
+            return self._serve_cached(endpoint, cache_key, cached_data, func, quota_cost)
+        
+        return self._fetch_and_cache(endpoint, cache_key, func, quota_cost)
+    
+    def _serve_cached(self, endpoint, cache_key, cached_data, func, quota_cost):
+        """Serve an already looked-up cache entry (fresh, stale or missing)"""
+        if cached_data:
+            if APICache.is_fresh(cached_data):
                 logger.info(f"Cache HIT for {endpoint}, saving {quota_cost} quota units")
-                return cached_data['data']
-            logger.info(f"Cache miss for {endpoint} - making API call")
-        else:
-            logger.warning(f"⚠️ CACHE DISABLED - Fetching fresh data for {endpoint}")
+            else:
+                logger.info(f"Cache STALE for {endpoint} - serving cached data and refreshing in background")
+                self._schedule_refresh(endpoint, cache_key, func, quota_cost)
+            return cached_data['data']
+        logger.info(f"Cache miss for {endpoint} - making API call")
+        
+        return self._fetch_single_flight(endpoint, cache_key, func, quota_cost)
+    
+    def _fetch_single_flight(self, endpoint, cache_key, func, quota_cost):
+        """
+        Fetch a missing entry, letting only one worker at a time make the API call for it.
+        Others wait for that result to be cached; if it does not show up in time they fetch it themselves.
+        """
+        lock_key = f'{cache_key}:lock'
+        locked = cache.add(lock_key, 1, timeout=self.FILL_LOCK_TIMEOUT)
+        if locked is None:
+            # Cache unreachable (error ignored by django-redis) - nothing to wait on
+            return self._fetch_and_cache(endpoint, cache_key, func, quota_cost)
+        if not locked:
+            logger.info(f"Another worker is fetching {endpoint} - waiting for its result")
+            deadline = time.monotonic() + self.FILL_LOCK_WAIT
+            while time.monotonic() < deadline:
+                time.sleep(self.FILL_POLL_INTERVAL)
+                cached_data, is_cached = APICache.get(endpoint, None, cache_key=cache_key)
+                if is_cached:
+                    return cached_data['data']
+            return self._fetch_and_cache(endpoint, cache_key, func, quota_cost)
+        
+        try:
+            return self._fetch_and_cache(endpoint, cache_key, func, quota_cost)
+        finally:
+            cache.delete(lock_key)
+    
+    def _schedule_refresh(self, endpoint, cache_key, func, quota_cost):
+        """Refresh a stale cache entry in the background (one refresh per key at a time)"""
+        with _refresh_lock:
+            if cache_key in _refreshing:
+                return
+            _refreshing.add(cache_key)
+        
+        def _refresh():
+            try:
+                self._fetch_and_cache(endpoint, cache_key, func, quota_cost)
+            except Exception as e:
+                logger.warning(f"Background refresh failed for {endpoint}: {e}")
+            finally:
+                with _refresh_lock:
+                    _refreshing.discard(cache_key)
         
-        # Check quota before making request
-        if not self.quota_manager.can_make_request(quota_cost):
+        _get_refresh_executor().submit(_refresh)
+    
+    def _fetch_and_cache(self, endpoint, cache_key, func, quota_cost):
+        """Make the API call and cache the result"""
+        result = self._call_api(endpoint, func, quota_cost)
+        
+        # Cache the result (channel results with live streams go stale sooner)
+        ttl = None
+        if endpoint == 'channel_videos' and result and result.get('live_videos'):
+            ttl = APICache._get_ttl('channel_videos_live')
+        APICache.set(endpoint, None, result, ttl=ttl, cache_key=cache_key)
+        
+        return result
+    
+    def _call_api(self, endpoint, func, quota_cost):
+        """Make the API call with quota checking and rate limiting (no caching)"""
+        # Quota check, rate limiting and quota charge happen in one atomic step
+        # (tokens scale with quota cost so expensive calls throttle proportionally)
+        charged_field = self.rate_limiter.acquire(self.quota_manager, quota_cost)
+        if charged_field is None:
             quota_status = self.quota_manager.get_quota_status()
             raise ValueError(
                 f"API quota exceeded. Used: {quota_status['used']}/{quota_status['limit']} "
                 f"({quota_status['percentage']:.1f}%). Please try again later or request quota increase."
             )
         
-        # Rate limiting
-        self.rate_limiter.wait_if_needed()
-        
         # Make the API call
+        outer_field = getattr(_current_charge, 'field', None)
+        _current_charge.field = charged_field
         try:
             logger.info(f"Making API call to {endpoint} (cost: {quota_cost} units)")
-            result = func()
-            
-            # Consume quota
-            if not self.quota_manager.consume_quota(quota_cost):
-                logger.warning(f"Quota exceeded after API call - this shouldn't happen!")
-            
-            # TEMPORARILY DISABLE CACHING FOR DEBUGGING
-            # Cache the result
-            # APICache.set(endpoint, params, result)  # DISABLED
-            logger.warning(f"⚠️ CACHE SET DISABLED - result not cached for {endpoint}")
-            
-            # Record rate limit
-            self.rate_limiter.record_request()
-            
-            return result
-            
+            return func()
+        
         except Exception as e:
-            # Don't consume quota on errors (unless it's a quota error)
             error_str = str(e)
             if 'quota' in error_str.lower() or 'quotaExceeded' in error_str:
                 # Mark quota as exceeded
                 logger.error(f"Quota error from API: {e}")
+            else:
+                # Don't consume quota on errors (unless it's a quota error)
+                self.quota_manager.release_quota(quota_cost, charged_field)
             raise
+        finally:
+            _current_charge.field = outer_field
+    
+    def _pages(self, item_count):
+        """Number of list pages (at least one) needed for item_count results"""
+        return max(1, -(-item_count // 50))
+    
+    def _refund_unused_quota(self, reserved, used):
+        """Give back quota reserved for pages the API never returned"""
+        if used < reserved:
+            self.quota_manager.release_quota(reserved - used, getattr(_current_charge, 'field', None))
+            logger.debug(f"Refunded {reserved - used} of {reserved} reserved quota units")
     
     def extract_channel_id(self, channel_url: str) -> Optional[str]:
         """Extract channel ID - no caching needed (fast operation)"""
         return self.youtube_service.extract_channel_id(channel_url)
     
+    @staticmethod
+    def _channel_info_params(channel_id):
+        """Cache key params for channel info"""
+        return {'channel_id': channel_id, 'type': 'full_info'}
+    
+    @staticmethod
+    def _channel_videos_params(channel_id, max_videos, max_shorts):
+        """Cache key params for a whole channel result"""
+        return {
+            'channel_id': channel_id,
+            'max_videos': max_videos,
+            'max_shorts': max_shorts,
+            'version': '2.1'  # Version bump to invalidate old cache that might have no videos
+        }
+    
     def get_channel_info(self, channel_id: str) -> Optional[Dict]:
         """Get channel information with caching"""
         endpoint = 'channel_info'
-        params = {'channel_id': channel_id, 'type': 'full_info'}
+        params = self._channel_info_params(channel_id)
         
         def _fetch():
             return self.youtube_service.get_channel_info(channel_id)
         
-        # TEMPORARILY DISABLE CACHE FOR DEBUGGING
-        return self._make_api_call(endpoint, params, _fetch, self.QUOTA_COSTS['channels.list'], bypass_cache=True)
+        return self._make_api_call(endpoint, params, _fetch, self.QUOTA_COSTS['channels.list'])
     
     def get_uploads_playlist_id(self, channel_id: str) -> Optional[str]:
         """Get uploads playlist ID with caching (legacy method for compatibility)"""
@@ -126,47 +273,150 @@ class CachedYouTubeService:
         endpoint = 'playlist_items'
         params = {'playlist_id': playlist_id, 'max_results': max_results}
         
+        # Estimate quota cost (1 unit per 50 items fetched)
+        estimated_cost = max(1, (max_results // 50) + 1) * self.QUOTA_COSTS['playlistItems.list']
+        
         def _fetch():
-            return self.youtube_service.get_last_n_videos(playlist_id, max_results)
+            video_ids = self.youtube_service.get_last_n_videos(playlist_id, max_results)
+            # Short playlists need fewer pages than reserved
+            self._refund_unused_quota(estimated_cost, self._pages(len(video_ids)) * self.QUOTA_COSTS['playlistItems.list'])
+            return video_ids
         
-        # Estimate quota cost (1 unit per 50 items fetched)
-        estimated_cost = max(1, (max_results // 50) + 1)
-        # TEMPORARILY DISABLE CACHE FOR DEBUGGING
-        return self._make_api_call(endpoint, params, _fetch, estimated_cost * self.QUOTA_COSTS['playlistItems.list'], bypass_cache=True)
+        return self._make_api_call(endpoint, params, _fetch, estimated_cost)
     
-    def get_video_statistics(self, video_ids: List[str], bypass_cache=True) -> List[Dict]:
-        """Get video statistics with caching"""
-        # Sort video IDs for consistent cache key
-        sorted_ids = sorted(video_ids)
-        endpoint = 'video_statistics'
-        params = {'video_ids': sorted_ids}
+    def get_video_statistics(self, video_ids: List[str], real_time=False) -> List[Dict]:
+        """
+        Get video statistics with per-video caching.
+        Only IDs missing from the cache (or older than the real-time TTL) hit the API,
+        in batches of up to 50 IDs per videos.list call.
+        """
+        if not video_ids:
+            return []
         
-        def _fetch():
-            return self.youtube_service.get_video_statistics(video_ids)
+        max_age = APICache._get_ttl('video_statistics_realtime' if real_time else 'video_statistics')
+        # Dict keeps caller order while dropping duplicate IDs
+        keys = {video_id: f'{self.VIDEO_STATS_KEY_PREFIX}:{video_id}' for video_id in video_ids}
+        cached = cache.get_many(list(keys.values()))
         
-        # Calculate quota cost (1 unit per batch of 50)
-        batch_count = (len(video_ids) + 49) // 50
-        quota_cost = batch_count * self.QUOTA_COSTS['videos.list']
+        now = time.time()
+        stats_by_id = {}
+        for video_id, key in keys.items():
+            entry = cached.get(key)
+            if entry and now - entry['fetched_at'] < max_age:
+                stats_by_id[video_id] = entry['data']
+        
+        missing = [video_id for video_id in keys if video_id not in stats_by_id]
+        logger.info(f"Video statistics: {len(stats_by_id)} cached, {len(missing)} to fetch")
+        
+        if missing:
+            fresh_entries = {}
+            for i in range(0, len(missing), self.VIDEOS_PER_BATCH):
+                batch = missing[i:i + self.VIDEOS_PER_BATCH]
+                videos = self._call_api(
+                    'video_statistics',
+                    lambda batch=batch: self.youtube_service.get_video_statistics(batch),
+                    self.QUOTA_COSTS['videos.list']
+                )
+                fetched_at = time.time()
+                for video in videos:
+                    stats_by_id[video['video_id']] = video
+                    fresh_entries[keys[video['video_id']]] = {'data': video, 'fetched_at': fetched_at}
+            
+            if fresh_entries:
+                cache.set_many(fresh_entries, timeout=APICache._get_ttl('video_statistics'))
         
-        return self._make_api_call(endpoint, params, _fetch, quota_cost, bypass_cache=bypass_cache)
+        return [stats_by_id[video_id] for video_id in keys if video_id in stats_by_id]
     
     def fetch_channel_videos_by_popularity(self, channel_id: str, max_results: int = 50) -> List[Dict]:
         """Fetch videos by popularity with caching"""
         endpoint = 'channel_videos_by_popularity'
         params = {'channel_id': channel_id, 'max_results': max_results}
         
-        def _fetch():
-            return self.youtube_service.fetch_channel_videos_by_popularity(channel_id, max_results)
+        if USE_SEARCH_API:
+            # Search API is expensive - reserve the worst case, refund unused pages after the call
+            estimated_cost = max(self.QUOTA_COSTS['search.list'], (max_results // 50) * self.QUOTA_COSTS['search.list'])
+            
+            def _used_cost(videos):
+                return self._pages(len(videos)) * self.QUOTA_COSTS['search.list']
+        else:
+            # Uploads are ranked instead: one channels.list, then playlistItems.list and
+            # videos.list pages for every candidate
+            page_cost = self.QUOTA_COSTS['playlistItems.list'] + self.QUOTA_COSTS['videos.list']
+            candidates = max_results * YouTubeService.POPULARITY_CANDIDATE_FACTOR
+            estimated_cost = self.QUOTA_COSTS['channels.list'] + self._pages(candidates) * page_cost
+            
+            def _used_cost(videos):
+                # A short result means the whole uploads playlist was ranked
+                if len(videos) < max_results:
+                    return self.QUOTA_COSTS['channels.list'] + self._pages(len(videos)) * page_cost
+                return estimated_cost
         
-        # Search API is expensive - estimate cost
-        estimated_cost = max(self.QUOTA_COSTS['search.list'], (max_results // 50) * self.QUOTA_COSTS['search.list'])
+        def _fetch():
+            videos = self.youtube_service.fetch_channel_videos_by_popularity(channel_id, max_results)
+            self._refund_unused_quota(estimated_cost, _used_cost(videos))
+            return videos
         
         return self._make_api_call(endpoint, params, _fetch, estimated_cost)
     
-    def fetch_channel_videos(self, channel_url: str, max_videos: int = 5, max_shorts: int = 5, real_time_trending=False, real_time_live=False) -> Dict:
+    def prefetch_channel_videos(self, channel_urls: List[str], max_videos: int = 5, max_shorts: int = 5) -> Dict:
+        """
+        Read the cached results and channel info for several channels in one cache
+        round-trip. Pass the returned dict to fetch_channel_videos as `prefetched`.
+        URLs whose channel ID cannot be resolved are skipped (fetch_channel_videos reports them).
+        """
+        requests = []
+        for channel_url in channel_urls:
+            try:
+                channel_id = self.extract_channel_id(channel_url)
+            except Exception:
+                channel_id = None
+            if channel_id:
+                requests.append(('channel_videos', self._channel_videos_params(channel_id, max_videos, max_shorts)))
+                requests.append(('channel_info', self._channel_info_params(channel_id)))
+        if not requests:
+            return {}
+        
+        return {
+            APICache._generate_cache_key(endpoint, params): data
+            for (endpoint, params), (data, _) in zip(requests, APICache.get_many(requests))
+        }
+    
+    def fetch_channels_videos(self, channel_urls: List[str], max_videos: int = 5, max_shorts: int = 5, real_time_trending=False, real_time_live=False) -> List:
+        """
+        Analyze several channels concurrently (at most MAX_CONCURRENT_CHANNELS at a time).
+        Cached results for all of them are read up front in one cache round-trip.
+        Returns one entry per input, in order: the channel result, or the exception it raised.
+        """
+        try:
+            prefetched = self.prefetch_channel_videos(channel_urls, max_videos=max_videos, max_shorts=max_shorts)
+        except Exception:
+            prefetched = None
+        
+        def _fetch_one(channel_url):
+            try:
+                return self.fetch_channel_videos(
+                    channel_url,
+                    max_videos=max_videos,
+                    max_shorts=max_shorts,
+                    real_time_trending=real_time_trending,
+                    real_time_live=real_time_live,
+                    prefetched=prefetched
+                )
+            except Exception as e:
+                return e
+        
+        if len(channel_urls) <= 1:
+            return [_fetch_one(channel_url) for channel_url in channel_urls]
+        with ThreadPoolExecutor(max_workers=min(self.MAX_CONCURRENT_CHANNELS, len(channel_urls))) as executor:
+            return list(executor.map(_fetch_one, channel_urls))
+    
+    def fetch_channel_videos(self, channel_url: str, max_videos: int = 5, max_shorts: int = 5, real_time_trending=False, real_time_live=False, include_quota_status: bool = False, prefetched: Optional[Dict] = None) -> Dict:
         """
         Main method: Fetch channel videos with caching.
         This method is cached as a whole to avoid redundant calls.
+        Quota status is only attached when `include_quota_status` is set;
+        callers otherwise use get_quota_status() once per response.
+        `prefetched` is the result of prefetch_channel_videos() for a batch of channels.
         """
         # Extract channel ID first (cached internally if needed)
         channel_id = self.extract_channel_id(channel_url)
@@ -175,12 +425,7 @@ class CachedYouTubeService:
         
         # Cache the entire result
         endpoint = 'channel_videos'
-        params = {
-            'channel_id': channel_id,
-            'max_videos': max_videos,
-            'max_shorts': max_shorts,
-            'version': '2.1'  # Version bump to invalidate old cache that might have no videos
-        }
+        params = self._channel_videos_params(channel_id, max_videos, max_shorts)
         
         def _fetch():
             # Use the underlying service methods but through our cached wrapper
@@ -194,202 +439,137 @@ class CachedYouTubeService:
             5 * self.QUOTA_COSTS['videos.list']  # Get video stats
         )
         
-        # TEMPORARILY DISABLE CACHE FOR DEBUGGING - fetch fresh every time
-        logger.warning(f"⚠️ CACHE DISABLED - Fetching fresh data for channel {channel_id}")
-        result = _fetch()  # Always fetch fresh, no cache
-        
-        # Ensure live videos are sorted by view count (highest first)
-        # IMPORTANT: Sort by MOST VIEWS, not publish date
-        # Prioritize concurrent viewers, then total view count
-        if result and result.get('live_videos') and len(result.get('live_videos', [])) > 0:
-            logger.info(f"Sorting {len(result['live_videos'])} live videos by view count (NOT by publish date)")
-            # Log before sorting
-            for idx, live in enumerate(result['live_videos']):
-                logger.info(f"  Live {idx} BEFORE SORT: '{live.get('title', 'Unknown')[:40]}' - viewers: {live.get('live_viewers')} (type: {type(live.get('live_viewers'))}), views: {live.get('view_count')} (type: {type(live.get('view_count'))})")
-            
-            def get_sort_key(video):
-                live_viewers = video.get('live_viewers')
-                view_count = video.get('view_count', 0)
-                
-                # Convert live_viewers to int
-                if live_viewers is None:
-                    viewers_int = 0
-                elif isinstance(live_viewers, str):
-                    viewers_int = int(live_viewers) if live_viewers.isdigit() else 0
-                else:
-                    viewers_int = int(live_viewers)
-                
-                # Convert view_count to int
-                if view_count is None:
-                    views_int = 0
-                elif isinstance(view_count, str):
-                    views_int = int(view_count) if view_count.isdigit() else 0
-                else:
-                    views_int = int(view_count)
-                
-                return (viewers_int, views_int)
-            
-            result['live_videos'] = sorted(result['live_videos'], key=get_sort_key, reverse=True)
-            
-            # Log after sorting
-            for idx, live in enumerate(result['live_videos']):
-                logger.info(f"  Live {idx} AFTER SORT: '{live.get('title', 'Unknown')[:40]}' - viewers: {live.get('live_viewers')}, views: {live.get('view_count')}")
-            
-            # Only keep the top live video (one with most viewers)
-            if len(result['live_videos']) > 1:
-                logger.info(f"⚠️ Found {len(result['live_videos'])} live videos - keeping only the one with most viewers")
-                result['live_videos'] = [result['live_videos'][0]]  # Keep only the first (highest viewers)
-                result['total_live'] = 1  # Update count
-                logger.info(f"✓ Selected top live video: '{result['live_videos'][0].get('title', 'Unknown')[:40]}' with {result['live_videos'][0].get('live_viewers')} concurrent viewers, {result['live_videos'][0].get('view_count')} total views")
-            else:
-                logger.info(f"✓ Live video: '{result['live_videos'][0].get('title', 'Unknown')[:40]}' with {result['live_videos'][0].get('live_viewers')} concurrent viewers, {result['live_videos'][0].get('view_count')} total views")
+        # Both entries this method may need are read in a single get_many (one MGET on Redis),
+        # unless the caller already read them for a whole batch of channels
+        channel_videos_key = APICache._generate_cache_key(endpoint, params)
+        channel_info_key = APICache._generate_cache_key('channel_info', self._channel_info_params(channel_id))
+        if prefetched is not None and channel_videos_key in prefetched:
+            cached = prefetched
+        else:
+            cached = cache.get_many([channel_videos_key, channel_info_key])
+        
+        result = self._serve_cached(endpoint, channel_videos_key, cached.get(channel_videos_key), _fetch, estimated_cost)
         
         # Ensure statistics are always included (in case cache didn't have them)
         if result and 'subscriber_count' not in result:
-            # If stats are missing, fetch channel info fresh
-            try:
-                channel_info = self.get_channel_info(channel_id)
-                if channel_info:
-                    result['subscriber_count'] = channel_info.get('subscriber_count', 0)
-                    result['view_count'] = channel_info.get('view_count', 0)
-                    result['video_count'] = channel_info.get('video_count', 0)
-            except:
-                # If we can't fetch, set defaults
-                result['subscriber_count'] = 0
-                result['view_count'] = 0
-                result['video_count'] = 0
+            # If stats are missing, use cached channel info; otherwise return zeros now
+            # and warm the channel info cache in the background for the next request
+            cached_info = cached.get(channel_info_key)
+            channel_info = (cached_info['data'] if cached_info else None) or {}
+            result['subscriber_count'] = channel_info.get('subscriber_count', 0)
+            result['view_count'] = channel_info.get('view_count', 0)
+            result['video_count'] = channel_info.get('video_count', 0)
+            if not cached_info:
+                _get_refresh_executor().submit(self._warm_channel_info, channel_id)
         
         # If real-time trending or live requested, fetch fresh data for those
         if real_time_trending or real_time_live:
             logger.info("Fetching real-time trending/live data (bypassing cache)")
             # Collect all video IDs from result (including trending videos and shorts)
+            # in first-seen order; the set keeps the dedup O(1) per ID
+            seen = set()
             all_video_ids = []
-            for video in result.get('videos', []):
-                all_video_ids.append(video.get('video_id'))
-            for video in result.get('shorts', []):
-                all_video_ids.append(video.get('video_id'))
-            # Also include trending videos and shorts for real-time updates
-            for video in result.get('trending_videos', []):
-                vid_id = video.get('video_id')
-                if vid_id and vid_id not in all_video_ids:
-                    all_video_ids.append(vid_id)
-            for video in result.get('trending_shorts', []):
-                vid_id = video.get('video_id')
-                if vid_id and vid_id not in all_video_ids:
-                    all_video_ids.append(vid_id)
+            for key in ('videos', 'shorts', 'trending_videos', 'trending_shorts'):
+                for video in result.get(key, []):
+                    vid_id = video.get('video_id')
+                    if vid_id and vid_id not in seen:
+                        seen.add(vid_id)
+                        all_video_ids.append(vid_id)
             
             if all_video_ids:
-                # Fetch fresh stats (bypass cache for real-time)
-                fresh_stats = self.get_video_statistics(all_video_ids, bypass_cache=True)
+                # Fetch fresh stats (only IDs older than the real-time TTL hit the API)
+                fresh_stats = self.get_video_statistics(all_video_ids, real_time=True)
                 # Create lookup dict
                 fresh_stats_dict = {v['video_id']: v for v in fresh_stats}
                 
                 # Update trending videos with fresh data
                 if real_time_trending:
-                    # Update trending videos
-                    if result.get('trending_videos'):
-                        for trending in result['trending_videos']:
-                            vid_id = trending.get('video_id')
-                            if vid_id in fresh_stats_dict:
-                                fresh_data = fresh_stats_dict[vid_id]
-                                # Update with real-time stats
-                                trending.update({
-                                    'view_count': fresh_data['view_count'],
-                                    'like_count': fresh_data['like_count'],
-                                    'comment_count': fresh_data['comment_count'],
-                                    'trending_score': fresh_data.get('trending_score', 0),
-                                    'hours_since_publish': fresh_data.get('hours_since_publish', 0),
-                                })
-                    
-                    # Update trending shorts
-                    if result.get('trending_shorts'):
-                        for trending in result['trending_shorts']:
-                            vid_id = trending.get('video_id')
-                            if vid_id in fresh_stats_dict:
-                                fresh_data = fresh_stats_dict[vid_id]
-                                # Update with real-time stats
-                                trending.update({
-                                    'view_count': fresh_data['view_count'],
-                                    'like_count': fresh_data['like_count'],
-                                    'comment_count': fresh_data['comment_count'],
-                                    'trending_score': fresh_data.get('trending_score', 0),
-                                    'hours_since_publish': fresh_data.get('hours_since_publish', 0),
-                                })
+                    # Update trending videos and shorts
+                    for key in ('trending_videos', 'trending_shorts'):
+                        self._apply_trending_stats(result.get(key, []), fresh_stats_dict)
                 
                 # Update live videos with fresh data
                 if real_time_live and result.get('live_videos'):
+                    ended = set()
                     for live in result['live_videos']:
                         vid_id = live.get('video_id')
                         if vid_id in fresh_stats_dict:
                             fresh_data = fresh_stats_dict[vid_id]
                             # Update with real-time stats
-                            live.update({
-                                'view_count': fresh_data['view_count'],
-                                'live_viewers': fresh_data.get('live_viewers'),
-                                'is_live': fresh_data.get('is_live', False),
-                                'like_count': fresh_data['like_count'],
-                                'comment_count': fresh_data['comment_count'],
-                            })
+                            _apply_live_fields(live, fresh_data)
                             # Also check if video is still live
                             if not fresh_data.get('is_live', False):
-                                # Remove from live list if no longer live
-                                result['live_videos'] = [v for v in result['live_videos'] if v.get('video_id') != vid_id]
-                                result['total_live'] = len(result['live_videos'])
+                                ended.add(vid_id)
                     
-                    # Re-sort live videos by view count after updating stats
-                    # IMPORTANT: Live videos sorted by MOST VIEWS, not publish date
-                    # Prioritize concurrent viewers, then total view count (highest first)
-                    if result.get('live_videos'):
-                        def get_live_sort_key(video):
-                            live_viewers = video.get('live_viewers')
-                            view_count = video.get('view_count', 0)
-                            
-                            # Convert to int for proper comparison
-                            if live_viewers is None:
-                                viewers_int = 0
-                            elif isinstance(live_viewers, str):
-                                viewers_int = int(live_viewers) if live_viewers.isdigit() else 0
-                            else:
-                                viewers_int = int(live_viewers)
-                            
-                            if view_count is None:
-                                views_int = 0
-                            elif isinstance(view_count, str):
-                                views_int = int(view_count) if view_count.isdigit() else 0
-                            else:
-                                views_int = int(view_count)
-                            
-                            return (viewers_int, views_int)
-                        
-                        result['live_videos'] = sorted(result['live_videos'], key=get_live_sort_key, reverse=True)
-                        # Only keep the top live video (one with most viewers)
-                        if len(result['live_videos']) > 1:
-                            logger.info(f"⚠️ Found {len(result['live_videos'])} live videos after update - keeping only the one with most viewers")
-                            result['live_videos'] = [result['live_videos'][0]]  # Keep only the first (highest viewers)
-                            result['total_live'] = 1  # Update count
-                        if result.get('live_videos'):
-                            logger.info(f"Top live video: {result['live_videos'][0].get('title', 'Unknown')[:40]} ({result['live_videos'][0].get('live_viewers')} viewers, {result['live_videos'][0].get('view_count')} views)")
-        
-        # Add quota status to result
-        quota_status = self.quota_manager.get_quota_status()
-        result['quota_status'] = quota_status
+                    # Remove ended streams in one pass after the loop
+                    if ended:
+                        result['live_videos'] = [v for v in result['live_videos'] if v.get('video_id') not in ended]
+                        result['total_live'] = len(result['live_videos'])
+        
+        # Keep only the top live video, ranked once after any real-time update
+        # IMPORTANT: Rank by MOST VIEWS, not publish date
+        if result and result.get('live_videos'):
+            live_count = len(result['live_videos'])
+            top_live = self._select_top_live(result['live_videos'])
+            result['live_videos'] = [top_live]
+            result['total_live'] = 1
+            logger.info("✓ Top live video (of %d): '%s' with %s concurrent viewers, %s total views",
+                        live_count, top_live.get('title', 'Unknown')[:40], top_live.get('live_viewers'), top_live.get('view_count'))
+        
+        # Add quota status to result (one extra cache read, so only on request)
+        if include_quota_status:
+            result['quota_status'] = self.quota_manager.get_quota_status()
         
         # Final debug logging
-        logger.info(f"📤 Returning result for channel {channel_id}:")
-        logger.info(f"   Videos: {len(result.get('videos', []))}")
-        logger.info(f"   Shorts: {len(result.get('shorts', []))}")
-        logger.info(f"   Trending videos: {len(result.get('trending_videos', []))}")
-        logger.info(f"   Trending shorts: {len(result.get('trending_shorts', []))}")
-        logger.info(f"   🔴 LIVE VIDEOS: {len(result.get('live_videos', []))}")
-        if result.get('live_videos'):
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("📤 Returning result for channel %s:", channel_id)
+            logger.info("   Videos: %d", len(result.get('videos', [])))
+            logger.info("   Shorts: %d", len(result.get('shorts', [])))
+            logger.info("   Trending videos: %d", len(result.get('trending_videos', [])))
+            logger.info("   Trending shorts: %d", len(result.get('trending_shorts', [])))
+            logger.info("   🔴 LIVE VIDEOS: %d", len(result.get('live_videos', [])))
             for idx, live in enumerate(result.get('live_videos', [])):
-                logger.info(f"      Live {idx+1}: '{live.get('title', 'Unknown')[:50]}' - viewers: {live.get('live_viewers')}, views: {live.get('view_count')}")
-        else:
-            logger.warning(f"   ⚠️ NO LIVE VIDEOS IN RESULT (channel: {channel_id})")
+                logger.info("      Live %d: '%s' - viewers: %s, views: %s",
+                            idx + 1, live.get('title', 'Unknown')[:50], live.get('live_viewers'), live.get('view_count'))
+        if not result.get('live_videos'):
+            logger.warning("   ⚠️ NO LIVE VIDEOS IN RESULT (channel: %s)", channel_id)
         
         return result
     
-    def get_quota_status(self):
-        """Get current quota status"""
-        return self.quota_manager.get_quota_status()
+    def _warm_channel_info(self, channel_id):
+        """Populate the channel info cache off the request path"""
+        try:
+            self.get_channel_info(channel_id)
+        except Exception as e:
+            logger.warning(f"Background channel info fetch failed for {channel_id}: {e}")
+    
+    @staticmethod
+    def _select_top_live(live_videos):
+        """Pick the live video with most concurrent viewers, then most views"""
+        if logger.isEnabledFor(logging.DEBUG):
+            for idx, live in enumerate(live_videos):
+                logger.debug(
+                    "  Live %d candidate: '%s' - viewers: %r (type: %s), views: %r (type: %s)",
+                    idx, live.get('title', 'Unknown')[:40],
+                    live.get('live_viewers'), type(live.get('live_viewers')).__name__,
+                    live.get('view_count'), type(live.get('view_count')).__name__
+                )
+        return max(live_videos, key=_live_sort_key) if live_videos else None
+    
+    @staticmethod
+    def _apply_trending_stats(videos, fresh_stats_dict):
+        """Update trending videos in place with real-time stats"""
+        for trending in videos:
+            fresh_data = fresh_stats_dict.get(trending.get('video_id'))
+            if fresh_data:
+                _apply_trending_fields(trending, fresh_data)
+    
+    def get_quota_status(self, since=None):
+        """Get current quota status (see QuotaManager.get_quota_status for `since`)"""
+        return self.quota_manager.get_quota_status(since)
+
 
+@lru_cache(maxsize=1)
+def get_cached_youtube_service() -> CachedYouTubeService:
+    """Shared CachedYouTubeService so its clients and limiters are reused across requests"""
+    return CachedYouTubeService()
@@ -4,51 +4,147 @@ Handles Instagram page data retrieval and analysis.
 Uses web scraping since Instagram Graph API requires authentication.
 """
 import re
+import html
+import heapq
+import asyncio
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timezone
+from collections import OrderedDict
+import threading
 import time
 import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+# orjson decodes the large _sharedData payloads several times faster; optional
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# selectolax builds a tag tree much faster than BeautifulSoup; optional
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# Script payloads are pulled straight from the raw body, no tree walk needed
+_LD_JSON_RE = re.compile(rb'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.DOTALL | re.IGNORECASE)
+_SHARED_DATA_RE = re.compile(rb'window\._sharedData\s*=\s*(\{.+?\});</script>', re.DOTALL)
+_META_RE = re.compile(
+    rb'<meta\s+(?:property|name)=["\'](og:title|og:image|og:description)["\']\s+content=(?:"([^"]*)"|\'([^\']*)\')',
+    re.IGNORECASE
+)
+
+_COUNT_RE = re.compile(r'^(\d+(?:\.\d+)?)([KMB]?)$')
+_COUNT_MULTIPLIERS = {'': 1, 'K': 1_000, 'M': 1_000_000, 'B': 1_000_000_000}
+
+# Profile URL or bare username; query/fragment stripping is part of the match
+_USERNAME_RE = re.compile(r'instagram\.com/([a-zA-Z0-9_.]+)(?:[/?#]|$)|^([a-zA-Z0-9_.]+)$')
+_RESERVED_PATHS = frozenset({'p', 'reel', 'stories', 'explore', 'accounts', 'direct'})
+_SHARED_DATA_PATTERNS = [
+    re.compile(pattern, re.DOTALL) for pattern in (
+        r'window\._sharedData\s*=\s*({.+?});',
+        r'_sharedData\s*=\s*({.+?});',
+        r'<script[^>]*>window\._sharedData\s*=\s*({.+?});</script>',
+    )
+]
+_FOLLOWER_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r'"edge_followed_by":\s*\{\s*"count":\s*(\d+)',
+        r'"follower_count":\s*(\d+)',
+        r'"followed_by":\s*\{\s*"count":\s*(\d+)',
+        r'"followerCount":\s*(\d+)',
+        r'(\d+\.?\d*[KMB]?)\s*followers',
+        r'(\d{1,3}(?:,\d{3})*)\s*followers',
+        r'"edge_followed_by":\{"count":(\d+)',
+    )
+]
+
+def _dig(data, *keys, default=None):
+    """Follow nested dict keys / list indexes, returning default on any miss"""
+    for key in keys:
+        try:
+            data = data[key]
+        except (KeyError, IndexError, TypeError):
+            return default
+        if data is None:
+            return default
+    return data
+
+@lru_cache(maxsize=4096)
+def _extract_username(url: str) -> Optional[str]:
+    """Extract Instagram username from URL (pure, so memoized)"""
+    match = _USERNAME_RE.search(url.strip())
+    username = match.group(match.lastindex) if match else None
+    # Skip Instagram's special pages
+    return username if username and username not in _RESERVED_PATHS else None
+
+class PageNotFoundError(ValueError):
+    """The profile does not exist or is private (404 or login redirect)"""
+
+
 class InstagramService:
     """Service class for interacting with Instagram pages via web scraping"""
     
     # Rotate between multiple realistic user agents to appear more human-like
-    USER_AGENTS = [
+    USER_AGENTS = (
         'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
         'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
         'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
         'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15',
         'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-    ]
+    )
+    
+    # Browser-like headers sent with every request (User-Agent is added per session/request)
+    DEFAULT_HEADERS = {
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.9',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'Connection': 'keep-alive',
+        'Upgrade-Insecure-Requests': '1',
+        'Sec-Fetch-Dest': 'document',
+        'Sec-Fetch-Mode': 'navigate',
+        'Sec-Fetch-Site': 'none',
+        'Sec-Fetch-User': '?1',
+        'Cache-Control': 'max-age=0',
+    }
+    
+    # In-process cache of full page results; counts only move every few minutes
+    PAGE_CACHE_SIZE = 1024
+    PAGE_CACHE_TTL = 300
+    # Missing/private profiles are remembered briefly so they are not re-scraped
+    PAGE_CACHE_NEGATIVE_TTL = 30
+    # Concurrent scrapes per batch; Instagram throttles aggressive clients
+    MAX_CONCURRENT_PAGES = 8
     
     def __init__(self):
+        self._page_cache = OrderedDict()
+        self._page_cache_lock = threading.Lock()
         self.session = requests.Session()
-        self._update_headers()
-        self.session.headers.update({
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Sec-Fetch-User': '?1',
-            'Cache-Control': 'max-age=0',
-        })
+        # Larger keep-alive pool so concurrent scrapes share warm TLS connections
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504)),
+        )
+        self.session.mount('https://', adapter)
+        self.session.headers.update({**self.DEFAULT_HEADERS, **self._random_user_agent()})
+        # Seed basic cookies once; cookies Instagram sets later persist on the session
+        self.session.cookies.set('ig_did', '', domain='.instagram.com')
+        self.session.cookies.set('ig_nrcb', '1', domain='.instagram.com')
     
-    def _update_headers(self):
-        """Update headers with a random user agent"""
+    def _random_user_agent(self) -> Dict:
+        """Header dict with a random user agent"""
         import random
-        user_agent = random.choice(self.USER_AGENTS)
-        self.session.headers.update({
-            'User-Agent': user_agent,
-        })
+        return {'User-Agent': random.choice(self.USER_AGENTS)}
     
     def _delay(self, seconds: float = 1.0):
         """Add delay between requests to avoid rate limiting"""
@@ -59,53 +155,80 @@ class InstagramService:
         if not text:
             return 0
         
-        text = text.replace(',', '').strip().upper()
-        
-        # Handle millions
-        if 'M' in text:
-            number = float(text.replace('M', ''))
-            return int(number * 1_000_000)
-        
-        # Handle thousands
-        if 'K' in text:
-            number = float(text.replace('K', ''))
-            return int(number * 1_000)
-        
-        # Handle billions
-        if 'B' in text:
-            number = float(text.replace('B', ''))
-            return int(number * 1_000_000_000)
-        
-        # Regular number
-        try:
-            return int(float(text))
-        except:
+        match = _COUNT_RE.match(text.replace(',', '').strip().upper())
+        if not match:
             return 0
+        return int(float(match.group(1)) * _COUNT_MULTIPLIERS[match.group(2)])
     
     def extract_username_from_url(self, url: str) -> Optional[str]:
         """Extract Instagram username from URL"""
-        patterns = [
-            r'instagram\.com/([a-zA-Z0-9_.]+)',
-            r'instagram\.com/([a-zA-Z0-9_.]+)/',
-        ]
+        return _extract_username(url)
+    
+    def _fetch_page(self, username: str) -> requests.Response:
+        """GET the profile page once; shared by page info and media extraction"""
+        url = f"https://www.instagram.com/{username}/"
         
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                username = match.group(1)
-                # Remove query parameters if any
-                username = username.split('?')[0]
-                # Skip Instagram's special pages
-                if username not in ['p', 'reel', 'stories', 'explore', 'accounts', 'direct']:
-                    return username
+        # Make request with better headers, rotating the user agent per request
+        # (passed per call since the shared session is used across threads)
+        response = self.session.get(
+            url, 
+            headers=self._random_user_agent(),
+            timeout=15,
+            allow_redirects=True
+        )
+        # Instagram always serves UTF-8; setting it skips charset detection if .text is needed.
+        # Extraction works on response.content bytes wherever possible.
+        response.encoding = 'utf-8'
+        return response
+    
+    def _fetch_and_parse(self, username: str) -> Tuple[requests.Response, Dict]:
+        """
+        GET the profile page once and decode its _sharedData user.
+        The JSON blob is large, so it is decoded once and shared by all extractors.
+        """
+        response = self._fetch_page(username)
+        user_data = self._decode_shared_user(response) if response.status_code == 200 else {}
+        return response, user_data
+    
+    def _decode_shared_user(self, response: requests.Response) -> Dict:
+        """Decode the profile user from window._sharedData ({} if absent)"""
+        blobs = []
+        match = _SHARED_DATA_RE.search(response.content)
+        if match:
+            blobs.append(match.group(1))
+        else:
+            # Looser patterns for markup variations; these need the decoded text
+            page_text = response.text
+            blobs.extend(m.group(1) for m in (pattern.search(page_text) for pattern in _SHARED_DATA_PATTERNS) if m)
         
-        # If URL is just a username (without instagram.com)
-        if re.match(r'^[a-zA-Z0-9_.]+$', url.strip()):
-            return url.strip()
+        for blob in blobs:
+            try:
+                data = _json_loads(blob)
+                user_data = _dig(data, 'entry_data', 'ProfilePage', 0, 'graphql', 'user', default={})
+                if user_data:
+                    return user_data
+            except Exception as e:
+                logger.debug(f"Error parsing _sharedData: {e}")
+        return {}
+    
+    def _is_profile_response(self, username: str, response: requests.Response) -> bool:
+        """Check the profile page loaded (not an error status or login redirect)"""
+        # Check for redirects to login page (profile doesn't exist or is private)
+        if response.status_code != 200:
+            logger.warning(f"Got status {response.status_code} for {username}")
+            return False
         
-        return None
+        # Check if redirected to login page
+        if 'accounts/login' in response.url.lower() or 'login' in response.url.lower():
+            logger.warning(f"Redirected to login page for {username} - profile may be private or not exist")
+            return False
+        return True
     
-    def get_page_info(self, username: str) -> Optional[Dict]:
+    def _is_missing_profile(self, response: requests.Response) -> bool:
+        """Check whether a failed profile response means the profile is missing or private"""
+        return response.status_code == 404 or 'login' in response.url.lower()
+    
+    def get_page_info(self, username: str, delay: bool = True) -> Optional[Dict]:
         """
         Get Instagram page information including:
         - Page name
@@ -115,224 +238,166 @@ class InstagramService:
         - Profile picture
         """
         try:
-            url = f"https://www.instagram.com/{username}/"
-            
-            # Rotate user agent for each request
-            self._update_headers()
-            
-            # Make request with better headers
-            response = self.session.get(
-                url, 
-                timeout=15,
-                allow_redirects=True,
-                cookies={'ig_did': '', 'ig_nrcb': '1'}  # Add some basic cookies
-            )
-            
-            # Check for redirects to login page (profile doesn't exist or is private)
-            if response.status_code != 200:
-                logger.warning(f"Got status {response.status_code} for {username}")
-                return None
-            
-            # Check if redirected to login page
-            if 'accounts/login' in response.url.lower() or 'login' in response.url.lower():
-                logger.warning(f"Redirected to login page for {username} - profile may be private or not exist")
+            response, user_data = self._fetch_and_parse(username)
+            if not self._is_profile_response(username, response):
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Instagram stores data in JSON-LD and script tags
-            page_info = {
-                'username': username,
-                'full_name': '',
-                'biography': '',
-                'profile_picture': '',
-                'follower_count': 0,
-                'following_count': 0,
-                'post_count': 0,
-                'is_verified': False,
-            }
-            
-            # Method 1: Look for JSON-LD structured data
-            scripts = soup.find_all('script', type='application/ld+json')
-            for script in scripts:
-                try:
-                    data = json.loads(script.string)
-                    if isinstance(data, dict):
-                        # Extract from alternateName (username) and name (full name)
-                        if 'alternateName' in data:
-                            page_info['username'] = data['alternateName'].replace('@', '')
-                        if 'name' in data:
-                            page_info['full_name'] = data['name']
-                        # Get image if available
-                        if 'image' in data and not page_info['profile_picture']:
-                            image_url = data['image']
-                            if isinstance(image_url, str):
-                                page_info['profile_picture'] = image_url
-                            elif isinstance(image_url, dict):
-                                page_info['profile_picture'] = image_url.get('url', '')
-                except:
-                    pass
-            
-            # Method 2: Extract from window._sharedData or similar
-            scripts = soup.find_all('script')
-            for script in scripts:
-                if script.string and 'window._sharedData' in script.string:
-                    try:
-                        match = re.search(r'window\._sharedData = ({.+?});', script.string, re.DOTALL)
-                        if match:
-                            data = json.loads(match.group(1))
-                            user_data = data.get('entry_data', {}).get('ProfilePage', [{}])[0].get('graphql', {}).get('user', {})
-                            
-                            if user_data:
-                                page_info['full_name'] = user_data.get('full_name', '')
-                                page_info['username'] = user_data.get('username', username)
-                                page_info['biography'] = user_data.get('biography', '')
-                                page_info['profile_picture'] = user_data.get('profile_pic_url_hd', '')
-                                page_info['follower_count'] = user_data.get('edge_followed_by', {}).get('count', 0)
-                                page_info['following_count'] = user_data.get('edge_follow', {}).get('count', 0)
-                                page_info['post_count'] = user_data.get('edge_owner_to_timeline_media', {}).get('count', 0)
-                                page_info['is_verified'] = user_data.get('is_verified', False)
-                                break
-                    except Exception as e:
-                        logger.debug(f"Error parsing _sharedData: {e}")
-            
-            # Method 3: Try to extract from JSON embedded in page (Instagram embeds data in script tags)
-            # Look for various JSON patterns Instagram might use
-            page_text = response.text
-            
-            # Pattern 1: Look for JSON-LD structured data (most reliable when available)
-            json_ld_scripts = soup.find_all('script', type='application/ld+json')
-            for script in json_ld_scripts:
-                try:
-                    data = json.loads(script.string)
-                    if isinstance(data, dict):
-                        # Extract from alternateName (username) and name (full name)
-                        if 'alternateName' in data:
-                            page_info['username'] = data['alternateName'].replace('@', '')
-                        if 'name' in data and not page_info['full_name']:
-                            page_info['full_name'] = data['name']
-                        # Get image if available
-                        if 'image' in data and not page_info['profile_picture']:
-                            image_url = data['image']
-                            if isinstance(image_url, str):
-                                page_info['profile_picture'] = image_url
-                            elif isinstance(image_url, dict):
-                                page_info['profile_picture'] = image_url.get('url', '')
-                except:
-                    pass
+            page_info = self._extract_page_info_from(username, response, user_data)
+            if delay:
+                self._delay()
+            return page_info
             
-            # Pattern 2: Look for window._sharedData (most comprehensive data when available)
-            shared_data_patterns = [
-                r'window\._sharedData\s*=\s*({.+?});',
-                r'_sharedData\s*=\s*({.+?});',
-                r'<script[^>]*>window\._sharedData\s*=\s*({.+?});</script>',
-            ]
+        except Exception as e:
+            logger.error(f"Error fetching Instagram page info: {e}")
+            return None
+    
+    def _extract_page_info_from(self, username: str, response: requests.Response, user_data: Dict) -> Dict:
+        """Extract page info from an already fetched profile page and its decoded _sharedData user"""
+        # Instagram stores data in JSON-LD and script tags
+        page_info = {
+            'username': username,
+            'full_name': '',
+            'biography': '',
+            'profile_picture': '',
+            'follower_count': 0,
+            'following_count': 0,
+            'post_count': 0,
+            'is_verified': False,
+        }
+        
+        # Method 1: Look for JSON-LD structured data
+        for ld_match in _LD_JSON_RE.finditer(response.content):
+            try:
+                data = _json_loads(ld_match.group(1))
+                if isinstance(data, dict):
+                    # Extract from alternateName (username) and name (full name)
+                    if 'alternateName' in data:
+                        page_info['username'] = data['alternateName'].replace('@', '')
+                    if 'name' in data and not page_info['full_name']:
+                        page_info['full_name'] = data['name']
+                    # Get image if available
+                    if 'image' in data and not page_info['profile_picture']:
+                        image_url = data['image']
+                        if isinstance(image_url, str):
+                            page_info['profile_picture'] = image_url
+                        elif isinstance(image_url, dict):
+                            page_info['profile_picture'] = image_url.get('url', '')
+            except:
+                pass
+        
+        # Method 2: Extract from window._sharedData (most comprehensive data when available)
+        if user_data:
+            page_info['full_name'] = user_data.get('full_name', '') or page_info['full_name']
+            page_info['username'] = user_data.get('username', username)
+            page_info['biography'] = user_data.get('biography', '') or page_info['biography']
             
-            for pattern in shared_data_patterns:
-                match = re.search(pattern, page_text, re.DOTALL)
-                if match:
-                    try:
-                        json_str = match.group(1)
-                        data = json.loads(json_str)
-                        user_data = data.get('entry_data', {}).get('ProfilePage', [{}])[0].get('graphql', {}).get('user', {})
-                        
-                        if user_data:
-                            page_info['full_name'] = user_data.get('full_name', '') or page_info['full_name']
-                            page_info['username'] = user_data.get('username', username)
-                            page_info['biography'] = user_data.get('biography', '') or page_info['biography']
-                            
-                            # Profile picture - try multiple fields
-                            profile_pic = (
-                                user_data.get('profile_pic_url_hd') or 
-                                user_data.get('profile_pic_url') or
-                                page_info['profile_picture']
-                            )
-                            if profile_pic:
-                                page_info['profile_picture'] = profile_pic
-                            
-                            page_info['follower_count'] = user_data.get('edge_followed_by', {}).get('count', 0) or page_info['follower_count']
-                            page_info['following_count'] = user_data.get('edge_follow', {}).get('count', 0) or page_info['following_count']
-                            page_info['post_count'] = user_data.get('edge_owner_to_timeline_media', {}).get('count', 0) or page_info['post_count']
-                            page_info['is_verified'] = user_data.get('is_verified', False) or page_info['is_verified']
-                            break  # Found data, stop searching
-                    except Exception as e:
-                        logger.debug(f"Error parsing _sharedData pattern {pattern}: {e}")
-                        continue
+            # Profile picture - try multiple fields
+            profile_pic = (
+                user_data.get('profile_pic_url_hd') or 
+                user_data.get('profile_pic_url') or
+                page_info['profile_picture']
+            )
+            if profile_pic:
+                page_info['profile_picture'] = profile_pic
             
-            # Method 4: Parse from meta tags (FALLBACK - Instagram serves these when available)
-            meta_title = soup.find('meta', {'property': 'og:title'}) or soup.find('meta', {'name': 'og:title'})
-            meta_image = soup.find('meta', {'property': 'og:image'}) or soup.find('meta', {'name': 'og:image'})
-            meta_description = soup.find('meta', {'property': 'og:description'}) or soup.find('meta', {'name': 'og:description'})
+            page_info['follower_count'] = _dig(user_data, 'edge_followed_by', 'count', default=0) or page_info['follower_count']
+            page_info['following_count'] = _dig(user_data, 'edge_follow', 'count', default=0) or page_info['following_count']
+            page_info['post_count'] = _dig(user_data, 'edge_owner_to_timeline_media', 'count', default=0) or page_info['post_count']
+            page_info['is_verified'] = user_data.get('is_verified', False) or page_info['is_verified']
+        
+        # Method 4: Parse from meta tags (FALLBACK - Instagram serves these when available)
+        meta = self._extract_meta(response)
+        meta_title = meta.get('og:title', '')
+        meta_image = meta.get('og:image', '')
+        meta_description = meta.get('og:description', '')
+        
+        # Only use meta tags if we don't have better data from JSON
+        if not page_info['full_name'] and meta_title:
+            title = meta_title
+            logger.debug(f"Using meta title for {username}: {title}")
             
-            # Only use meta tags if we don't have better data from JSON
-            if not page_info['full_name'] and meta_title:
-                title = meta_title.get('content', '')
-                logger.debug(f"Using meta title for {username}: {title}")
+            # Parse format: "Name (@username) • Instagram photos and videos"
+            if '@' in title:
+                # Extract full name (everything before @, but remove trailing parentheses)
+                name_part = title.split('@')[0].strip()
+                # Remove trailing parenthesis if present (format: "Name (@username)")
+                if name_part.endswith('('):
+                    name_part = name_part[:-1].strip()
+                clean_name = name_part.replace(' • Instagram photos and videos', '').replace(' • Instagram', '').strip()
+                if clean_name:
+                    page_info['full_name'] = clean_name
+                    logger.debug(f"Extracted full name from meta: {clean_name}")
                 
-                # Parse format: "Name (@username) • Instagram photos and videos"
-                if '@' in title:
-                    # Extract full name (everything before @, but remove trailing parentheses)
-                    name_part = title.split('@')[0].strip()
-                    # Remove trailing parenthesis if present (format: "Name (@username)")
-                    if name_part.endswith('('):
-                        name_part = name_part[:-1].strip()
-                    clean_name = name_part.replace(' • Instagram photos and videos', '').replace(' • Instagram', '').strip()
-                    if clean_name:
-                        page_info['full_name'] = clean_name
-                        logger.debug(f"Extracted full name from meta: {clean_name}")
-                    
-                    # Extract username from title (always update if found)
-                    if ')' in title:
-                        username_part = title.split('@')[1].split(')')[0].strip()
-                        if username_part:
-                            page_info['username'] = username_part
-            
-            # Get profile picture from og:image (ALWAYS use if available, better quality)
-            if meta_image:
-                img_url = meta_image.get('content', '')
-                if img_url and (not page_info['profile_picture'] or 'scontent' not in page_info['profile_picture']):
-                    page_info['profile_picture'] = img_url
-                    logger.debug(f"Found profile picture from og:image")
-            
-            # Get biography from og:description
-            if meta_description and not page_info['biography']:
-                desc = meta_description.get('content', '')
-                if desc and len(desc) > 10:  # Basic validation
-                    page_info['biography'] = desc[:200]  # Truncate
-            
-            # Method 5: Parse follower counts from page text (fallback - try multiple patterns)
-            if page_info['follower_count'] == 0:
-                # Look for follower count patterns in various formats
-                follower_patterns = [
-                    r'"edge_followed_by":\s*\{\s*"count":\s*(\d+)',
-                    r'"follower_count":\s*(\d+)',
-                    r'"followed_by":\s*\{\s*"count":\s*(\d+)',
-                    r'"followerCount":\s*(\d+)',
-                    r'(\d+\.?\d*[KMB]?)\s*followers',
-                    r'(\d{1,3}(?:,\d{3})*)\s*followers',
-                    r'"edge_followed_by":\{"count":(\d+)',
-                ]
-                for pattern in follower_patterns:
-                    matches = re.finditer(pattern, page_text, re.IGNORECASE)
-                    for match in matches:
-                        follower_text = match.group(1)
-                        if follower_text.replace(',', '').replace('.', '').isdigit():
-                            page_info['follower_count'] = int(float(follower_text.replace(',', '')))
-                            logger.debug(f"Extracted follower count: {page_info['follower_count']}")
-                            break
-                        elif any(c in follower_text.upper() for c in ['K', 'M', 'B']):
-                            page_info['follower_count'] = self._parse_count(follower_text)
-                            logger.debug(f"Extracted follower count (formatted): {page_info['follower_count']}")
-                            break
-                    if page_info['follower_count'] > 0:
+                # Extract username from title (always update if found)
+                if ')' in title:
+                    username_part = title.split('@')[1].split(')')[0].strip()
+                    if username_part:
+                        page_info['username'] = username_part
+        
+        # Get profile picture from og:image (ALWAYS use if available, better quality)
+        if meta_image:
+            img_url = meta_image
+            if img_url and (not page_info['profile_picture'] or 'scontent' not in page_info['profile_picture']):
+                page_info['profile_picture'] = img_url
+                logger.debug(f"Found profile picture from og:image")
+        
+        # Get biography from og:description
+        if meta_description and not page_info['biography']:
+            desc = meta_description
+            if desc and len(desc) > 10:  # Basic validation
+                page_info['biography'] = desc[:200]  # Truncate
+        
+        # Method 5: Parse follower counts from page text (fallback - try multiple patterns)
+        if page_info['follower_count'] == 0:
+            page_text = response.text
+            # Look for follower count patterns in various formats
+            for pattern in _FOLLOWER_PATTERNS:
+                matches = pattern.finditer(page_text)
+                for match in matches:
+                    follower_text = match.group(1)
+                    if follower_text.replace(',', '').replace('.', '').isdigit():
+                        page_info['follower_count'] = int(float(follower_text.replace(',', '')))
+                        logger.debug(f"Extracted follower count: {page_info['follower_count']}")
                         break
-            
-            self._delay()
-            return page_info
-            
-        except Exception as e:
-            logger.error(f"Error fetching Instagram page info: {e}")
-            return None
+                    elif any(c in follower_text.upper() for c in ['K', 'M', 'B']):
+                        page_info['follower_count'] = self._parse_count(follower_text)
+                        logger.debug(f"Extracted follower count (formatted): {page_info['follower_count']}")
+                        break
+                if page_info['follower_count'] > 0:
+                    break
+        
+        return page_info
+    
+    def _extract_meta(self, response: requests.Response) -> Dict:
+        """
+        Get og:title/og:image/og:description contents.
+        A regex over the raw body covers Instagram's markup; the parser is only
+        built when it finds nothing (e.g. attributes in an unexpected order).
+        """
+        meta = {}
+        for match in _META_RE.finditer(response.content):
+            key = match.group(1).decode().lower()
+            if key not in meta:
+                value = match.group(2) if match.group(2) is not None else match.group(3)
+                meta[key] = html.unescape(value.decode('utf-8', 'replace'))
+        if meta:
+            return meta
+        
+        if LexborHTMLParser is not None:
+            tree = LexborHTMLParser(response.content)
+            for key in ('og:title', 'og:image', 'og:description'):
+                node = tree.css_first(f'meta[property="{key}"]') or tree.css_first(f'meta[name="{key}"]')
+                content = node.attributes.get('content') if node else None
+                if content:
+                    meta[key] = content
+            return meta
+        
+        soup = BeautifulSoup(response.content, 'lxml', from_encoding='utf-8')
+        for key in ('og:title', 'og:image', 'og:description'):
+            tag = soup.find('meta', {'property': key}) or soup.find('meta', {'name': key})
+            if tag and tag.get('content'):
+                meta[key] = tag['content']
+        return meta
     
     def fetch_page_media(self, username: str, max_posts: int = 5, max_reels: int = 5, max_videos: int = 5) -> Dict:
         """
@@ -340,142 +405,212 @@ class InstagramService:
         Returns dictionary with posts, reels, and videos separately.
         """
         try:
-            url = f"https://www.instagram.com/{username}/"
-            response = self.session.get(url, timeout=10)
+            response, user_data = self._fetch_and_parse(username)
             
             if response.status_code != 200:
-                return {
-                    'username': username,
-                    'posts': [],
-                    'reels': [],
-                    'videos': [],
-                    'trending_posts': [],
-                    'trending_reels': [],
-                    'error': f'Could not fetch page (status: {response.status_code})'
-                }
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            posts = []
-            reels = []
-            videos = []
-            
-            # Extract media from window._sharedData
-            scripts = soup.find_all('script')
-            for script in scripts:
-                if script.string and 'window._sharedData' in script.string:
-                    try:
-                        match = re.search(r'window\._sharedData = ({.+?});', script.string, re.DOTALL)
-                        if match:
-                            data = json.loads(match.group(1))
-                            user_data = data.get('entry_data', {}).get('ProfilePage', [{}])[0].get('graphql', {}).get('user', {})
-                            
-                            if user_data:
-                                media_edges = user_data.get('edge_owner_to_timeline_media', {}).get('edges', [])
-                                
-                                for edge in media_edges:
-                                    node = edge.get('node', {})
-                                    media_type = node.get('__typename', '')
-                                    shortcode = node.get('shortcode', '')
-                                    caption = node.get('edge_media_to_caption', {}).get('edges', [{}])[0].get('node', {}).get('text', '')
-                                    thumbnail = node.get('thumbnail_src', '') or node.get('display_url', '')
-                                    timestamp = node.get('taken_at_timestamp', 0)
-                                    
-                                    # Get engagement metrics
-                                    likes = node.get('edge_liked_by', {}).get('count', 0)
-                                    comments = node.get('edge_media_to_comment', {}).get('count', 0)
-                                    video_view_count = node.get('video_view_count', 0)
-                                    
-                                    # Determine if it's a video, reel, or post
-                                    is_video = node.get('is_video', False)
-                                    is_reel = 'REELS' in media_type or 'Reels' in media_type
-                                    
-                                    media_item = {
-                                        'shortcode': shortcode,
-                                        'url': f"https://www.instagram.com/p/{shortcode}/",
-                                        'caption': caption[:200],  # Truncate
-                                        'thumbnail': thumbnail,
-                                        'likes': likes,
-                                        'comments': comments,
-                                        'views': video_view_count if is_video else 0,
-                                        'timestamp': timestamp,
-                                        'published_at': datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat() if timestamp else '',
-                                        'is_video': is_video,
-                                        'is_reel': is_reel,
-                                    }
-                                    
-                                    # Calculate if trending (last 3 hours)
-                                    if timestamp:
-                                        hours_since = (datetime.now(timezone.utc).timestamp() - timestamp) / 3600
-                                        media_item['hours_since_publish'] = hours_since
-                                        media_item['is_trending'] = hours_since <= 3 and hours_since >= 0
-                                    else:
-                                        media_item['is_trending'] = False
-                                    
-                                    # Categorize media
-                                    if is_reel:
-                                        reels.append(media_item)
-                                    elif is_video:
-                                        videos.append(media_item)
-                                    else:
-                                        posts.append(media_item)
-                                
-                                break
-                    except Exception as e:
-                        logger.error(f"Error parsing media data: {e}")
-            
-            # Sort by engagement (likes + comments)
-            posts.sort(key=lambda x: x['likes'] + x['comments'], reverse=True)
-            reels.sort(key=lambda x: x['likes'] + x['views'], reverse=True)
-            videos.sort(key=lambda x: x['likes'] + x['views'], reverse=True)
-            
-            # Get trending media
-            trending_posts = [p for p in posts if p.get('is_trending', False)][:3]
-            trending_reels = [r for r in reels if r.get('is_trending', False)][:3]
+                return self._media_error(username, f'Could not fetch page (status: {response.status_code})')
             
+            media_data = self._extract_media_from(username, user_data, max_posts, max_reels, max_videos)
             self._delay()
-            
-            return {
-                'username': username,
-                'posts': posts[:max_posts],
-                'reels': reels[:max_reels],
-                'videos': videos[:max_videos],
-                'trending_posts': trending_posts,
-                'trending_reels': trending_reels,
-                'total_posts': len(posts),
-                'total_reels': len(reels),
-                'total_videos': len(videos),
-                'total_trending_posts': len(trending_posts),
-                'total_trending_reels': len(trending_reels),
-            }
+            return media_data
             
         except Exception as e:
             logger.error(f"Error fetching Instagram media: {e}")
-            return {
-                'username': username,
-                'posts': [],
-                'reels': [],
-                'videos': [],
-                'trending_posts': [],
-                'trending_reels': [],
-                'error': str(e)
-            }
+            return self._media_error(username, str(e))
+    
+    def _media_error(self, username: str, error: str) -> Dict:
+        """Empty media result carrying an error message"""
+        return {
+            'username': username,
+            'posts': [],
+            'reels': [],
+            'videos': [],
+            'trending_posts': [],
+            'trending_reels': [],
+            'error': error
+        }
+    
+    def _extract_media_from(self, username: str, user_data: Dict, max_posts: int, max_reels: int, max_videos: int) -> Dict:
+        """Extract posts, reels and videos from the decoded _sharedData user"""
+        posts = []
+        reels = []
+        videos = []
+        trending_posts = []
+        trending_reels = []
+        
+        # Extract media from window._sharedData
+        try:
+            if user_data:
+                media_edges = _dig(user_data, 'edge_owner_to_timeline_media', 'edges', default=())
+                # One reference time for the whole scrape
+                now_ts = time.time()
+                
+                for edge in media_edges:
+                    node = edge.get('node', {})
+                    media_type = node.get('__typename', '')
+                    shortcode = node.get('shortcode', '')
+                    caption = _dig(node, 'edge_media_to_caption', 'edges', 0, 'node', 'text', default='')
+                    thumbnail = node.get('thumbnail_src', '') or node.get('display_url', '')
+                    timestamp = node.get('taken_at_timestamp', 0)
+                    
+                    # Get engagement metrics
+                    likes = _dig(node, 'edge_liked_by', 'count', default=0)
+                    comments = _dig(node, 'edge_media_to_comment', 'count', default=0)
+                    video_view_count = node.get('video_view_count', 0)
+                    
+                    # Determine if it's a video, reel, or post
+                    is_video = node.get('is_video', False)
+                    is_reel = 'REELS' in media_type or 'Reels' in media_type
+                    
+                    media_item = {
+                        'shortcode': shortcode,
+                        'url': f"https://www.instagram.com/p/{shortcode}/",
+                        'caption': caption[:200],  # Truncate
+                        'thumbnail': thumbnail,
+                        'likes': likes,
+                        'comments': comments,
+                        'views': video_view_count if is_video else 0,
+                        'timestamp': timestamp,
+                        'published_at': datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat() if timestamp else '',
+                        'is_video': is_video,
+                        'is_reel': is_reel,
+                    }
+                    
+                    # Calculate if trending (last 3 hours)
+                    if timestamp:
+                        hours_since = (now_ts - timestamp) / 3600
+                        media_item['hours_since_publish'] = hours_since
+                        media_item['is_trending'] = hours_since <= 3 and hours_since >= 0
+                    else:
+                        media_item['is_trending'] = False
+                    
+                    # Categorize media (trending candidates collected in the same pass)
+                    if is_reel:
+                        reels.append(media_item)
+                        if media_item['is_trending']:
+                            trending_reels.append(media_item)
+                    elif is_video:
+                        videos.append(media_item)
+                    else:
+                        posts.append(media_item)
+                        if media_item['is_trending']:
+                            trending_posts.append(media_item)
+        except Exception as e:
+            logger.error(f"Error parsing media data: {e}")
+        
+        # Top-K by engagement; only K items are ever kept, so no full sort is needed
+        post_engagement = lambda x: x['likes'] + x['comments']
+        view_engagement = lambda x: x['likes'] + x['views']
+        trending_posts = heapq.nlargest(3, trending_posts, key=post_engagement)
+        trending_reels = heapq.nlargest(3, trending_reels, key=view_engagement)
+        
+        return {
+            'username': username,
+            'posts': heapq.nlargest(max_posts, posts, key=post_engagement),
+            'reels': heapq.nlargest(max_reels, reels, key=view_engagement),
+            'videos': heapq.nlargest(max_videos, videos, key=view_engagement),
+            'trending_posts': trending_posts,
+            'trending_reels': trending_reels,
+            'total_posts': len(posts),
+            'total_reels': len(reels),
+            'total_videos': len(videos),
+            'total_trending_posts': len(trending_posts),
+            'total_trending_reels': len(trending_reels),
+        }
     
     def fetch_page_full_data(self, username_or_url: str, max_posts: int = 5, max_reels: int = 5, max_videos: int = 5) -> Dict:
         """
         Main method: Fetch complete page data including info and media.
+        Page info and media come from a single fetch of the profile page.
+        Results are cached in-process for PAGE_CACHE_TTL seconds per username.
         """
         username = self.extract_username_from_url(username_or_url)
         if not username:
             raise ValueError(f"Could not extract username from: {username_or_url}")
         
+        key = (username, max_posts, max_reels, max_videos)
+        now = time.monotonic()
+        with self._page_cache_lock:
+            cached = self._page_cache.get(key)
+            if cached and cached[0] > now:
+                self._page_cache.move_to_end(key)
+                if isinstance(cached[1], Exception):
+                    raise cached[1]
+                return cached[1]
+        
+        try:
+            result = self._fetch_page_full_data(username, max_posts, max_reels, max_videos)
+            self._store_page_cache(key, result, self.PAGE_CACHE_TTL)
+            return result
+        except PageNotFoundError as e:
+            self._store_page_cache(key, e, self.PAGE_CACHE_NEGATIVE_TTL)
+            raise
+    
+    async def afetch_page_full_data(self, username_or_url: str, max_posts: int = 5, max_reels: int = 5, max_videos: int = 5, semaphore: Optional[asyncio.Semaphore] = None) -> Dict:
+        """Async fetch_page_full_data; the blocking scrape runs in a worker thread"""
+        if semaphore is None:
+            return await asyncio.to_thread(self.fetch_page_full_data, username_or_url, max_posts, max_reels, max_videos)
+        async with semaphore:
+            return await asyncio.to_thread(self.fetch_page_full_data, username_or_url, max_posts, max_reels, max_videos)
+    
+    def fetch_pages_full_data(self, usernames_or_urls: List[str], max_posts: int = 5, max_reels: int = 5, max_videos: int = 5) -> List:
+        """
+        Fetch several pages concurrently (at most MAX_CONCURRENT_PAGES at a time).
+        Returns one entry per input, in order: the page data, or the exception it raised.
+        """
+        async def _gather():
+            semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_PAGES)
+            return await asyncio.gather(
+                *[
+                    self.afetch_page_full_data(page, max_posts, max_reels, max_videos, semaphore=semaphore)
+                    for page in usernames_or_urls
+                ],
+                return_exceptions=True
+            )
+        
+        return asyncio.run(_gather())
+    
+    def _store_page_cache(self, key: Tuple, value, ttl: int):
+        """Store a result (or the error to re-raise) in the page cache"""
+        with self._page_cache_lock:
+            self._page_cache[key] = (time.monotonic() + ttl, value)
+            self._page_cache.move_to_end(key)
+            while len(self._page_cache) > self.PAGE_CACHE_SIZE:
+                self._page_cache.popitem(last=False)
+    
+    def invalidate(self, username: str):
+        """Drop cached results for a username so the next fetch scrapes again"""
+        with self._page_cache_lock:
+            for key in [k for k in self._page_cache if k[0] == username]:
+                del self._page_cache[key]
+    
+    def _fetch_page_full_data(self, username: str, max_posts: int, max_reels: int, max_videos: int) -> Dict:
+        """Scrape page info and media for a username (uncached)"""
         # Get page info
-        page_info = self.get_page_info(username)
+        missing = False
+        try:
+            response, user_data = self._fetch_and_parse(username)
+            if self._is_profile_response(username, response):
+                page_info = self._extract_page_info_from(username, response, user_data)
+            else:
+                page_info = None
+                missing = self._is_missing_profile(response)
+        except Exception as e:
+            logger.error(f"Error fetching Instagram page info: {e}")
+            page_info = None
         if not page_info:
-            raise ValueError(f"Could not fetch Instagram page: {username}")
+            # Only a missing/private profile is worth remembering (see fetch_page_full_data);
+            # timeouts, throttling and parse failures are left to the next caller to retry
+            error_class = PageNotFoundError if missing else ValueError
+            raise error_class(f"Could not fetch Instagram page: {username}")
         
-        # Get media
-        media_data = self.fetch_page_media(username, max_posts, max_reels, max_videos)
+        # Get media from the same response
+        try:
+            media_data = self._extract_media_from(username, user_data, max_posts, max_reels, max_videos)
+        except Exception as e:
+            logger.error(f"Error fetching Instagram media: {e}")
+            media_data = self._media_error(username, str(e))
+        self._delay()
         
         # Combine results
         result = {
@@ -493,3 +628,8 @@ class InstagramService:
         
         return result
 
+
+@lru_cache(maxsize=1)
+def get_instagram_service() -> InstagramService:
+    """Shared InstagramService so its connection pool survives across requests"""
+    return InstagramService()
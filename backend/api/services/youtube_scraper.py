@@ -4,44 +4,265 @@ Alternative to YouTube API that uses web scraping to avoid quota limits.
 """
 import re
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
+from functools import lru_cache
+from itertools import islice
 from typing import Dict, List, Optional
 from datetime import datetime
+from collections import OrderedDict
+import threading
 import time
+import json
 import logging
+from django.conf import settings
+from api.utils.rate_limiter import TokenBucket
 
 logger = logging.getLogger(__name__)
 
+# orjson decodes the multi-MB ytInitialData blobs several times faster; optional
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+# requests-cache keeps scraped pages on disk across runs and restarts; optional
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
+# selectolax builds a tag tree much faster than BeautifulSoup; optional
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+_URL_PATTERNS = tuple(re.compile(p) for p in (
+    r'youtube\.com/channel/([a-zA-Z0-9_-]+)',
+    r'youtube\.com/@([a-zA-Z0-9_-]+)',
+    r'youtube\.com/c/([a-zA-Z0-9_-]+)',
+    r'youtube\.com/user/([a-zA-Z0-9_-]+)',
+))
+_HANDLE_RE = re.compile(r'/@([^/]+)')
+_CHANNEL_PATH_RE = re.compile(r'/channel/([a-zA-Z0-9_-]+)')
+_CHANNEL_ID_FULL_RE = re.compile(r'^UC[a-zA-Z0-9_-]{22}$')
+# Handle-page fast path, most authoritative first; run on the raw body
+_HANDLE_CHANNEL_ID_PATTERNS = tuple(re.compile(p) for p in (
+    rb'<link rel="canonical" href="https://www\.youtube\.com/channel/(UC[a-zA-Z0-9_-]{22})"',
+    rb'"externalId":\s*"(UC[a-zA-Z0-9_-]{22})"',
+    rb'"channelId":\s*"(UC[a-zA-Z0-9_-]{22})"',
+))
+_INITIAL_DATA_ANCHOR = 'var ytInitialData = '
+_INITIAL_DATA_END = ';</script>'
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _combine_patterns(*patterns):
+    """
+    Join single-group patterns into one alternation, in priority order.
+    Alternatives sit in a lookahead so matches may overlap, and
+    match.lastindex tells which pattern matched.
+    """
+    return re.compile('(?=' + '|'.join(f'(?:{p})' for p in patterns) + ')', re.IGNORECASE)
+
+# Pattern: "X subscribers" or "X.XM subscribers"
+_SUBSCRIBER_RE = _combine_patterns(
+    r'(\d+\.?\d*[KMB]?)\s*subscribers',
+    r'(\d+\.?\d*[KMB]?)\s*abonnenten',  # German
+    r'"subscriberCountText":\s*"([^"]+)"',
+    r'"subscriberCount":\s*"([^"]+)"',
+)
+_CHANNEL_VIEW_RE = _combine_patterns(
+    r'(\d+\.?\d*[KMB]?)\s*views',
+    r'"viewCount":\s*"(\d+)"',
+    r'"viewCountText":\s*"([^"]+)"',
+)
+
+# Watch-page patterns run on the raw body; only the small captures are decoded
+_INTERACTION_COUNT_RE = re.compile(rb'<meta\s+itemprop="interactionCount"\s+content="(\d+)"')
+_VIEW_COUNT_RE = re.compile(rb'"viewCount":\s*"(\d+)"')
+_VIEW_TEXT_RE = re.compile(rb'(\d{1,3}(?:,\d{3})*)\s*views')
+_LIKE_COUNT_RE = re.compile(rb'"likeCount":\s*"(\d+)"')
+_UPLOAD_DATE_RE = re.compile(rb'"uploadDate":\s*"([^"]+)"')
+
+_NO_COMMAS = str.maketrans('', '', ',')
+_SUFFIX_MULTIPLIERS = {'K': 1_000, 'M': 1_000_000, 'B': 1_000_000_000}
+_EMPTY = {}
+
+
+def _search_combined(pattern, text: str) -> Optional[str]:
+    """
+    Scan `text` once with a combined pattern and return the capture of the
+    highest-priority alternative found anywhere, as if each had been
+    searched in turn.
+    """
+    best = None
+    for match in pattern.finditer(text):
+        if best is None or match.lastindex < best.lastindex:
+            best = match
+            if best.lastindex == 1:
+                break
+    return best.group(best.lastindex) if best else None
+
+
+def _iter_grid_videos(data: Dict):
+    """
+    Yield (video_id, title) for each grid video on the Videos tab of ytInitialData.
+    Missing levels fall back to one shared empty dict rather than a new one per lookup.
+    """
+    tabs = data.get('contents', _EMPTY).get('twoColumnBrowseResultsRenderer', _EMPTY).get('tabs', ())
+    for tab in tabs:
+        tab_renderer = tab.get('tabRenderer', _EMPTY)
+        if tab_renderer.get('title', '').lower() != 'videos':
+            continue
+        sections = tab_renderer.get('content', _EMPTY).get('sectionListRenderer', _EMPTY).get('contents', ())
+        for section in sections:
+            for content_item in section.get('itemSectionRenderer', _EMPTY).get('contents', ()):
+                for video_item in content_item.get('gridRenderer', _EMPTY).get('items', ()):
+                    renderer = video_item.get('gridVideoRenderer', _EMPTY)
+                    video_id = renderer.get('videoId')
+                    if video_id:
+                        runs = renderer.get('title', _EMPTY).get('runs') or (_EMPTY,)
+                        yield video_id, runs[0].get('text', '')
+
+
+def _extract_initial_data(page_text: str) -> Optional[Dict]:
+    """
+    Decode the ytInitialData object embedded in a YouTube page.
+    raw_decode stops at the end of the object, so no terminator regex is needed.
+    """
+    idx = page_text.find(_INITIAL_DATA_ANCHOR)
+    if idx < 0:
+        return None
+    start = idx + len(_INITIAL_DATA_ANCHOR)
+    
+    # Fast path: the object normally runs right up to the closing script tag
+    if orjson is not None:
+        end = page_text.find(_INITIAL_DATA_END, start)
+        if end > 0:
+            try:
+                data = _json_loads(page_text[start:end])
+                return data if isinstance(data, dict) else None
+            except ValueError:
+                pass
+    
+    try:
+        data, _ = _JSON_DECODER.raw_decode(page_text, start)
+    except ValueError as e:
+        logger.debug(f"Error parsing ytInitialData: {e}")
+        return None
+    return data if isinstance(data, dict) else None
+
 class YouTubeScraper:
     """Scrapes YouTube data without using the API"""
     
+    __slots__ = ('session', '_cache', '_cache_lock', '_bucket')
+    
     HEADERS = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
         'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate',
+        # Includes br only when a brotli decoder is installed
+        'Accept-Encoding': ACCEPT_ENCODING,
         'Connection': 'keep-alive',
     }
     
+    # In-process LRU/TTL cache for handle lookups and channel info
+    CACHE_SIZE = 512
+    CACHE_TTL = 3600
+    # Watch pages are read in chunks until the stats fields have been seen
+    STREAM_CHUNK_SIZE = 65536
+    STREAM_OVERLAP = 256
+    # Watch pages bypass the on-disk HTTP cache (see _new_session)
+    WATCH_URL_PATTERN = 'www.youtube.com/watch'
+    # Sequential scrapes average 2 pages/s and may burst up to 5
+    RATE_LIMIT_PER_SECOND = 2
+    RATE_LIMIT_BURST = 5
+    # Retries for throttled or failing responses
+    RETRY_TOTAL = 2
+    RETRY_BACKOFF = 0.3
+    RETRY_STATUSES = (429, 502, 503, 504)
+    
     def __init__(self):
-        self.session = requests.Session()
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._bucket = TokenBucket(
+            capacity=self.RATE_LIMIT_BURST,
+            refill_rate=self.RATE_LIMIT_PER_SECOND,
+            cache_key='ratelimit:scraper',
+        )
+        self.session = self._new_session()
+        # Keep-alive pool shared by the request threads using the scraper
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=10,
+            max_retries=Retry(
+                total=self.RETRY_TOTAL,
+                backoff_factor=self.RETRY_BACKOFF,
+                status_forcelist=self.RETRY_STATUSES,
+                allowed_methods=('GET',),
+            ),
+        )
+        self.session.mount('https://', adapter)
         self.session.headers.update(self.HEADERS)
     
-    def _delay(self, seconds: float = 1.0):
-        """Add delay between requests to avoid rate limiting"""
-        time.sleep(seconds)
+    def _new_session(self) -> requests.Session:
+        """Plain session, or an on-disk cached one when requests-cache is installed"""
+        if requests_cache is None:
+            return requests.Session()
+        ttls = dict(getattr(settings, 'SCRAPER_HTTP_CACHE_TTL', {}))
+        # YouTube marks its HTML no-cache, so expiry comes from our TTLs rather than Cache-Control
+        expire_after = ttls.pop('*', 21600)
+        # Watch pages are streamed and abandoned once the stats are found; caching one
+        # would download (and store) the whole ~1 MB page
+        urls_expire_after = {self.WATCH_URL_PATTERN: requests_cache.DO_NOT_CACHE, **ttls}
+        return requests_cache.CachedSession(
+            cache_name=getattr(settings, 'SCRAPER_HTTP_CACHE', 'yt_scraper_cache'),
+            backend='sqlite',
+            expire_after=expire_after,
+            urls_expire_after=urls_expire_after,
+            stale_if_error=True,
+            match_headers=['Accept-Language'],
+        )
+    
+    def _throttle(self):
+        """Wait for a token before hitting YouTube; only sleeps once the burst is spent"""
+        while True:
+            wait = self._bucket.consume()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+    
+    def _cached(self, key, fetch):
+        """
+        Return the cached value for `key`, or call `fetch()` and cache it.
+        Failed (None) results are not cached so they can be retried.
+        """
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] > now:
+                self._cache.move_to_end(key)
+                return cached[1]
+        
+        value = fetch()
+        if value is not None:
+            with self._cache_lock:
+                self._cache[key] = (now + self.CACHE_TTL, value)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return value
     
     def extract_channel_id_from_url(self, url: str) -> Optional[str]:
         """Extract channel ID from various URL formats"""
-        patterns = [
-            r'youtube\.com/channel/([a-zA-Z0-9_-]+)',
-            r'youtube\.com/@([a-zA-Z0-9_-]+)',
-            r'youtube\.com/c/([a-zA-Z0-9_-]+)',
-            r'youtube\.com/user/([a-zA-Z0-9_-]+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
+        for pattern in _URL_PATTERNS:
+            match = pattern.search(url)
             if match:
                 channel_id_or_handle = match.group(1)
                 # If it's a handle (@username), we need to resolve it to channel ID
@@ -53,16 +274,31 @@ class YouTubeScraper:
         return None
     
     def _get_channel_id_from_handle(self, handle: str) -> Optional[str]:
-        """Get channel ID from @handle by scraping the channel page"""
+        """Get channel ID from @handle by scraping the channel page (cached)"""
+        return self._cached(('handle', handle), lambda: self._resolve_handle(handle))
+    
+    def _resolve_handle(self, handle: str) -> Optional[str]:
+        """Scrape the @handle page for its channel ID (uncached)"""
         try:
             url = f"https://www.youtube.com/@{handle}"
+            self._throttle()
             response = self.session.get(url, timeout=10)
             if response.status_code == 200:
+                # Fast path: canonical link, externalId or channelId straight from the bytes
+                for pattern in _HANDLE_CHANNEL_ID_PATTERNS:
+                    match = pattern.search(response.content)
+                    if match:
+                        channel_id = match.group(1).decode('ascii')
+                        logger.info(f"Found channel ID {channel_id} from page source")
+                        return channel_id
+                
                 # Method 1: Extract from canonical URL
-                soup = BeautifulSoup(response.text, 'html.parser')
+                # .text re-decodes the body on every access, so decode once
+                page_text = response.text
+                soup = BeautifulSoup(page_text, 'lxml')
                 canonical = soup.find('link', {'rel': 'canonical'})
                 if canonical and canonical.get('href'):
-                    match = re.search(r'/channel/([a-zA-Z0-9_-]+)', canonical.get('href'))
+                    match = _CHANNEL_PATH_RE.search(canonical.get('href'))
                     if match:
                         channel_id = match.group(1)
                         logger.info(f"Found channel ID {channel_id} from canonical URL")
@@ -70,65 +306,45 @@ class YouTubeScraper:
                 
                 # Method 2: Look for channel ID in page source (ytInitialData)
                 # YouTube stores channel data in ytInitialData JSON
-                scripts = soup.find_all('script')
-                for script in scripts:
-                    if script.string and 'var ytInitialData' in script.string:
-                        # Extract JSON data
-                        match = re.search(r'var ytInitialData = ({.+?});', script.string, re.DOTALL)
-                        if match:
-                            try:
-                                import json
-                                data = json.loads(match.group(1))
-                                # Navigate through JSON to find channel ID
-                                # Structure: metadata.channelMetadataRenderer.externalId
-                                metadata = data.get('metadata', {})
-                                channel_metadata = metadata.get('channelMetadataRenderer', {})
-                                channel_id = channel_metadata.get('externalId')
-                                if channel_id:
-                                    logger.info(f"Found channel ID {channel_id} from ytInitialData")
-                                    return channel_id
-                                
-                                # Alternative path: header.c4TabbedHeaderRenderer.channelId
-                                header = data.get('header', {})
-                                c4_header = header.get('c4TabbedHeaderRenderer', {})
-                                channel_id = c4_header.get('channelId')
-                                if channel_id:
-                                    logger.info(f"Found channel ID {channel_id} from header")
-                                    return channel_id
-                            except Exception as e:
-                                logger.debug(f"Error parsing ytInitialData: {e}")
+                data = _extract_initial_data(page_text)
+                if data:
+                    try:
+                        # Navigate through JSON to find channel ID
+                        # Structure: metadata.channelMetadataRenderer.externalId
+                        metadata = data.get('metadata', {})
+                        channel_metadata = metadata.get('channelMetadataRenderer', {})
+                        channel_id = channel_metadata.get('externalId')
+                        if channel_id:
+                            logger.info(f"Found channel ID {channel_id} from ytInitialData")
+                            return channel_id
+                        
+                        # Alternative path: header.c4TabbedHeaderRenderer.channelId
+                        header = data.get('header', {})
+                        c4_header = header.get('c4TabbedHeaderRenderer', {})
+                        channel_id = c4_header.get('channelId')
+                        if channel_id:
+                            logger.info(f"Found channel ID {channel_id} from header")
+                            return channel_id
+                    except Exception as e:
+                        logger.debug(f"Error parsing ytInitialData: {e}")
                 
                 # Method 3: Look for channel ID in JSON-LD structured data
                 scripts = soup.find_all('script', type='application/ld+json')
                 for script in scripts:
                     try:
-                        import json
-                        data = json.loads(script.string)
+                        data = _json_loads(script.string)
                         if isinstance(data, dict):
                             # Try different possible fields
                             channel_id = data.get('channelId') or data.get('@id')
                             if channel_id:
                                 # Extract from URL format if needed
-                                match = re.search(r'/channel/([a-zA-Z0-9_-]+)', str(channel_id))
+                                match = _CHANNEL_PATH_RE.search(str(channel_id))
                                 if match:
                                     return match.group(1)
-                                if re.match(r'^UC[a-zA-Z0-9_-]{22}$', str(channel_id)):
+                                if _CHANNEL_ID_FULL_RE.match(str(channel_id)):
                                     return str(channel_id)
                     except:
                         pass
-                
-                # Method 4: Look in page source text for channel ID pattern
-                # Channel IDs typically start with UC and are 24 characters
-                channel_id_pattern = r'"channelId":"(UC[a-zA-Z0-9_-]{22})"'
-                matches = re.findall(channel_id_pattern, response.text)
-                if matches:
-                    # Use first unique match
-                    unique_ids = list(set(matches))
-                    if unique_ids:
-                        logger.info(f"Found channel ID {unique_ids[0]} from page source")
-                        return unique_ids[0]
-                
-                self._delay()
         except Exception as e:
             logger.error(f"Error getting channel ID from handle {handle}: {e}")
         
@@ -141,7 +357,12 @@ class YouTubeScraper:
         - Subscriber count
         - Total views
         - Channel thumbnail
+        Results are cached in-process for CACHE_TTL seconds per URL.
         """
+        return self._cached(('channel_info', channel_url), lambda: self._scrape_channel_info(channel_url))
+    
+    def _scrape_channel_info(self, channel_url: str) -> Optional[Dict]:
+        """Scrape the channel about page (uncached)"""
         try:
             channel_id = self.extract_channel_id_from_url(channel_url)
             if not channel_id:
@@ -151,7 +372,7 @@ class YouTubeScraper:
             if '/channel/' in channel_url:
                 url = f"https://www.youtube.com/channel/{channel_id}/about"
             elif '/@' in channel_url:
-                handle = re.search(r'/@([^/]+)', channel_url)
+                handle = _HANDLE_RE.search(channel_url)
                 if handle:
                     url = f"https://www.youtube.com/@{handle.group(1)}/about"
                 else:
@@ -159,44 +380,26 @@ class YouTubeScraper:
             else:
                 url = f"https://www.youtube.com/channel/{channel_id}/about"
             
+            self._throttle()
             response = self.session.get(url, timeout=10)
             if response.status_code != 200:
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            page_text = response.text
+            tags = self._extract_channel_tags(page_text)
             
             # Extract channel name
-            channel_name = None
-            title_tag = soup.find('title')
-            if title_tag:
-                channel_name = title_tag.string.replace(' - YouTube', '').strip()
+            channel_name = tags['title'].replace(' - YouTube', '').strip()
             
             # Try to find channel name in meta tags or structured data
             if not channel_name:
-                meta_title = soup.find('meta', {'property': 'og:title'})
-                if meta_title:
-                    channel_name = meta_title.get('content', '').replace(' - YouTube', '').strip()
+                channel_name = tags['og:title'].replace(' - YouTube', '').strip()
             
             # Extract subscriber count
             subscriber_count = 0
-            subscriber_text = None
-            
-            # Look for subscriber count in various formats
-            # Pattern: "X subscribers" or "X.XM subscribers"
-            subscriber_patterns = [
-                r'(\d+\.?\d*[KMB]?)\s*subscribers',
-                r'(\d+\.?\d*[KMB]?)\s*abonnenten',  # German
-                r'"subscriberCountText":\s*"([^"]+)"',
-                r'"subscriberCount":\s*"([^"]+)"',
-            ]
-            
-            page_text = response.text
             
-            for pattern in subscriber_patterns:
-                match = re.search(pattern, page_text, re.IGNORECASE)
-                if match:
-                    subscriber_text = match.group(1)
-                    break
+            # Look for subscriber count in various formats, in one pass
+            subscriber_text = _search_combined(_SUBSCRIBER_RE, page_text)
             
             # Convert subscriber text to number
             if subscriber_text:
@@ -205,32 +408,12 @@ class YouTubeScraper:
             # Extract total views (channel views)
             view_count = 0
             # Look for "X views" in channel stats
-            view_patterns = [
-                r'(\d+\.?\d*[KMB]?)\s*views',
-                r'"viewCount":\s*"(\d+)"',
-                r'"viewCountText":\s*"([^"]+)"',
-            ]
-            
-            for pattern in view_patterns:
-                match = re.search(pattern, page_text, re.IGNORECASE)
-                if match:
-                    view_text = match.group(1)
-                    view_count = self._parse_count(view_text)
-                    break
+            view_text = _search_combined(_CHANNEL_VIEW_RE, page_text)
+            if view_text:
+                view_count = self._parse_count(view_text)
             
-            # Extract thumbnail
-            channel_thumbnail = None
-            meta_image = soup.find('meta', {'property': 'og:image'})
-            if meta_image:
-                channel_thumbnail = meta_image.get('content')
-            
-            # Try to get from channel avatar
-            if not channel_thumbnail:
-                img_tag = soup.find('img', {'id': 'img', 'class': 'style-scope yt-img-shadow'})
-                if img_tag:
-                    channel_thumbnail = img_tag.get('src') or img_tag.get('data-src')
-            
-            self._delay()
+            # Extract thumbnail, falling back to the channel avatar
+            channel_thumbnail = tags['og:image'] or tags['avatar']
             
             return {
                 'channel_id': channel_id,
@@ -247,32 +430,50 @@ class YouTubeScraper:
             logger.error(f"Error scraping channel info: {e}")
             return None
     
-    def _parse_count(self, text: str) -> int:
+    def _extract_channel_tags(self, page_text: str) -> Dict[str, str]:
+        """
+        Read <title>, og:title, og:image and the avatar image from a channel page.
+        Uses selectolax when installed, otherwise BeautifulSoup with lxml.
+        """
+        if LexborHTMLParser is not None:
+            tree = LexborHTMLParser(page_text)
+            title = tree.css_first('title')
+            og_title = tree.css_first('meta[property="og:title"]')
+            og_image = tree.css_first('meta[property="og:image"]')
+            avatar = tree.css_first('img#img.style-scope.yt-img-shadow')
+            return {
+                'title': title.text() if title else '',
+                'og:title': (og_title.attributes.get('content') if og_title else None) or '',
+                'og:image': (og_image.attributes.get('content') if og_image else None) or '',
+                'avatar': (avatar and (avatar.attributes.get('src') or avatar.attributes.get('data-src'))) or '',
+            }
+        
+        soup = BeautifulSoup(page_text, 'lxml')
+        title = soup.find('title')
+        og_title = soup.find('meta', {'property': 'og:title'})
+        og_image = soup.find('meta', {'property': 'og:image'})
+        avatar = soup.find('img', {'id': 'img', 'class': 'style-scope yt-img-shadow'})
+        return {
+            'title': (title.string if title else None) or '',
+            'og:title': (og_title.get('content') if og_title else None) or '',
+            'og:image': (og_image.get('content') if og_image else None) or '',
+            'avatar': (avatar and (avatar.get('src') or avatar.get('data-src'))) or '',
+        }
+    
+    @staticmethod
+    def _parse_count(text: str) -> int:
         """Parse counts like '1.2M', '500K', '1234' into integers"""
         if not text:
             return 0
         
-        text = text.replace(',', '').strip().upper()
-        
-        # Handle millions
-        if 'M' in text:
-            number = float(text.replace('M', ''))
-            return int(number * 1_000_000)
+        text = text.translate(_NO_COMMAS).strip().upper()
+        multiplier = _SUFFIX_MULTIPLIERS.get(text[-1:])
         
-        # Handle thousands
-        if 'K' in text:
-            number = float(text.replace('K', ''))
-            return int(number * 1_000)
-        
-        # Handle billions
-        if 'B' in text:
-            number = float(text.replace('B', ''))
-            return int(number * 1_000_000_000)
-        
-        # Regular number
         try:
+            if multiplier:
+                return int(float(text[:-1]) * multiplier)
             return int(float(text))
-        except:
+        except ValueError:
             return 0
     
     def get_video_list(self, channel_id: str, max_results: int = 50) -> List[Dict]:
@@ -282,30 +483,16 @@ class YouTubeScraper:
         """
         try:
             url = f"https://www.youtube.com/channel/{channel_id}/videos"
+            self._throttle()
             response = self.session.get(url, timeout=10)
             
             if response.status_code != 200:
                 return []
             
-            soup = BeautifulSoup(response.text, 'html.parser')
             videos = []
             
-            # YouTube uses JSON-LD or script tags with video data
-            # Look for ytInitialData
-            scripts = soup.find_all('script')
-            video_data = None
-            
-            for script in scripts:
-                if script.string and 'var ytInitialData' in script.string:
-                    # Extract JSON data
-                    match = re.search(r'var ytInitialData = ({.+?});', script.string, re.DOTALL)
-                    if match:
-                        try:
-                            import json
-                            video_data = json.loads(match.group(1))
-                            break
-                        except:
-                            pass
+            # YouTube embeds video data as ytInitialData in a script tag
+            video_data = _extract_initial_data(response.text)
             
             if not video_data:
                 logger.warning("Could not extract video data from page")
@@ -314,44 +501,15 @@ class YouTubeScraper:
             # Navigate through JSON structure to find videos
             # This structure can change, so this is a simplified version
             try:
-                contents = video_data.get('contents', {})
-                two_column = contents.get('twoColumnBrowseResultsRenderer', {})
-                tabs = two_column.get('tabs', [])
-                
-                for tab in tabs:
-                    tab_renderer = tab.get('tabRenderer', {})
-                    if tab_renderer.get('title', '').lower() == 'videos':
-                        content = tab_renderer.get('content', {})
-                        section_list = content.get('sectionListRenderer', {})
-                        items = section_list.get('contents', [])
-                        
-                        for item in items:
-                            item_section = item.get('itemSectionRenderer', {})
-                            contents_list = item_section.get('contents', [])
-                            
-                            for content_item in contents_list:
-                                grid = content_item.get('gridRenderer', {})
-                                items_list = grid.get('items', [])
-                                
-                                for video_item in items_list[:max_results]:
-                                    video_renderer = video_item.get('gridVideoRenderer', {})
-                                    if video_renderer:
-                                        video_id = video_renderer.get('videoId')
-                                        title = video_renderer.get('title', {}).get('runs', [{}])[0].get('text', '')
-                                        
-                                        if video_id:
-                                            videos.append({
-                                                'video_id': video_id,
-                                                'title': title,
-                                                'thumbnail': f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
-                                            })
-                                            
-                                            if len(videos) >= max_results:
-                                                break
+                for video_id, title in islice(_iter_grid_videos(video_data), max_results):
+                    videos.append({
+                        'video_id': video_id,
+                        'title': title,
+                        'thumbnail': f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
+                    })
             except Exception as e:
                 logger.error(f"Error parsing video list: {e}")
             
-            self._delay()
             return videos
             
         except Exception as e:
@@ -360,66 +518,95 @@ class YouTubeScraper:
     
     def get_video_stats(self, video_id: str) -> Optional[Dict]:
         """Scrape individual video page for view count and other stats"""
+        self._throttle()
+        return self._scrape_video_stats(video_id)
+    
+    def _scan_watch_chunk(self, body: bytearray, chunk: bytes, pending: List) -> List:
+        """Append a chunk to `body` and return the stats patterns still not matched"""
+        # Re-scan a little of the previous chunk in case a match straddles the boundary
+        start = max(0, len(body) - self.STREAM_OVERLAP)
+        body += chunk
+        return [pattern for pattern in pending if not pattern.search(body, start)]
+    
+    def _read_watch_page(self, response: requests.Response) -> bytearray:
+        """
+        Read a streamed watch page only until the view, like and upload-date
+        fields have all appeared; they sit in the player response near the top.
+        """
+        body = bytearray()
+        pending = [_VIEW_COUNT_RE, _LIKE_COUNT_RE, _UPLOAD_DATE_RE]
+        try:
+            for chunk in response.iter_content(chunk_size=self.STREAM_CHUNK_SIZE):
+                pending = self._scan_watch_chunk(body, chunk, pending)
+                if not pending:
+                    break
+        finally:
+            response.close()
+        return body
+    
+    def _scrape_video_stats(self, video_id: str) -> Optional[Dict]:
+        """Fetch and parse one watch page (no pacing delay)"""
         try:
             url = f"https://www.youtube.com/watch?v={video_id}"
-            response = self.session.get(url, timeout=10)
+            response = self.session.get(url, timeout=10, stream=True)
             
             if response.status_code != 200:
+                response.close()
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Look for view count in various locations
-            view_count = 0
-            
-            # Pattern 1: In meta tags
-            meta_views = soup.find('meta', {'itemprop': 'interactionCount'})
-            if meta_views:
-                view_count = int(meta_views.get('content', 0))
-            
-            # Pattern 2: In page text
-            if view_count == 0:
-                view_pattern = r'"viewCount":\s*"(\d+)"'
-                match = re.search(view_pattern, response.text)
-                if match:
-                    view_count = int(match.group(1))
-            
-            # Pattern 3: In text (e.g., "1,234,567 views")
-            if view_count == 0:
-                view_pattern = r'(\d{1,3}(?:,\d{3})*)\s*views'
-                match = re.search(view_pattern, response.text)
-                if match:
-                    view_text = match.group(1).replace(',', '')
-                    try:
-                        view_count = int(view_text)
-                    except:
-                        pass
-            
-            # Get like count (if available)
-            like_count = 0
-            like_pattern = r'"likeCount":\s*"(\d+)"'
-            match = re.search(like_pattern, response.text)
-            if match:
-                like_count = int(match.group(1))
-            
-            # Get published date
-            published_at = ''
-            pub_pattern = r'"uploadDate":\s*"([^"]+)"'
-            match = re.search(pub_pattern, response.text)
-            if match:
-                published_at = match.group(1)
-            
-            self._delay(0.5)  # Shorter delay for individual pages
-            
-            return {
-                'video_id': video_id,
-                'view_count': view_count,
-                'like_count': like_count,
-                'comment_count': 0,  # Hard to get without API
-                'published_at': published_at,
-            }
-            
+            return self._parse_watch_page(video_id, self._read_watch_page(response))
         except Exception as e:
             logger.error(f"Error scraping video stats for {video_id}: {e}")
             return None
+    
+    def _parse_watch_page(self, video_id: str, body: bytearray) -> Dict:
+        """Pull view/like counts and upload date out of a (partial) watch page"""
+        # Look for view count in various locations
+        view_count = 0
+        
+        # Pattern 1: In meta tags
+        match = _INTERACTION_COUNT_RE.search(body)
+        if match:
+            view_count = int(match.group(1))
+        
+        # Pattern 2: In page text
+        if view_count == 0:
+            match = _VIEW_COUNT_RE.search(body)
+            if match:
+                view_count = int(match.group(1))
+        
+        # Pattern 3: In text (e.g., "1,234,567 views")
+        if view_count == 0:
+            match = _VIEW_TEXT_RE.search(body)
+            if match:
+                view_text = match.group(1).replace(b',', b'')
+                try:
+                    view_count = int(view_text)
+                except:
+                    pass
+        
+        # Get like count (if available)
+        like_count = 0
+        match = _LIKE_COUNT_RE.search(body)
+        if match:
+            like_count = int(match.group(1))
+        
+        # Get published date
+        published_at = ''
+        match = _UPLOAD_DATE_RE.search(body)
+        if match:
+            published_at = match.group(1).decode('utf-8', 'replace')
+        
+        return {
+            'video_id': video_id,
+            'view_count': view_count,
+            'like_count': like_count,
+            'comment_count': 0,  # Hard to get without API
+            'published_at': published_at,
+        }
+
 
+@lru_cache(maxsize=1)
+def get_youtube_scraper() -> YouTubeScraper:
+    """Shared YouTubeScraper so its connection pool survives across requests"""
+    return YouTubeScraper()
@@ -3,20 +3,406 @@ YouTube Service Layer
 Handles all YouTube Data API interactions and data processing.
 """
 import re
-from typing import List, Dict, Optional
+import time
+import heapq
+import asyncio
+import threading
+import logging
+from collections import OrderedDict
+from functools import lru_cache
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Optional, Tuple
 from datetime import datetime, timezone, timedelta
+from zoneinfo import ZoneInfo
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest, build_http
 from django.conf import settings
+from django.core.cache import cache
+from api.services.youtube_scraper import get_youtube_scraper
+from api.utils.api_cache import APICache
+
+logger = logging.getLogger(__name__)
+
+# Every supported URL shape in one pass; match.lastgroup says which one matched.
+# Video URLs resolve to their uploader's channel.
+_URL_RE = re.compile(
+    r'/channel/(?P<chan>[a-zA-Z0-9_-]+)'
+    r'|/(?:c|user)/(?P<user>[a-zA-Z0-9_-]+)'
+    r'|/@(?P<handle>[a-zA-Z0-9_-]+)'
+    r'|(?:youtu\.be/|/shorts/|/embed/|/live/|/v/|/e/|[?&]v=)(?P<video>[a-zA-Z0-9_-]{11})'
+    r'|^(?P<cid>UC[a-zA-Z0-9_-]{22})$'
+)
+_CHANNEL_ID_RE = re.compile(r'UC[a-zA-Z0-9_-]{22}')
+
+# Per-process memo of resolved channel IDs: handle/username URLs otherwise cost
+# a page scrape or API call on every request. Resolved IDs never change.
+CHANNEL_ID_MEMO_SIZE = 4096
+CHANNEL_ID_MEMO_TTL = 3600
+_channel_id_memo = OrderedDict()
+_channel_id_memo_lock = threading.Lock()
+
+CHANNEL_INFO_KEY_PREFIX = 'youtube_channel_info'
+# Last channels.list ETag and parsed info, kept long after the info itself expires so
+# refetches can be conditional (If-None-Match) and skip re-parsing an unchanged channel
+CHANNEL_INFO_ETAG_TTL = 7 * 86400
+
+# search.list quota resets at midnight Pacific; once it is exhausted (or blocked),
+# every worker skips search calls until then instead of burning more requests
+SEARCH_DISABLED_KEY = 'youtube_search_disabled_until'
+_PACIFIC = ZoneInfo('America/Los_Angeles')
+
+
+# Read once: settings do not change while a worker runs
+USE_SEARCH_API = getattr(settings, 'USE_SEARCH_API', False)
+
+# Idle API connections shared by every thread in the process. Each call checks one
+# out and returns it afterwards, so connections (and their TLS sessions) are reused
+# across requests and across the short-lived threads requests fan out on. An
+# httplib2.Http is not thread-safe, so it is only ever used by one call at a time.
+HTTP_POOL_SIZE = 16
+_idle_https = []
+_idle_https_lock = threading.Lock()
+
+# Channel IDs for @handles that are often requested, suggested when a handle
+# cannot be resolved. Lookups go through the lower-cased copy.
+_KNOWN_CHANNELS = {
+    'hanaaaneyy': 'UCBoLezq04tdd45n5gG4dOng',
+    'mrzthoppi': 'UC0XCrZT2-n_Yyj4gAePKekg',
+    'CallMeShazzamTECH': 'UC9MQp8a5uhaIosZPHaoqEXQ',
+    'techwiser': None,  # Don't have this one
+}
+_KNOWN_CHANNELS_LOWER = {k.lower(): v for k, v in _KNOWN_CHANNELS.items()}
+
+
+def _checkout_http():
+    """Take an idle API connection from the pool, or open a new one"""
+    with _idle_https_lock:
+        if _idle_https:
+            return _idle_https.pop()
+    http = build_http()
+    http.timeout = YouTubeService.API_TIMEOUT
+    return http
+
+
+def _checkin_http(http):
+    """Return an API connection to the pool (closed instead if the pool is full)"""
+    with _idle_https_lock:
+        if len(_idle_https) < HTTP_POOL_SIZE:
+            _idle_https.append(http)
+            return
+    http.close()
+
+
+class _PooledHttpRequest(HttpRequest):
+    """API request that runs on a connection checked out of the process-wide pool"""
+    
+    def execute(self, http=None, num_retries=0):
+        if http is not None:
+            return super().execute(http=http, num_retries=num_retries)
+        http = _checkout_http()
+        try:
+            response = super().execute(http=http, num_retries=num_retries)
+        except HttpError:
+            # A complete error response; the connection is still usable
+            _checkin_http(http)
+            raise
+        except Exception:
+            # Any other failure drops the connection: it may be half-read or timed out
+            http.close()
+            raise
+        _checkin_http(http)
+        return response
+
+
+@lru_cache(maxsize=1)
+def _get_api_client(api_key):
+    """
+    YouTube API client for the process, shared by every thread and service instance.
+    build() parses the discovery document, so it runs once per worker rather than per
+    request. Sharing is safe because calls never touch the client's own Http: each
+    runs on a pooled connection (_PooledHttpRequest).
+    """
+    http = build_http()
+    http.timeout = YouTubeService.API_TIMEOUT
+    return build(
+        'youtube', 'v3', developerKey=api_key, http=http, requestBuilder=_PooledHttpRequest,
+        cache_discovery=False, static_discovery=True
+    )
+
+
+def _next_pacific_midnight() -> float:
+    """Unix timestamp of the next midnight Pacific Time (YouTube quota reset)"""
+    tomorrow = datetime.now(_PACIFIC) + timedelta(days=1)
+    return tomorrow.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+
+def _is_short_duration(duration: str) -> bool:
+    """True if an ISO 8601 duration (PT#M#S) is 60 seconds or less"""
+    # Anything with hours (or days, which lack the 'PT' prefix) is too long
+    if not duration or not duration.startswith('PT') or 'H' in duration:
+        return False
+    
+    # Parse the minutes and seconds of PT#M#S with plain string scans
+    minutes_end = duration.find('M')
+    seconds_end = duration.find('S')
+    try:
+        minutes = int(duration[2:minutes_end]) if minutes_end >= 0 else 0
+        seconds = int(duration[minutes_end + 1 if minutes_end >= 0 else 2:seconds_end]) if seconds_end >= 0 else 0
+    except ValueError:
+        return False
+    
+    return minutes * 60 + seconds <= 60
+
+
+@lru_cache(maxsize=4096)
+def _parse_published(published_at: str):
+    """
+    Parse a publishedAt timestamp (always UTC, '...Z') into (epoch seconds, ISO string).
+    Cached: the same videos recur across re-analyses of a channel.
+    """
+    published_datetime = datetime.fromisoformat(published_at[:-1] + '+00:00')
+    return published_datetime.timestamp(), published_datetime.isoformat()
+
+
+def _build_video_data(item: Dict, now_ts: float) -> Dict:
+    """Turn one videos.list item into the video dictionary returned by get_video_statistics"""
+    # Handle videos with hidden statistics
+    statistics = item.get('statistics', {})
+    snippet = item['snippet']
+    duration = item['contentDetails'].get('duration', '')
+    
+    # Check if video is live - check both liveBroadcastContent and liveStreamingDetails
+    live_status = snippet.get('liveBroadcastContent', 'none')
+    live_streaming_details = item.get('liveStreamingDetails', {})
+    
+    # Video is live if:
+    # 1. liveBroadcastContent is 'live', OR
+    # 2. liveStreamingDetails exists (indicates it's a live broadcast - even if concurrentViewers is null)
+    #    For 24/7 streams, liveStreamingDetails exists even when temporarily offline
+    concurrent_viewers = live_streaming_details.get('concurrentViewers')
+    has_live_streaming_details = bool(live_streaming_details)
+    # IMPORTANT: For 24/7 live streams, liveStreamingDetails exists even without concurrentViewers
+    # So we check for liveStreamingDetails OR liveBroadcastContent='live'.
+    # This is the authoritative flag: callers trust is_live without re-checking the raw fields.
+    is_live = (live_status == 'live') or has_live_streaming_details
+    is_upcoming = live_status == 'upcoming'
+    
+    # Debug: Log all videos with live-related data for troubleshooting
+    if live_status != 'none' or has_live_streaming_details:
+        logger.debug(
+            "🔍 Live check for '%s': liveBroadcastContent=%s, has_liveStreamingDetails=%s, concurrentViewers=%s, is_live=%s",
+            snippet['title'][:50], live_status, has_live_streaming_details, concurrent_viewers, is_live
+        )
+    
+    published_at = snippet['publishedAt']
+    published_ts, published_iso = _parse_published(published_at)
+    hours_since_publish = (now_ts - published_ts) / 3600.0
+    
+    view_count = int(statistics.get('viewCount') or 0)
+    
+    # Calculate trending score: views per hour (for videos published in last 3 hours)
+    # Include videos published up to 3 hours ago (including 0 hours = just published)
+    trending_score = 0
+    is_trending = False
+    if hours_since_publish <= 3 and hours_since_publish >= 0:
+        # For videos just published (hours < 0.1), use view count as score
+        if hours_since_publish < 0.1:
+            trending_score = view_count * 10  # Boost for very recent videos
+        else:
+            trending_score = view_count / hours_since_publish if hours_since_publish > 0 else view_count
+        is_trending = True
+    
+    video_data = {
+        'video_id': item['id'],
+        'title': snippet['title'],
+        'description': snippet['description'][:200] if snippet.get('description') else '',
+        'thumbnail': snippet['thumbnails'].get('medium', {}).get('url', ''),
+        'published_at': published_at,
+        'published_datetime': published_iso,
+        'hours_since_publish': round(hours_since_publish, 2),
+        'view_count': view_count,
+        'like_count': int(statistics.get('likeCount') or 0),
+        'comment_count': int(statistics.get('commentCount') or 0),
+        'duration': duration,
+        'url': f"https://www.youtube.com/watch?v={item['id']}",
+        'is_short': _is_short_duration(duration),
+        'is_live': is_live,
+        'is_upcoming': is_upcoming,
+        'live_viewers': int(concurrent_viewers) if concurrent_viewers is not None else None,
+        'live_broadcast_content': live_status,  # Store the original value for debugging
+        'trending_score': round(trending_score, 2),
+        'is_trending': is_trending
+    }
+    
+    # Debug logging for live videos - log more details
+    if is_live:
+        logger.debug(
+            "🔴 LIVE VIDEO DETECTED in get_video_statistics: '%s' - liveBroadcastContent=%s, concurrentViewers=%s, is_live=%s, has_liveStreamingDetails=%s",
+            snippet['title'][:50], live_status, concurrent_viewers, is_live, has_live_streaming_details
+        )
+    elif live_status != 'none' or has_live_streaming_details:
+        # Log videos that have live-related data but weren't marked as live
+        logger.debug(
+            "⚠️ Video with live data but not marked live: '%s' - liveBroadcastContent=%s, has_liveStreamingDetails=%s, concurrentViewers=%s",
+            snippet['title'][:50], live_status, has_live_streaming_details, concurrent_viewers
+        )
+    
+    return video_data
+
+
+# Ranking keys; view_count and trending_score are numeric from ingest (_build_video_data)
+_by_views = itemgetter('view_count')
+_by_trending_score = itemgetter('trending_score')
+
+
+def _to_int(value) -> int:
+    """Coerce a count that may be None or a string to int (0 if unusable)"""
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return int(value) if value.isdigit() else 0
+    return int(value)
+
+
+def _live_sort_key(video: Dict) -> Tuple[int, int]:
+    """Rank live videos by concurrent viewers, then total view count - higher is better"""
+    return (_to_int(video.get('live_viewers')), _to_int(video.get('view_count', 0)))
+
+
+def _classify_videos(videos: List[Dict], now_ts: float) -> Tuple[List[Dict], List[Dict], List[Dict], List[Dict], List[Dict], int]:
+    """
+    One pass over the merged videos: split videos/shorts, recalculate trending
+    status (in case hours changed during processing) and pick out live videos.
+    Returns (regular, shorts, trending_videos, trending_shorts, live, upcoming_count).
+    Pure computation with no I/O, kept apart from the fetch code that calls it.
+    """
+    regular_videos: List[Dict] = []
+    shorts: List[Dict] = []
+    trending_videos: List[Dict] = []
+    trending_shorts: List[Dict] = []
+    live_videos: List[Dict] = []
+    upcoming_count = 0
+    # publishedAt is UTC, so anything inside the 3-hour window is dated today or
+    # yesterday (UTC); older videos are ruled out without parsing the timestamp
+    now_utc = datetime.fromtimestamp(now_ts, timezone.utc)
+    recent_prefixes = (now_utc.strftime('%Y-%m-%d'), (now_utc - timedelta(days=1)).strftime('%Y-%m-%d'))
+    for v in videos:
+        is_short = v['is_short']
+        (shorts if is_short else regular_videos).append(v)
+        
+        published_at = v.get('published_at')
+        if published_at and not published_at.startswith(recent_prefixes):
+            v['is_trending'] = False
+            v['trending_score'] = 0
+        elif published_at:
+            try:
+                hours_since = (now_ts - _parse_published(published_at)[0]) / 3600.0
+                v['hours_since_publish'] = round(hours_since, 2)
+                
+                # Update trending status if within 3 hours (including 0 = just published)
+                if hours_since <= 3 and hours_since >= 0:
+                    v['is_trending'] = True
+                    view_count = v.get('view_count', 0)
+                    
+                    # Calculate trending score
+                    if hours_since < 0.1:  # Very recent (< 6 minutes)
+                        v['trending_score'] = view_count * 10
+                    else:
+                        v['trending_score'] = view_count / hours_since if hours_since > 0 else view_count
+                else:
+                    v['is_trending'] = False
+                    v['trending_score'] = 0
+            except Exception as e:
+                logger.warning(f"Error calculating trending for video {v.get('video_id')}: {e}")
+                v['is_trending'] = False
+        
+        # Double-check trending status with explicit validation
+        if v.get('is_trending', False):
+            hours = v.get('hours_since_publish', 999)
+            if hours <= 3 and hours >= 0:
+                (trending_shorts if is_short else trending_videos).append(v)
+            else:
+                # Clear the flag if hours don't match
+                v['is_trending'] = False
+        
+        # is_live is normalized when the video is ingested (_build_video_data)
+        if v['is_live']:
+            live_videos.append(v)
+        elif v['live_broadcast_content'] == 'upcoming':
+            upcoming_count += 1
+    
+    return regular_videos, shorts, trending_videos, trending_shorts, live_videos, upcoming_count
 
 
 class YouTubeService:
     """Service class for interacting with YouTube Data API v3"""
     
+    # videos.list calls that may run while later ID pages are still being fetched
+    STATS_PIPELINE_WORKERS = 4
+    # Seconds before a stalled API connection is abandoned (googleapiclient default: 60)
+    API_TIMEOUT = 30
+    # Partial responses: only the JSON fields the parsers below actually read
+    VIDEO_FIELDS = (
+        'items(id,snippet(title,description,publishedAt,thumbnails/medium/url,liveBroadcastContent),'
+        'statistics(viewCount,likeCount,commentCount),contentDetails/duration,liveStreamingDetails)'
+    )
+    PLAYLIST_ITEM_FIELDS = 'items/contentDetails/videoId,nextPageToken'
+    CHANNEL_FIELDS = (
+        'etag,items(snippet(title,description,customUrl,publishedAt,country,'
+        'thumbnails(high/url,medium/url,default/url)),'
+        'contentDetails/relatedPlaylists/uploads,statistics(subscriberCount,videoCount,viewCount))'
+    )
+    # Process-wide copy of the search.list disabled-until timestamp (see _search)
+    _search_disabled_until = None
+    # Concurrent videos.list calls for one get_video_statistics request
+    STATS_BATCH_WORKERS = 8
+    # Recent uploads ranked per requested popular video when search.list is disabled
+    POPULARITY_CANDIDATE_FACTOR = 4
+    
     def __init__(self):
         self.api_key = settings.YOUTUBE_API_KEY
         if not self.api_key or self.api_key == 'your_youtube_api_key_here':
             raise ValueError("YOUTUBE_API_KEY not found or not configured. Please add your YouTube API key to the .env file.")
-        self.youtube = build('youtube', 'v3', developerKey=self.api_key)
+        # Runs API calls made on the service's own initiative, as (endpoint, func, quota_cost).
+        # CachedYouTubeService points it at _call_api so they are metered like any other call.
+        self.metered_call = lambda endpoint, func, quota_cost: func()
+    
+    @property
+    def youtube(self):
+        """YouTube API client, shared by every service instance in the process"""
+        return _get_api_client(self.api_key)
+    
+    def _search(self, **params) -> Optional[Dict]:
+        """
+        Run search.list, or return None while search is disabled after a quota/403 error.
+        The disabled-until time is shared through the Django cache so all workers skip it.
+        """
+        now = time.time()
+        disabled_until = YouTubeService._search_disabled_until
+        if disabled_until is None or disabled_until <= now:
+            try:
+                disabled_until = cache.get(SEARCH_DISABLED_KEY)
+            except Exception:
+                disabled_until = None
+            YouTubeService._search_disabled_until = disabled_until
+        if disabled_until and now < disabled_until:
+            logger.info(f"Search API disabled until quota reset, skipping search for {params.get('q') or params.get('channelId')}")
+            return None
+        
+        try:
+            return self.youtube.search().list(**params).execute()
+        except Exception as e:
+            error_msg = str(e)
+            if '403' in error_msg or 'quota' in error_msg.lower():
+                disabled_until = _next_pacific_midnight()
+                YouTubeService._search_disabled_until = disabled_until
+                try:
+                    cache.set(SEARCH_DISABLED_KEY, disabled_until, timeout=int(disabled_until - now) + 1)
+                except Exception:
+                    pass
+            raise
     
     def extract_channel_id(self, channel_url: str) -> Optional[str]:
         """
@@ -27,29 +413,61 @@ class YouTubeService:
         - https://www.youtube.com/@ChannelHandle
         - https://youtube.com/@ChannelHandle
         """
-        # Pattern 1: /channel/UCxxxxx
-        match = re.search(r'/channel/([a-zA-Z0-9_-]+)', channel_url)
-        if match:
-            return match.group(1)
+        # Bare channel IDs (the common internal/cached call) need no URL parsing or memo
+        if len(channel_url) == 24 and channel_url.startswith('UC') and _CHANNEL_ID_RE.fullmatch(channel_url):
+            return channel_url
+        
+        now = time.monotonic()
+        with _channel_id_memo_lock:
+            memo = _channel_id_memo.get(channel_url)
+            if memo and memo[1] > now:
+                _channel_id_memo.move_to_end(channel_url)
+                return memo[0]
+        
+        channel_id = self._resolve_channel_id(channel_url)
+        
+        # Failed lookups are not memoized so they can be retried
+        if channel_id:
+            with _channel_id_memo_lock:
+                _channel_id_memo[channel_url] = (channel_id, now + CHANNEL_ID_MEMO_TTL)
+                _channel_id_memo.move_to_end(channel_url)
+                while len(_channel_id_memo) > CHANNEL_ID_MEMO_SIZE:
+                    _channel_id_memo.popitem(last=False)
+        return channel_id
+    
+    def _resolve_channel_id(self, channel_url: str) -> Optional[str]:
+        """Resolve a channel URL to its channel ID (skips the in-process memo, uses the shared cache)"""
+        match = _URL_RE.search(channel_url)
+        if not match:
+            return None
+        kind, value = match.lastgroup, match.group(match.lastgroup)
         
-        # Pattern 2: /c/ChannelName or /user/ChannelName
-        match = re.search(r'/(?:c|user)/([a-zA-Z0-9_-]+)', channel_url)
-        if match:
-            return self._get_channel_id_from_username(match.group(1))
+        # /channel/UCxxxxx, or already just a channel ID
+        if kind in ('chan', 'cid'):
+            return value
         
-        # Pattern 3: /@ChannelHandle
-        match = re.search(r'/@([a-zA-Z0-9_-]+)', channel_url)
-        if match:
-            channel_id = self._get_channel_id_from_handle(match.group(1))
+        # Lookups cost a scrape or API units (up to 400 via Search), so share
+        # them across processes. Handles and usernames are case-insensitive.
+        cache_key = f'youtube_channel_id:{kind}:{value if kind == "video" else value.lower()}'
+        channel_id = cache.get(cache_key)
+        if channel_id is None:
+            channel_id = self._lookup_channel_id(kind, value)
             if channel_id:
-                return channel_id
-            # If search API fails, return None (will be handled by caller)
+                cache.set(cache_key, channel_id, timeout=APICache._get_ttl('channel_id'))
+        return channel_id
+    
+    def _lookup_channel_id(self, kind: str, value: str) -> Optional[str]:
+        """Resolve a username, handle or video ID to a channel ID via scraping or the API"""
+        # /c/ChannelName or /user/ChannelName
+        if kind == 'user':
+            return self._get_channel_id_from_username(value)
         
-        # If it's already just a channel ID
-        if re.match(r'^UC[a-zA-Z0-9_-]{22}$', channel_url):
-            return channel_url
+        # /@ChannelHandle - None if scraping and search both fail (handled by caller)
+        if kind == 'handle':
+            return self._get_channel_id_from_handle(value)
         
-        return None
+        # Video, Short, embed or youtu.be link: use the uploader's channel
+        return self._get_channel_id_from_video(value)
     
     def _get_channel_id_from_username(self, username: str) -> Optional[str]:
         """Get channel ID from username"""
@@ -65,38 +483,53 @@ class YouTubeService:
             pass
         return None
     
+    def _get_channel_id_from_video(self, video_id: str) -> Optional[str]:
+        """Get the uploader's channel ID from a video ID (one videos.list unit, see metered_call)"""
+        def _fetch():
+            try:
+                response = self.youtube.videos().list(
+                    part='snippet',
+                    id=video_id,
+                    fields='items(snippet(channelId))'
+                ).execute()
+            except HttpError as e:
+                # Quota, key and network errors are reported, not mistaken for a bad link
+                logger.warning(f"Could not look up video {video_id}: {e}")
+                raise
+            if response.get('items'):
+                return response['items'][0]['snippet']['channelId']
+            return None
+        
+        return self.metered_call('channel_id', _fetch, 1)
+    
     def _get_channel_id_from_handle(self, handle: str) -> Optional[str]:
         """Get channel ID from channel handle (e.g., @ChannelName)"""
         # First, try web scraping (no quota cost)
         try:
-            from api.services.youtube_scraper import YouTubeScraper
-            scraper = YouTubeScraper()
+            scraper = get_youtube_scraper()
             url = f"https://www.youtube.com/@{handle}"
             channel_id = scraper.extract_channel_id_from_url(url)
             if channel_id:
-                print(f"✅ Extracted channel ID {channel_id} from @{handle} using web scraping")
+                logger.info(f"✅ Extracted channel ID {channel_id} from @{handle} using web scraping")
                 return channel_id
         except Exception as e:
-            print(f"Web scraping failed for @{handle}: {e}")
+            logger.warning(f"Web scraping failed for @{handle}: {e}")
         
         # Fallback to Search API (if enabled and available)
-        from django.conf import settings
-        use_search_api = getattr(settings, 'USE_SEARCH_API', False)
-        if not use_search_api:
-            print(f"⚠️ Search API disabled. Web scraping failed for @{handle}. Please use channel ID URL format.")
+        if not USE_SEARCH_API:
+            logger.warning(f"⚠️ Search API disabled. Web scraping failed for @{handle}. Please use channel ID URL format.")
             return None
         
         # Method 2: Try search API with exact handle URL format
         try:
             # Search for the exact URL pattern
             search_query = f"youtube.com/@{handle}"
-            request = self.youtube.search().list(
+            response = self._search(
                 part='snippet',
                 q=search_query,
                 type='channel',
                 maxResults=20
-            )
-            response = request.execute()
+            ) or {}
             if response.get('items'):
                 # Look for exact match - check customUrl field
                 for item in response['items']:
@@ -131,21 +564,20 @@ class YouTubeService:
         except Exception as e:
             error_msg = str(e)
             if '403' in error_msg or 'blocked' in error_msg.lower() or 'quota' in error_msg.lower():
-                print(f"Search API unavailable for handle extraction: {error_msg[:100]}")
+                logger.warning(f"Search API unavailable for handle extraction: {error_msg[:100]}")
                 # Don't raise, continue to next method
             else:
-                print(f"Error in handle search with URL pattern: {e}")
+                logger.warning(f"Error in handle search with URL pattern: {e}")
         
         # Method 3: Try search with @ prefix only
         try:
             search_query = f"@{handle}"
-            request = self.youtube.search().list(
+            response = self._search(
                 part='snippet',
                 q=search_query,
                 type='channel',
                 maxResults=10
-            )
-            response = request.execute()
+            ) or {}
             if response.get('items'):
                 for item in response['items']:
                     snippet = item.get('snippet', {})
@@ -161,20 +593,19 @@ class YouTubeService:
         except Exception as e:
             error_msg = str(e)
             if '403' in error_msg or 'blocked' in error_msg.lower() or 'quota' in error_msg.lower():
-                print(f"Search API unavailable (blocked/quota): {error_msg[:100]}")
+                logger.warning(f"Search API unavailable (blocked/quota): {error_msg[:100]}")
                 # Don't raise, continue to next method
             else:
-                print(f"Error in handle search with @ prefix: {e}")
+                logger.warning(f"Error in handle search with @ prefix: {e}")
         
         # Method 4: Try search without @ prefix
         try:
-            request = self.youtube.search().list(
+            response = self._search(
                 part='snippet',
                 q=handle,
                 type='channel',
                 maxResults=10
-            )
-            response = request.execute()
+            ) or {}
             if response.get('items'):
                 for item in response['items']:
                     snippet = item.get('snippet', {})
@@ -195,10 +626,10 @@ class YouTubeService:
         except Exception as e:
             error_msg = str(e)
             if '403' in error_msg or 'blocked' in error_msg.lower() or 'quota' in error_msg.lower():
-                print(f"Search API unavailable (blocked/quota): {error_msg[:100]}")
+                logger.warning(f"Search API unavailable (blocked/quota): {error_msg[:100]}")
                 # Don't raise, just return None
             else:
-                print(f"Error in handle search without @ prefix: {e}")
+                logger.warning(f"Error in handle search without @ prefix: {e}")
         
         return None
     
@@ -215,12 +646,23 @@ class YouTubeService:
         - status: privacyStatus, isLinked, longUploadsStatus, madeForKids
         - snippet.localized: localized title and description
         """
+        etag_key = f'{CHANNEL_INFO_KEY_PREFIX}:etag:{channel_id}'
         try:
             request = self.youtube.channels().list(
                 part='snippet,contentDetails,statistics',
-                id=channel_id
+                id=channel_id,
+                fields=self.CHANNEL_FIELDS
             )
-            response = request.execute()
+            previous = cache.get(etag_key)
+            if previous:
+                request.headers['If-None-Match'] = previous['etag']
+            try:
+                response = request.execute()
+            except HttpError as e:
+                if previous and e.resp.status == 304:
+                    logger.debug(f"Channel {channel_id} not modified since last fetch")
+                    return previous['info']
+                raise
             
             if not response.get('items'):
                 raise ValueError(f"Channel {channel_id} not found or inaccessible")
@@ -234,7 +676,7 @@ class YouTubeService:
             # Get thumbnails - try different sizes
             thumbnails = snippet.get('thumbnails', {})
             
-            return {
+            channel_info = {
                 'channel_id': channel_id,
                 'channel_name': snippet.get('title', 'Unknown Channel'),
                 'channel_description': snippet.get('description', ''),
@@ -255,6 +697,9 @@ class YouTubeService:
                 # Full snippet for debugging
                 'snippet_title': snippet.get('title'),  # Explicit title for debugging
             }
+            if response.get('etag'):
+                cache.set(etag_key, {'etag': response['etag'], 'info': channel_info}, timeout=CHANNEL_INFO_ETAG_TTL)
+            return channel_info
         except Exception as e:
             error_msg = str(e)
             if 'quota' in error_msg.lower() or 'quotaExceeded' in error_msg:
@@ -269,12 +714,13 @@ class YouTubeService:
                 )
             raise ValueError(f"Could not get uploads playlist for channel {channel_id}: {error_msg}")
     
-    def get_last_n_videos(self, playlist_id: str, max_results: int = 20) -> List[str]:
+    def get_last_n_videos(self, playlist_id: str, max_results: int = 20, on_page: Optional[Callable[[List[str]], None]] = None) -> List[str]:
         """
         Step 1: Get the last N video IDs from a playlist.
         Returns list of video IDs (newest first).
         Note: playlistItems are returned in reverse chronological order by default.
         Fetches ALL pages if needed to reach max_results.
+        `on_page` is called with each page's new IDs as soon as the page arrives.
         """
         video_ids = []
         try:
@@ -283,9 +729,10 @@ class YouTubeService:
             
             # First page
             request = self.youtube.playlistItems().list(
-                part='contentDetails,snippet',
+                part='contentDetails',
                 playlistId=playlist_id,
-                maxResults=items_per_page
+                maxResults=items_per_page,
+                fields=self.PLAYLIST_ITEM_FIELDS
             )
             response = request.execute()
             
@@ -293,14 +740,16 @@ class YouTubeService:
                 if len(video_ids) >= max_results:
                     break
                 video_ids.append(item['contentDetails']['videoId'])
+            if on_page and video_ids:
+                on_page(list(video_ids))
             
-            print(f"Playlist page 1: Got {len(response.get('items', []))} items (total: {len(video_ids)})")
+            logger.info(f"Playlist page 1: Got {len(response.get('items', []))} items (total: {len(video_ids)})")
             
             # Handle pagination - continue until we reach max_results or run out of pages
             page_num = 1
             while len(video_ids) < max_results:
                 if 'nextPageToken' not in response:
-                    print(f"No more pages available. Total fetched: {len(video_ids)}")
+                    logger.info(f"No more pages available. Total fetched: {len(video_ids)}")
                     break
                     
                 page_num += 1
@@ -309,50 +758,54 @@ class YouTubeService:
                 
                 try:
                     request = self.youtube.playlistItems().list(
-                        part='contentDetails,snippet',
+                        part='contentDetails',
                         playlistId=playlist_id,
                         maxResults=items_to_fetch,
-                        pageToken=response['nextPageToken']
+                        pageToken=response['nextPageToken'],
+                        fields=self.PLAYLIST_ITEM_FIELDS
                     )
                     response = request.execute()
                     
                     page_items = response.get('items', [])
                     page_count = len(page_items)
                     
+                    page_start = len(video_ids)
                     for item in page_items:
                         if len(video_ids) >= max_results:
                             break
                         video_ids.append(item['contentDetails']['videoId'])
+                    if on_page and len(video_ids) > page_start:
+                        on_page(video_ids[page_start:])
                     
-                    print(f"Playlist page {page_num}: Got {page_count} items (total: {len(video_ids)})")
+                    logger.info(f"Playlist page {page_num}: Got {page_count} items (total: {len(video_ids)})")
                     
                     # If this page returned fewer than requested, we've reached the end
                     if page_count < items_to_fetch:
-                        print(f"Reached end of playlist (last page had {page_count} items)")
+                        logger.info(f"Reached end of playlist (last page had {page_count} items)")
                         break
                         
                     # Safety check to avoid infinite loops
                     if page_num > 20:  # Max 20 pages = 1000 videos
-                        print(f"⚠️ Reached maximum page limit (20 pages = ~1000 videos)")
+                        logger.warning(f"⚠️ Reached maximum page limit (20 pages = ~1000 videos)")
                         break
                         
                 except Exception as e:
                     error_msg = str(e)
                     if 'quota' in error_msg.lower():
-                        print(f"⚠️ Quota exceeded during pagination, using {len(video_ids)} videos collected")
+                        logger.warning(f"⚠️ Quota exceeded during pagination, using {len(video_ids)} videos collected")
                         break
                     else:
-                        print(f"Error on page {page_num}: {e}")
+                        logger.warning(f"Error on page {page_num}: {e}")
                         break
                 
         except Exception as e:
             error_msg = str(e)
-            print(f"Error fetching playlist items: {e}")
+            logger.warning(f"Error fetching playlist items: {e}")
             
             # Check for quota exceeded first
             if 'quota' in error_msg.lower() or 'quotaExceeded' in error_msg:
                 if video_ids:
-                    print("⚠️ API quota exceeded, but continuing with available videos")
+                    logger.warning("⚠️ API quota exceeded, but continuing with available videos")
                     return video_ids
                 else:
                     raise ValueError(
@@ -363,7 +816,7 @@ class YouTubeService:
             
             # Don't fail completely if we got some videos
             if video_ids:
-                print(f"Warning: Got {len(video_ids)} videos before error occurred")
+                logger.warning(f"Warning: Got {len(video_ids)} videos before error occurred")
                 return video_ids
             else:
                 # Only raise if we got zero videos
@@ -376,6 +829,18 @@ class YouTubeService:
         
         return video_ids[:max_results]  # Ensure we don't exceed max_results
     
+    def _fetch_video_batch(self, batch: List[str]) -> List[Dict]:
+        """Fetch raw videos.list items for up to 50 video IDs"""
+        response = self.youtube.videos().list(
+            part='statistics,snippet,contentDetails,liveStreamingDetails',
+            id=','.join(batch),
+            fields=self.VIDEO_FIELDS
+        ).execute()
+        
+        items_returned = response.get('items', [])
+        logger.debug("Requested %s video IDs, got %s back", len(batch), len(items_returned))
+        return items_returned
+    
     def get_video_statistics(self, video_ids: List[str]) -> List[Dict]:
         """
         Step 2: Get statistics and details for multiple videos.
@@ -384,103 +849,30 @@ class YouTubeService:
         if not video_ids:
             return []
         
-        videos_data = []
+        # Dict keeps caller order while dropping duplicate IDs (fewer, fuller batches)
+        video_ids = list(dict.fromkeys(video_ids))
         try:
             # YouTube API allows up to 50 video IDs per request
             # Process in batches to ensure we get all videos
-            for i in range(0, len(video_ids), 50):
-                batch = video_ids[i:i+50]
-                if not batch:
-                    continue
-                    
-                request = self.youtube.videos().list(
-                    part='statistics,snippet,contentDetails,liveStreamingDetails',
-                    id=','.join(batch)
-                )
-                response = request.execute()
-                
-                items_returned = response.get('items', [])
-                print(f"Requested {len(batch)} video IDs, got {len(items_returned)} back")
-                
-                for item in items_returned:
-                    # Handle videos with hidden statistics
-                    statistics = item.get('statistics', {})
-                    
-                    # Check if video is live - check both liveBroadcastContent and liveStreamingDetails
-                    live_status = item['snippet'].get('liveBroadcastContent', 'none')
-                    live_streaming_details = item.get('liveStreamingDetails', {})
-                    
-                    # Video is live if:
-                    # 1. liveBroadcastContent is 'live', OR
-                    # 2. liveStreamingDetails exists (indicates it's a live broadcast - even if concurrentViewers is null)
-                    #    For 24/7 streams, liveStreamingDetails exists even when temporarily offline
-                    concurrent_viewers = live_streaming_details.get('concurrentViewers')
-                    has_live_streaming_details = bool(live_streaming_details)
-                    # IMPORTANT: For 24/7 live streams, liveStreamingDetails exists even without concurrentViewers
-                    # So we check for liveStreamingDetails OR liveBroadcastContent='live'
-                    is_live = (live_status == 'live') or has_live_streaming_details
-                    is_upcoming = live_status == 'upcoming'
-                    
-                    # Debug: Log all videos with live-related data for troubleshooting
-                    if live_status != 'none' or has_live_streaming_details:
-                        print(f"🔍 Live check for '{item['snippet']['title'][:50]}': liveBroadcastContent={live_status}, has_liveStreamingDetails={has_live_streaming_details}, concurrentViewers={concurrent_viewers}, is_live={is_live}")
-                    
-                    published_at = item['snippet']['publishedAt']
-                    published_datetime = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
-                    now = datetime.now(timezone.utc)
-                    hours_since_publish = (now - published_datetime).total_seconds() / 3600
-                    
-                    view_count = int(statistics.get('viewCount', 0)) if statistics.get('viewCount') else 0
-                    
-                    # Calculate trending score: views per hour (for videos published in last 3 hours)
-                    # Include videos published up to 3 hours ago (including 0 hours = just published)
-                    trending_score = 0
-                    is_trending = False
-                    if hours_since_publish <= 3 and hours_since_publish >= 0:
-                        # For videos just published (hours < 0.1), use view count as score
-                        if hours_since_publish < 0.1:
-                            trending_score = view_count * 10  # Boost for very recent videos
-                        else:
-                            trending_score = view_count / hours_since_publish if hours_since_publish > 0 else view_count
-                        is_trending = True
-                    
-                    video_data = {
-                        'video_id': item['id'],
-                        'title': item['snippet']['title'],
-                        'description': item['snippet']['description'][:200] if item['snippet'].get('description') else '',
-                        'thumbnail': item['snippet']['thumbnails'].get('medium', {}).get('url', ''),
-                        'published_at': published_at,
-                        'published_datetime': published_datetime.isoformat(),
-                        'hours_since_publish': round(hours_since_publish, 2),
-                        'view_count': view_count,
-                        'like_count': int(statistics.get('likeCount', 0)) if statistics.get('likeCount') else 0,
-                        'comment_count': int(statistics.get('commentCount', 0)) if statistics.get('commentCount') else 0,
-                        'duration': item['contentDetails'].get('duration', ''),
-                        'url': f"https://www.youtube.com/watch?v={item['id']}",
-                        'is_short': self._is_short_video(item['contentDetails'].get('duration', '')),
-                        'is_live': is_live,
-                        'is_upcoming': is_upcoming,
-                        'live_viewers': int(concurrent_viewers) if concurrent_viewers is not None else None,
-                        'live_broadcast_content': live_status,  # Store the original value for debugging
-                        'trending_score': round(trending_score, 2),
-                        'is_trending': is_trending
-                    }
-                    
-                    # Debug logging for live videos - log more details
-                    if is_live:
-                        print(f"🔴 LIVE VIDEO DETECTED in get_video_statistics: '{item['snippet']['title'][:50]}' - liveBroadcastContent={live_status}, concurrentViewers={concurrent_viewers}, is_live={is_live}, has_liveStreamingDetails={has_live_streaming_details}")
-                    elif live_status != 'none' or has_live_streaming_details:
-                        # Log videos that have live-related data but weren't marked as live
-                        print(f"⚠️ Video with live data but not marked live: '{item['snippet']['title'][:50]}' - liveBroadcastContent={live_status}, has_liveStreamingDetails={has_live_streaming_details}, concurrentViewers={concurrent_viewers}")
-                    
-                    videos_data.append(video_data)
-                
+            batches = [video_ids[i:i+50] for i in range(0, len(video_ids), 50)]
+            if len(batches) > 1:
+                # Batches are independent round-trips, so fetch them concurrently
+                with ThreadPoolExecutor(max_workers=min(self.STATS_BATCH_WORKERS, len(batches))) as executor:
+                    batch_items = list(executor.map(self._fetch_video_batch, batches))
+            else:
+                batch_items = [self._fetch_video_batch(batches[0])]
+            
+            # One clock read for every video's age
+            now_ts = time.time()
+            videos_data = [_build_video_data(item, now_ts) for items in batch_items for item in items]
+            
+            for batch, items_returned in zip(batches, batch_items):
                 # If we got fewer items than requested, log it but continue
                 if len(items_returned) < len(batch):
-                    print(f"Warning: Only got {len(items_returned)}/{len(batch)} videos from API (some may be private/deleted)")
+                    logger.warning(f"Warning: Only got {len(items_returned)}/{len(batch)} videos from API (some may be private/deleted)")
         except Exception as e:
             error_msg = str(e)
-            print(f"Error fetching video statistics: {e}")
+            logger.warning(f"Error fetching video statistics: {e}")
             # Check for API key or permission issues
             if 'expired' in error_msg.lower() or '403' in error_msg or '400' in error_msg or 'blocked' in error_msg.lower():
                 raise ValueError(
@@ -498,96 +890,169 @@ class YouTubeService:
         YouTube Shorts are 60 seconds or less.
         Duration format: PT#M#S (e.g., PT1M30S = 1 minute 30 seconds)
         """
-        if not duration:
-            return False
-        
-        # Parse ISO 8601 duration format
-        match = re.match(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?', duration)
-        if not match:
-            return False
-        
-        hours = int(match.group(1) or 0)
-        minutes = int(match.group(2) or 0)
-        seconds = int(match.group(3) or 0)
-        
-        total_seconds = hours * 3600 + minutes * 60 + seconds
-        return total_seconds <= 60
+        return _is_short_duration(duration)
     
     def rank_videos_by_views(self, videos: List[Dict], reverse: bool = True) -> List[Dict]:
         """Rank videos by view count (highest to lowest by default)"""
-        return sorted(videos, key=lambda x: x['view_count'], reverse=reverse)
+        return sorted(videos, key=_by_views, reverse=reverse)
     
     def fetch_channel_videos_by_popularity(self, channel_id: str, max_results: int = 50) -> List[Dict]:
         """
-        Fetch videos from a channel sorted by view count (popularity) using search API.
-        This method uses search.list with order=viewCount to get videos sorted by popularity.
+        Fetch videos from a channel sorted by view count (popularity).
+        Ranks the channel's recent uploads (channels.list + playlistItems.list + videos.list,
+        about 1 quota unit per 50 videos). With USE_SEARCH_API enabled, uses search.list
+        instead (100 units per page) for a strict top-by-views across the whole channel.
+        """
+        if USE_SEARCH_API:
+            return self._search_videos_by_popularity(channel_id, max_results)
+        
+        try:
+            _, videos = self._fetch_channel_info_and_uploads(
+                channel_id, max_results * self.POPULARITY_CANDIDATE_FACTOR
+            )
+        except Exception as e:
+            logger.warning(f"Error fetching videos by popularity: {e}")
+            return []
+        return self.rank_videos_by_views(videos)[:max_results]
+    
+    def _search_videos_by_popularity(self, channel_id: str, max_results: int) -> List[Dict]:
+        """
+        Fetch videos sorted by view count using search.list with order=viewCount.
         Fetches multiple pages if needed to get enough results.
         """
         all_videos = []
         video_ids = []
+        # Statistics for each page are fetched while the next page is requested
+        executor = ThreadPoolExecutor(max_workers=self.STATS_PIPELINE_WORKERS)
+        stats_futures = []
         try:
             # Fetch first page
-            request = self.youtube.search().list(
+            response = self._search(
                 part='snippet',
                 channelId=channel_id,
                 type='video',
                 order='viewCount',  # Sort by view count (highest first)
                 maxResults=50  # API max is 50 per request
-            )
-            response = request.execute()
+            ) or {}
             
             # Collect video IDs from first page
             for item in response.get('items', []):
                 video_ids.append(item['id']['videoId'])
+            if video_ids:
+                stats_futures.append(executor.submit(self.get_video_statistics, list(video_ids)))
             
-            print(f"Search API - Page 1: Got {len(video_ids)} videos")
+            logger.info(f"Search API - Page 1: Got {len(video_ids)} videos")
             
             # Handle pagination - fetch more pages if we need more results
             page_count = 1
             while len(video_ids) < max_results and 'nextPageToken' in response:
                 page_count += 1
-                request = self.youtube.search().list(
+                response = self._search(
                     part='snippet',
                     channelId=channel_id,
                     type='video',
                     order='viewCount',
                     maxResults=50,
                     pageToken=response['nextPageToken']
-                )
-                response = request.execute()
+                ) or {}
                 
                 page_items = len(response.get('items', []))
+                page_start = len(video_ids)
                 for item in response.get('items', []):
                     if len(video_ids) >= max_results:
                         break
                     video_ids.append(item['id']['videoId'])
+                if len(video_ids) > page_start:
+                    stats_futures.append(executor.submit(self.get_video_statistics, video_ids[page_start:]))
                 
-                print(f"Search API - Page {page_count}: Got {page_items} videos (total: {len(video_ids)})")
+                logger.info(f"Search API - Page {page_count}: Got {page_items} videos (total: {len(video_ids)})")
                 
                 # If this page returned fewer than 50, we've reached the end
                 if page_items < 50:
                     break
             
-            print(f"Total videos fetched from search API: {len(video_ids)}")
+            logger.info(f"Total videos fetched from search API: {len(video_ids)}")
             
             # Get detailed statistics for all videos
-            if video_ids:
-                all_videos = self.get_video_statistics(video_ids)
+            all_videos = [video for future in stats_futures for video in future.result()]
                 
         except Exception as e:
             error_msg = str(e)
-            print(f"Error fetching videos by popularity: {e}")
+            logger.warning(f"Error fetching videos by popularity: {e}")
             # Don't raise - let the calling function handle fallback
             # Just return empty list so we can fall back to playlist method
             if '403' in error_msg or 'blocked' in error_msg.lower() or 'quota' in error_msg.lower():
-                print("Search API unavailable (blocked/quota), will use playlist method")
+                logger.warning("Search API unavailable (blocked/quota), will use playlist method")
                 return []
             # For other errors, still return empty to trigger fallback
-            print("Search API error, will use playlist method")
+            logger.warning("Search API error, will use playlist method")
             return []
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
         
         return all_videos
     
+    def _fetch_channel_info_and_uploads(self, channel_id: str, max_results: int):
+        """
+        Get channel info, then the most recent uploads with statistics.
+        Returns (channel_info, videos). Channel info errors propagate; playlist errors
+        are logged and yield an empty video list.
+        """
+        channel_info = self.get_channel_info(channel_id)
+        playlist_id = channel_info.get('uploads_playlist_id') if channel_info else None
+        if not playlist_id:
+            return channel_info, []
+        
+        try:
+            logger.info(f"Fetching up to {max_results} videos from playlist (will paginate to get all)...")
+            # Each page's statistics are fetched while the next page is requested
+            with ThreadPoolExecutor(max_workers=self.STATS_PIPELINE_WORKERS) as executor:
+                stats_futures = []
+                video_ids = self.get_last_n_videos(
+                    playlist_id, max_results,
+                    on_page=lambda page_ids: stats_futures.append(executor.submit(self.get_video_statistics, page_ids))
+                )
+                logger.info(f"Actually fetched {len(video_ids)} video IDs from playlist (requested {max_results})")
+                return channel_info, [video for future in stats_futures for video in future.result()]
+        except Exception as e:
+            logger.warning(f"Error fetching from playlist: {e}")
+            return channel_info, []
+    
+    def _fetch_live_broadcasts(self, channel_id: str) -> List[Dict]:
+        """Check for active live broadcasts - 24/7 streams might not be in regular uploads"""
+        logger.info(f"🔴 Checking for active live broadcasts on channel {channel_id}...")
+        try:
+            # Search for live broadcasts on this channel
+            live_search = self._search(
+                part='snippet',
+                channelId=channel_id,
+                type='video',
+                eventType='live',  # Get only live broadcasts
+                maxResults=5
+            ) or {}
+            
+            live_broadcast_ids = []
+            for item in live_search.get('items', []):
+                video_id = item['id'].get('videoId')
+                if video_id:
+                    live_broadcast_ids.append(video_id)
+                    logger.info(f"  ✓ Found live broadcast: {item['snippet']['title'][:50]} (ID: {video_id})")
+            
+            # If we found live broadcasts, get their full details
+            if live_broadcast_ids:
+                logger.info(f"  📺 Fetching details for {len(live_broadcast_ids)} live broadcast(s)...")
+                live_broadcast_details = self.get_video_statistics(live_broadcast_ids)
+                logger.info(f"  ✅ Got {len(live_broadcast_details)} live broadcast details")
+                return live_broadcast_details
+            logger.info(f"  ℹ️ No active live broadcasts found via search API")
+        except Exception as e:
+            error_msg = str(e)
+            if '403' in error_msg or 'blocked' in error_msg.lower():
+                logger.warning(f"  ⚠️ Search API blocked for live broadcasts (likely quota/restrictions): {error_msg[:100]}")
+            else:
+                logger.warning(f"  ⚠️ Error checking for live broadcasts: {error_msg[:100]}")
+        return []
+    
     def fetch_channel_videos(self, channel_url: str, max_videos: int = 5, max_shorts: int = 5) -> Dict:
         """
         Main method: Fetch and rank videos from a channel.
@@ -608,16 +1073,9 @@ class YouTubeService:
                     f"https://www.youtube.com/channel/UCxxxxx"
                 )
                 # If we know the channel ID, suggest it
-                known_channels = {
-                    'hanaaaneyy': 'UCBoLezq04tdd45n5gG4dOng',
-                    'mrzthoppi': 'UC0XCrZT2-n_Yyj4gAePKekg',
-                    'CallMeShazzamTECH': 'UC9MQp8a5uhaIosZPHaoqEXQ',
-                    'techwiser': None,  # Don't have this one
-                }
-                if handle.lower() in [k.lower() for k in known_channels.keys()]:
-                    known_id = next((v for k, v in known_channels.items() if k.lower() == handle.lower()), None)
-                    if known_id:
-                        error_msg += f" Try: https://www.youtube.com/channel/{known_id}"
+                known_id = _KNOWN_CHANNELS_LOWER.get(handle.lower())
+                if known_id:
+                    error_msg += f" Try: https://www.youtube.com/channel/{known_id}"
             else:
                 error_msg = (
                     f"Could not extract channel ID from URL: {channel_url}. "
@@ -625,10 +1083,44 @@ class YouTubeService:
                 )
             raise ValueError(error_msg)
         
-        # Get channel information (name, thumbnail, etc.)
-        channel_info = self.get_channel_info(channel_id)
+        # Fetch enough videos to ensure we get top 5 videos and top 5 shorts
+        # We need to fetch significantly more because:
+        # 1. Search API might return limited results per channel
+        # 2. We need to filter into videos vs shorts
+        # 3. Some channels have more videos than shorts (or vice versa)
+        # 4. We also need recent videos for trending detection (last 1 hour)
+        # Fetch at least 200 items to ensure we get enough of each type + recent videos
+        total_needed = max_videos + max_shorts
+        fetch_count = max(total_needed * 20, 200)  # Fetch 20x to ensure we get enough of each type + recent videos for trending
+        # Playlist fetch is cheap (1 unit per 50 items) - fetch significantly more to get enough of each type
+        playlist_fetch_count = max(max_videos * 30, max_shorts * 30, 300)
+        
+        # Search API is expensive (100 units!) - only use it if enabled in settings
+        use_search_api = USE_SEARCH_API
+        if not use_search_api:
+            logger.warning("⚠️ Search API disabled (saves 100 quota units per channel). Using playlist method + sorting.")
+        
+        # Channel info + uploads playlist, live broadcasts and the popularity search are
+        # independent network round-trips, so run them concurrently instead of back to back.
+        # The live-broadcast lookup is a search.list call (100 units), so it is skipped with
+        # the Search API disabled: videos.list on the uploads already flags live streams,
+        # and the uploads are then the only source, fetched directly on this thread.
+        if use_search_api:
+            async def _gather_sources():
+                return await asyncio.gather(
+                    asyncio.to_thread(self._fetch_channel_info_and_uploads, channel_id, playlist_fetch_count),
+                    asyncio.to_thread(self._fetch_live_broadcasts, channel_id),
+                    asyncio.to_thread(self.fetch_channel_videos_by_popularity, channel_id, fetch_count),
+                )
+            
+            (channel_info, playlist_videos), live_broadcast_details, search_videos = asyncio.run(_gather_sources())
+        else:
+            channel_info, playlist_videos = self._fetch_channel_info_and_uploads(channel_id, playlist_fetch_count)
+            live_broadcast_details = []
+            search_videos = []
+        
         if not channel_info:
-            print(f"⚠️ Warning: Could not get channel info for {channel_id}")
+            logger.warning(f"⚠️ Warning: Could not get channel info for {channel_id}")
             channel_name = 'Unknown Channel'
             channel_thumbnail = ''
         else:
@@ -639,302 +1131,72 @@ class YouTubeService:
                 'Unknown Channel'
             )
             channel_thumbnail = channel_info.get('channel_thumbnail', '')
-            print(f"✅ Channel info fetched: name='{channel_name}', has_thumbnail={bool(channel_thumbnail)}")
+            logger.info(f"✅ Channel info fetched: name='{channel_name}', has_thumbnail={bool(channel_thumbnail)}")
         
-        # Check for active live broadcasts - 24/7 streams might not be in regular uploads
-        print(f"\n🔴 Checking for active live broadcasts on channel {channel_id}...")
-        live_broadcast_details = []  # Initialize to ensure it's always defined
-        try:
-            # Search for live broadcasts on this channel
-            live_search = self.youtube.search().list(
-                part='snippet',
-                channelId=channel_id,
-                type='video',
-                eventType='live',  # Get only live broadcasts
-                maxResults=5
-            ).execute()
-            
-            live_broadcast_ids = []
-            for item in live_search.get('items', []):
-                video_id = item['id'].get('videoId')
-                if video_id:
-                    live_broadcast_ids.append(video_id)
-                    print(f"  ✓ Found live broadcast: {item['snippet']['title'][:50]} (ID: {video_id})")
-            
-            # If we found live broadcasts, get their full details
-            if live_broadcast_ids:
-                print(f"  📺 Fetching details for {len(live_broadcast_ids)} live broadcast(s)...")
-                live_broadcast_details = self.get_video_statistics(live_broadcast_ids)
-                print(f"  ✅ Got {len(live_broadcast_details)} live broadcast details")
-            else:
-                live_broadcast_details = []
-                print(f"  ℹ️ No active live broadcasts found via search API")
-        except Exception as e:
-            error_msg = str(e)
-            if '403' in error_msg or 'blocked' in error_msg.lower():
-                print(f"  ⚠️ Search API blocked for live broadcasts (likely quota/restrictions): {error_msg[:100]}")
-            else:
-                print(f"  ⚠️ Error checking for live broadcasts: {error_msg[:100]}")
-            live_broadcast_details = []
-        
-        # Fetch enough videos to ensure we get top 5 videos and top 5 shorts
-        # We need to fetch significantly more because:
-        # 1. Search API might return limited results per channel
-        # 2. We need to filter into videos vs shorts
-        # 3. Some channels have more videos than shorts (or vice versa)
-        # 4. We also need recent videos for trending detection (last 1 hour)
-        # Fetch at least 200 items to ensure we get enough of each type + recent videos
-        total_needed = max_videos + max_shorts
-        fetch_count = max(total_needed * 20, 200)  # Fetch 20x to ensure we get enough of each type + recent videos for trending
-        
-        # Use hybrid approach: Search API for popularity + Playlist for more content
         all_videos_dict = {}  # Use dict to avoid duplicates (video_id as key)
         
         # Add live broadcasts found earlier (24/7 streams)
         if live_broadcast_details:
-            print(f"Adding {len(live_broadcast_details)} live broadcast(s) to video collection...")
+            logger.info(f"Adding {len(live_broadcast_details)} live broadcast(s) to video collection...")
             for video in live_broadcast_details:
                 # Ensure they're marked as live
                 video['is_live'] = True
                 all_videos_dict[video['video_id']] = video
-                print(f"  ✓ Added live broadcast: {video.get('title', 'Unknown')[:50]}")
-        
-        # Step 1: Try search API to get popular videos (ONLY if enabled - it's expensive: 100 units!)
-        # Check settings to see if Search API should be used
-        from django.conf import settings
-        use_search_api = getattr(settings, 'USE_SEARCH_API', False)
+                logger.info(f"  ✓ Added live broadcast: {video.get('title', 'Unknown')[:50]}")
         
+        # Search API results come first (already sorted by popularity)
         if use_search_api:
-            search_videos = self.fetch_channel_videos_by_popularity(channel_id, fetch_count)
-            
             if search_videos:
-                print(f"Search API returned: {len(search_videos)} videos")
-                # Add to dict (already sorted by popularity)
-                for video in search_videos:
-                    all_videos_dict[video['video_id']] = video
+                logger.info(f"Search API returned: {len(search_videos)} videos")
+                all_videos_dict.update((video['video_id'], video) for video in search_videos)
             else:
-                print("Search API returned no results, will rely on playlist method")
-        else:
-            print("⚠️ Search API disabled (saves 100 quota units per channel). Using playlist method + sorting.")
-        
-        # Step 2: If we don't have enough videos/shorts (or search API failed), fetch from playlist
-        regular_videos = [v for v in all_videos_dict.values() if not v['is_short']]
-        shorts = [v for v in all_videos_dict.values() if v['is_short']]
+                logger.info("Search API returned no results, will rely on playlist method")
         
-        print(f"After search API: {len(regular_videos)} videos, {len(shorts)} shorts")
-        
-        # If search API failed or we don't have enough of either type, fetch from playlist
-        search_api_failed = len(all_videos_dict) == 0
-        need_more = (len(regular_videos) < max_videos) or (len(shorts) < max_shorts)
-        
-        if search_api_failed or need_more:
-            print("Fetching additional videos from playlist to get enough content...")
-            try:
-                # Get channel info which includes playlist ID
-                if not channel_info:
-                    channel_info = self.get_channel_info(channel_id)
-                playlist_id = channel_info.get('uploads_playlist_id') if channel_info else None
-                if playlist_id:
-                    # Fetch more from playlist (recent uploads)
-                    # Fetch significantly more to ensure we get enough of each type
-                    # Also need recent videos for trending detection
-                    playlist_fetch_count = max(max_videos * 30, max_shorts * 30, 300)
-                    print(f"Fetching up to {playlist_fetch_count} videos from playlist (will paginate to get all)...")
-                    video_ids = self.get_last_n_videos(playlist_id, playlist_fetch_count)
-                    print(f"Actually fetched {len(video_ids)} video IDs from playlist (requested {playlist_fetch_count})")
-                    
-                    # If we got fewer than expected but still have a nextPageToken, 
-                    # it might mean the playlist has more items but we hit quota or other limits
-                    
-                    if video_ids:
-                        playlist_videos = self.get_video_statistics(video_ids)
-                        print(f"Playlist returned: {len(playlist_videos)} videos")
-                        
-                        # Add new videos (don't overwrite search API results - those are already sorted)
-                        for video in playlist_videos:
-                            if video['video_id'] not in all_videos_dict:
-                                all_videos_dict[video['video_id']] = video
-                        
-                        # Re-categorize
-                        regular_videos = [v for v in all_videos_dict.values() if not v['is_short']]
-                        shorts = [v for v in all_videos_dict.values() if v['is_short']]
-                        
-                        print(f"After adding playlist: {len(regular_videos)} videos, {len(shorts)} shorts")
-                        
-                        # Sort by view count (search API videos are already sorted, but playlist ones need sorting)
-                        # Combine and re-sort all to ensure proper ranking
-                        all_videos_list = list(all_videos_dict.values())
-                        regular_videos = sorted([v for v in all_videos_list if not v['is_short']], 
-                                               key=lambda x: int(x.get('view_count', 0)), reverse=True)
-                        shorts = sorted([v for v in all_videos_list if v['is_short']], 
-                                        key=lambda x: int(x.get('view_count', 0)), reverse=True)
-            except Exception as e:
-                print(f"Error fetching from playlist: {e}")
+        # Add playlist videos (don't overwrite search API results)
+        if playlist_videos:
+            logger.info(f"Playlist returned: {len(playlist_videos)} videos")
+            for video in playlist_videos:
+                all_videos_dict.setdefault(video['video_id'], video)
         
-        # Extract trending videos (published in last 3 hours) and live videos from all videos
+        # Split videos/shorts, refresh trending status and pick out live videos
         all_videos_list = list(all_videos_dict.values())
+        regular_videos, shorts, trending_videos_all, trending_shorts_all, live_videos, upcoming_count = \
+            _classify_videos(all_videos_list, time.time())
         
-        # Recalculate trending status for all videos (in case hours changed during processing)
-        # This ensures we catch all videos published in the last 3 hours
-        now = datetime.now(timezone.utc)
-        trending_count = 0
-        live_count = 0
-        
-        for video in all_videos_list:
-            # Recalculate live status (in case it changed)
-            if video.get('is_live', False):
-                live_count += 1
-                video['is_live'] = True  # Ensure it's set
-            
-            if video.get('published_at'):
-                try:
-                    pub_dt = datetime.fromisoformat(video['published_at'].replace('Z', '+00:00'))
-                    hours_since = (now - pub_dt).total_seconds() / 3600
-                    video['hours_since_publish'] = round(hours_since, 2)
-                    
-                    # Update trending status if within 3 hours (including 0 = just published)
-                    if hours_since <= 3 and hours_since >= 0:
-                        video['is_trending'] = True
-                        trending_count += 1
-                        view_count = video.get('view_count', 0)
-                        
-                        # Calculate trending score
-                        if hours_since < 0.1:  # Very recent (< 6 minutes)
-                            video['trending_score'] = view_count * 10
-                        else:
-                            video['trending_score'] = view_count / hours_since if hours_since > 0 else view_count
-                    else:
-                        video['is_trending'] = False
-                        video['trending_score'] = 0
-                except Exception as e:
-                    print(f"Error calculating trending for video {video.get('video_id')}: {e}")
-                    video['is_trending'] = False
-        
-        # Separate trending into videos and shorts
-        # Double-check trending status with explicit validation
-        trending_all = []
-        for v in all_videos_list:
-            if v.get('is_trending', False):
-                # Verify hours_since_publish is still valid
-                hours = v.get('hours_since_publish', 999)
-                if hours <= 3 and hours >= 0:
-                    trending_all.append(v)
-                else:
-                    # Clear the flag if hours don't match
-                    v['is_trending'] = False
+        logger.info(f"Collected: {len(regular_videos)} videos, {len(shorts)} shorts")
         
-        print(f"Found {trending_count} trending videos and {live_count} live videos out of {len(all_videos_list)} total")
+        # Top 3 of each by trending score (nlargest keeps sorted()'s tie order without a full sort)
+        trending_videos = heapq.nlargest(3, trending_videos_all, key=_by_trending_score)
+        trending_shorts = heapq.nlargest(3, trending_shorts_all, key=_by_trending_score)
         
-        # Split into trending videos and trending shorts
-        trending_videos_all = [v for v in trending_all if not v.get('is_short', False)]
-        trending_shorts_all = [v for v in trending_all if v.get('is_short', False)]
+        logger.info(f"Found {len(trending_videos_all)} trending videos and {len(trending_shorts_all)} trending shorts out of {len(all_videos_list)} total")
+        logger.info(f"Showing top {len(trending_videos)} trending videos and top {len(trending_shorts)} trending shorts")
         
-        # Sort each by trending score and take top 3
-        trending_videos_sorted = sorted(trending_videos_all, 
-                                       key=lambda x: x.get('trending_score', 0), 
-                                       reverse=True)
-        trending_shorts_sorted = sorted(trending_shorts_all,
-                                       key=lambda x: x.get('trending_score', 0),
-                                       reverse=True)
-        
-        trending_videos = trending_videos_sorted[:3]  # Top 3 trending videos
-        trending_shorts = trending_shorts_sorted[:3]  # Top 3 trending shorts
-        
-        print(f"Found {len(trending_videos_all)} trending videos and {len(trending_shorts_all)} trending shorts out of {len(all_videos_list)} total")
-        print(f"Showing top {len(trending_videos)} trending videos and top {len(trending_shorts)} trending shorts")
-        
-        # Extract live videos
-        # Filter live videos - double-check
-        live_videos = []
-        print(f"\n🔍 DEBUG: Checking {len(all_videos_list)} videos for live status...")
-        for v in all_videos_list:
-            video_id = v.get('video_id', 'Unknown')
-            is_live_flag = v.get('is_live', False)
-            live_viewers = v.get('live_viewers')
-            title = v.get('title', 'Unknown')[:50]
-            
-            print(f"  Video '{title}': is_live={is_live_flag}, live_viewers={live_viewers}, video_id={video_id}")
-            
-            if is_live_flag:
-                print(f"    ✓ Added to live_videos (is_live=True)")
-                live_videos.append(v)
-            # Also check if it has live streaming details (might be live but flag not set)
-            elif live_viewers:
-                print(f"    ✓ Added to live_videos (has live_viewers={live_viewers})")
-                v['is_live'] = True
-                live_videos.append(v)
-            # Also check liveBroadcastContent directly if available
-            elif v.get('live_broadcast_content') == 'live':
-                print(f"    ✓ Added to live_videos (liveBroadcastContent='live')")
-                v['is_live'] = True
-                live_videos.append(v)
-            # Also check if liveStreamingDetails exists (even without concurrentViewers, it indicates a live stream)
-            elif v.get('live_broadcast_content') == 'upcoming':
-                print(f"    ⏰ Skipping upcoming live stream: '{title}'")
-            # Check if video has live_streaming_details but wasn't marked as live
-            elif v.get('live_broadcast_content') and v.get('live_broadcast_content') != 'none':
-                print(f"    🔍 Found live_broadcast_content='{v.get('live_broadcast_content')}' for '{title}' - checking if should be included")
-        
-        print(f"🔴 Total live videos found: {len(live_videos)}")
-        if live_videos:
+        logger.info(f"🔴 Total live videos found: {len(live_videos)} (skipped {upcoming_count} upcoming)")
+        if live_videos and logger.isEnabledFor(logging.DEBUG):
             live_videos_list = [f"'{v.get('title', 'Unknown')[:30]}' (viewers: {v.get('live_viewers')})" for v in live_videos]
-            print(f"   Live videos: {live_videos_list}")
+            logger.debug(f"   Live videos: {live_videos_list}")
         
-        # Sort live videos by view count (or concurrent viewers if available) - highest first
+        # Rank live videos by view count (or concurrent viewers if available) - highest first
         # IMPORTANT: Live videos should be sorted by MOST VIEWS, not by publish date
         # Prioritize concurrent viewers for live streams, then fall back to total view count
         if live_videos:
-            print(f"Before sorting - Live videos: {[(v.get('title', 'Unknown')[:30], 'viewers:', v.get('live_viewers'), 'views:', v.get('view_count'), 'type:', type(v.get('live_viewers')), type(v.get('view_count'))) for v in live_videos]}")
-            
-            # Sort by concurrent viewers first (if available), then total view count
-            # Convert to int to ensure proper numeric comparison
-            def get_sort_key(video):
-                live_viewers = video.get('live_viewers')
-                view_count = video.get('view_count', 0)
-                
-                # Convert live_viewers to int (might be string or None)
-                if live_viewers is None:
-                    viewers_int = 0
-                elif isinstance(live_viewers, str):
-                    viewers_int = int(live_viewers) if live_viewers.isdigit() else 0
-                else:
-                    viewers_int = int(live_viewers)
-                
-                # Convert view_count to int
-                if view_count is None:
-                    views_int = 0
-                elif isinstance(view_count, str):
-                    views_int = int(view_count) if view_count.isdigit() else 0
-                else:
-                    views_int = int(view_count)
-                
-                # Return tuple: (concurrent_viewers, total_views) - higher is better
-                return (viewers_int, views_int)
-            
-            live_videos = sorted(live_videos, key=get_sort_key, reverse=True)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Live candidates: {[(v.get('title', 'Unknown')[:30], 'viewers:', v.get('live_viewers'), 'views:', v.get('view_count'), 'type:', type(v.get('live_viewers')), type(v.get('view_count'))) for v in live_videos]}")
             
-            print(f"After sorting - Live videos: {[(v.get('title', 'Unknown')[:30], 'viewers:', v.get('live_viewers'), 'views:', v.get('view_count')) for v in live_videos]}")
+            # Only the top live video (one with most viewers) is kept, so no full sort is needed
+            top_live = max(live_videos, key=_live_sort_key)
             
-            # Only keep the top live video (one with most viewers)
             if len(live_videos) > 1:
-                print(f"⚠️ Found {len(live_videos)} live videos - keeping only the one with most viewers")
-                live_videos = [live_videos[0]]  # Keep only the first (highest viewers)
-                print(f"✓ Selected top live video: '{live_videos[0].get('title', 'Unknown')[:50]}' - {live_videos[0].get('live_viewers')} concurrent viewers, {live_videos[0].get('view_count')} total views")
+                logger.warning(f"⚠️ Found {len(live_videos)} live videos - keeping only the one with most viewers")
+                live_videos = [top_live]
+                logger.info(f"✓ Selected top live video: '{live_videos[0].get('title', 'Unknown')[:50]}' - {live_videos[0].get('live_viewers')} concurrent viewers, {live_videos[0].get('view_count')} total views")
             elif live_videos:
                 first = live_videos[0]
-                print(f"✓ Single live video: '{first.get('title', 'Unknown')[:50]}' - {first.get('live_viewers')} concurrent viewers, {first.get('view_count')} total views")
+                logger.info(f"✓ Single live video: '{first.get('title', 'Unknown')[:50]}' - {first.get('live_viewers')} concurrent viewers, {first.get('view_count')} total views")
         
         if not all_videos_dict:
-            # Make sure we have channel info even if no videos
-            if not channel_info:
-                try:
-                    channel_info = self.get_channel_info(channel_id)
-                    if channel_info:
-                        channel_name = channel_info.get('channel_name', 'Unknown Channel')
-                        channel_thumbnail = channel_info.get('channel_thumbnail', '')
-                except:
-                    pass  # Keep defaults
-            
+            # channel_info was fetched once above; a missing one is not retried here
             result = {
                 'channel_id': channel_id,
                 'channel_url': channel_url,
@@ -962,28 +1224,28 @@ class YouTubeService:
             
             return result
         
-        # Take top N of each type (already sorted by popularity)
+        # Take top N of each type by view count
         # Note: If channel has fewer videos than requested, return what's available
-        ranked_videos = regular_videos[:max_videos]
-        ranked_shorts = shorts[:max_shorts]
+        ranked_videos = heapq.nlargest(max_videos, regular_videos, key=_by_views)
+        ranked_shorts = heapq.nlargest(max_shorts, shorts, key=_by_views)
         
         # Log if we couldn't get the requested amount
         if len(ranked_videos) < max_videos:
-            print(f"⚠️ Channel only has {len(ranked_videos)} regular videos (requested {max_videos})")
+            logger.warning(f"⚠️ Channel only has {len(ranked_videos)} regular videos (requested {max_videos})")
         if len(ranked_shorts) < max_shorts:
-            print(f"⚠️ Channel only has {len(ranked_shorts)} shorts (requested {max_shorts})")
+            logger.warning(f"⚠️ Channel only has {len(ranked_shorts)} shorts (requested {max_shorts})")
         
-        print(f"\n📊 FINAL RESULT SUMMARY:")
-        print(f"   Videos: {len(ranked_videos)}")
-        print(f"   Shorts: {len(ranked_shorts)}")
-        print(f"   Trending videos (last 3hr): {len(trending_videos)}")
-        print(f"   Trending shorts (last 3hr): {len(trending_shorts)}")
-        print(f"   🔴 LIVE VIDEOS: {len(live_videos)} (showing only top one with most viewers)")
+        logger.info(f"📊 FINAL RESULT SUMMARY:")
+        logger.info(f"   Videos: {len(ranked_videos)}")
+        logger.info(f"   Shorts: {len(ranked_shorts)}")
+        logger.info(f"   Trending videos (last 3hr): {len(trending_videos)}")
+        logger.info(f"   Trending shorts (last 3hr): {len(trending_shorts)}")
+        logger.info(f"   🔴 LIVE VIDEOS: {len(live_videos)} (showing only top one with most viewers)")
         if live_videos:
             live = live_videos[0]
-            print(f"      Top Live: '{live.get('title', 'Unknown')[:50]}' - {live.get('live_viewers')} concurrent viewers, {live.get('view_count')} total views")
+            logger.info(f"      Top Live: '{live.get('title', 'Unknown')[:50]}' - {live.get('live_viewers')} concurrent viewers, {live.get('view_count')} total views")
         else:
-            print(f"      ⚠️ No live videos found in {len(all_videos_list)} total videos")
+            logger.warning(f"      ⚠️ No live videos found in {len(all_videos_list)} total videos")
         
         # Include additional channel statistics if available
         result = {
@@ -1015,13 +1277,16 @@ class YouTubeService:
         
         return result
     
-    def _fetch_via_playlist(self, channel_id: str, channel_url: str, max_videos: int, max_shorts: int) -> Dict:
+    def _fetch_via_playlist(self, channel_id: str, channel_url: str, max_videos: int, max_shorts: int, channel_info: Optional[Dict] = None) -> Dict:
         """
         Fallback method: Fetch videos via playlist (original method).
         Used when search API is not available.
+        Pass `channel_info` when the caller already has it to skip the lookup.
         """
         # Get uploads playlist ID
-        playlist_id = self.get_uploads_playlist_id(channel_id)
+        if channel_info is None:
+            channel_info = self.get_channel_info(channel_id)
+        playlist_id = channel_info.get('uploads_playlist_id') if channel_info else None
         if not playlist_id:
             raise ValueError(f"Could not get uploads playlist for channel: {channel_id}")
         
@@ -1057,8 +1322,8 @@ class YouTubeService:
         shorts = [v for v in all_videos if v['is_short']]
         
         # Sort by view count (highest first)
-        ranked_videos = sorted(regular_videos, key=lambda x: int(x.get('view_count', 0)), reverse=True)[:max_videos]
-        ranked_shorts = sorted(shorts, key=lambda x: int(x.get('view_count', 0)), reverse=True)[:max_shorts]
+        ranked_videos = heapq.nlargest(max_videos, regular_videos, key=_by_views)
+        ranked_shorts = heapq.nlargest(max_shorts, shorts, key=_by_views)
         
         return {
             'channel_id': channel_id,
@@ -4,48 +4,131 @@ Caches YouTube API responses to minimize API calls and quota usage
 """
 from django.core.cache import cache
 from django.conf import settings
+from collections import OrderedDict
 import hashlib
 import json
 import logging
+import pickle
+import threading
+import time
 from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
+# orjson serializes key params in C; optional. Both paths emit the same compact,
+# sorted, UTF-8 JSON so keys match whichever one a worker uses.
+try:
+    import orjson
+    
+    def _dump_params(params):
+        return orjson.dumps(params, option=orjson.OPT_SORT_KEYS)
+except ImportError:
+    def _dump_params(params):
+        return json.dumps(params, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode()
+
 class APICache:
     """Caching layer for YouTube API responses"""
     
     CACHE_PREFIX = 'youtube_api'
     
+    # Process-local copy of recently read/written entries, so repeat lookups of a
+    # hot key (e.g. within one request) skip the cache round-trip. Entries are kept
+    # pickled so callers mutating a result never alter the shared copy.
+    # Entries of short-TTL endpoints (live videos, searches, ...) are kept for the
+    # rest of their fresh window instead, so repeat requests landing on the same
+    # worker never reach the cache; once stale they are re-read from the shared cache,
+    # which another worker may already have refreshed.
+    LOCAL_SIZE = 256
+    LOCAL_TTL = 5
+    LOCAL_FRESH_MAX_TTL = 300
+    _local = OrderedDict()
+    _local_lock = threading.Lock()
+    
+    # Per-endpoint TTLs, read from settings on first use
+    DEFAULT_TTLS = (
+        ('channel_videos', 3600),
+        ('channel_videos_live', 300),
+        ('video_statistics', 1800),
+        ('video_statistics_realtime', 60),
+        ('channel_info', 86400),
+        ('trending_videos', 300),
+        ('live_videos', 60),
+        ('playlist_items', 1800),
+        ('channel_id', 86400),
+        ('channel_search', 120),
+    )
+    _ttl_map = None
+    _stale_ttl_map = None
+    
+    @classmethod
+    def _get_ttl(cls, endpoint):
+        """Get the configured TTL for an endpoint (default 30 minutes)"""
+        if cls._ttl_map is None:
+            cls._ttl_map = {
+                name: settings.CACHE_TTL.get(name, default)
+                for name, default in cls.DEFAULT_TTLS
+            }
+        return cls._ttl_map.get(endpoint, 1800)
+    
+    @classmethod
+    def _get_stale_ttl(cls, endpoint, ttl):
+        """Get the configured stale window for an endpoint (at least its TTL)"""
+        if cls._stale_ttl_map is None:
+            cls._stale_ttl_map = dict(getattr(settings, 'CACHE_STALE_TTL', {}))
+        return max(cls._stale_ttl_map.get(endpoint, ttl), ttl)
+    
+    @classmethod
+    def _local_get(cls, cache_key):
+        """Get an entry from the process-local copy (None if missing or expired)"""
+        with cls._local_lock:
+            entry = cls._local.get(cache_key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del cls._local[cache_key]
+                return None
+            cls._local.move_to_end(cache_key)
+        return pickle.loads(entry[1])
+    
+    @classmethod
+    def _local_put(cls, cache_key, cached_data):
+        """Store an entry in the process-local copy, evicting the least recently used"""
+        payload = pickle.dumps(cached_data, pickle.HIGHEST_PROTOCOL)
+        local_ttl = cls.LOCAL_TTL
+        ttl = cached_data.get('ttl', 0)
+        if ttl <= cls.LOCAL_FRESH_MAX_TTL and cached_data.get('fetched_at') is not None:
+            local_ttl = max(local_ttl, cached_data['fetched_at'] + ttl - time.time())
+        with cls._local_lock:
+            cls._local[cache_key] = (time.monotonic() + local_ttl, payload)
+            cls._local.move_to_end(cache_key)
+            while len(cls._local) > cls.LOCAL_SIZE:
+                cls._local.popitem(last=False)
+    
     @staticmethod
     def _generate_cache_key(endpoint, params):
-        """Generate a cache key from endpoint and parameters"""
+        """
+        Generate a cache key from endpoint and parameters.
+        Params are reduced to a short fixed-size digest so keys stay small however large params get.
+        """
         # Sort params for consistent key generation
-        sorted_params = json.dumps(params, sort_keys=True)
-        key_string = f"{endpoint}:{sorted_params}"
-        key_hash = hashlib.md5(key_string.encode()).hexdigest()
+        key_hash = hashlib.blake2b(_dump_params(params), digest_size=16).hexdigest()
         return f"{APICache.CACHE_PREFIX}:{endpoint}:{key_hash}"
     
     @staticmethod
-    def get(endpoint, params, ttl=None):
+    def get(endpoint, params, ttl=None, cache_key=None):
         """
         Get cached API response.
+        Pass a precomputed `cache_key` to skip key generation.
         Returns (data, is_cached) tuple
         """
-        cache_key = APICache._generate_cache_key(endpoint, params)
-        
-        # Get TTL from settings if not provided
-        if ttl is None:
-            ttl_map = {
-                'channel_videos': settings.CACHE_TTL.get('channel_videos', 3600),
-                'video_statistics': settings.CACHE_TTL.get('video_statistics', 1800),
-                'channel_info': settings.CACHE_TTL.get('channel_info', 86400),
-                'trending_videos': settings.CACHE_TTL.get('trending_videos', 300),
-                'live_videos': settings.CACHE_TTL.get('live_videos', 60),
-                'playlist_items': settings.CACHE_TTL.get('playlist_items', 1800),
-            }
-            ttl = ttl_map.get(endpoint, 1800)  # Default 30 minutes
+        # `ttl` is accepted for symmetry with set(); expiry is handled by the cache itself
+        cache_key = cache_key or APICache._generate_cache_key(endpoint, params)
         
-        cached_data = cache.get(cache_key)
+        cached_data = APICache._local_get(cache_key)
+        if cached_data is None:
+            cached_data = cache.get(cache_key)
+            if cached_data:
+                APICache._local_put(cache_key, cached_data)
         
         if cached_data:
             logger.debug(f"Cache HIT for {endpoint}")
@@ -55,37 +138,77 @@ class APICache:
         return None, False
     
     @staticmethod
-    def set(endpoint, params, data, ttl=None):
-        """Cache API response"""
-        cache_key = APICache._generate_cache_key(endpoint, params)
+    def get_many(requests):
+        """
+        Get several cached API responses in one cache round-trip (MGET on Redis).
+        `requests` is a list of (endpoint, params) pairs.
+        Returns a list of (data, is_cached) tuples in the same order.
+        """
+        cache_keys = [APICache._generate_cache_key(endpoint, params) for endpoint, params in requests]
+        found = {}
+        remote_keys = []
+        for cache_key in cache_keys:
+            cached_data = APICache._local_get(cache_key)
+            if cached_data is None:
+                remote_keys.append(cache_key)
+            else:
+                found[cache_key] = cached_data
+        
+        if remote_keys:
+            for cache_key, cached_data in cache.get_many(remote_keys).items():
+                if cached_data:
+                    APICache._local_put(cache_key, cached_data)
+                    found[cache_key] = cached_data
+        
+        logger.debug(f"Cache get_many: {len(found)}/{len(cache_keys)} hits")
+        return [(found.get(cache_key), cache_key in found) for cache_key in cache_keys]
+    
+    @staticmethod
+    def set(endpoint, params, data, ttl=None, stale_ttl=None, cache_key=None):
+        """
+        Cache API response.
+        Entries are fresh for `ttl` seconds and may be served stale until `stale_ttl`.
+        """
+        cache_key = cache_key or APICache._generate_cache_key(endpoint, params)
         
         # Get TTL from settings if not provided
         if ttl is None:
-            ttl_map = {
-                'channel_videos': settings.CACHE_TTL.get('channel_videos', 3600),
-                'video_statistics': settings.CACHE_TTL.get('video_statistics', 1800),
-                'channel_info': settings.CACHE_TTL.get('channel_info', 86400),
-                'trending_videos': settings.CACHE_TTL.get('trending_videos', 300),
-                'live_videos': settings.CACHE_TTL.get('live_videos', 60),
-                'playlist_items': settings.CACHE_TTL.get('playlist_items', 1800),
-            }
-            ttl = ttl_map.get(endpoint, 1800)
+            ttl = APICache._get_ttl(endpoint)
+        
+        # Stale entries are kept around past their TTL so they can be served
+        # while a background refresh repopulates them
+        if stale_ttl is None:
+            stale_ttl = APICache._get_stale_ttl(endpoint, ttl)
+        stale_ttl = max(stale_ttl, ttl)
         
         # Add metadata
         cached_data = {
             'data': data,
             'cached_at': datetime.now(timezone.utc).isoformat(),
+            'fetched_at': time.time(),
+            'ttl': ttl,
+            'stale_ttl': stale_ttl,
             'endpoint': endpoint,
         }
         
         try:
-            cache.set(cache_key, cached_data, timeout=ttl)
-            logger.debug(f"Cached {endpoint} for {ttl}s")
+            cache.set(cache_key, cached_data, timeout=stale_ttl)
+            APICache._local_put(cache_key, cached_data)
+            logger.debug(f"Cached {endpoint} for {ttl}s (stale for {stale_ttl}s)")
             return True
         except Exception as e:
             logger.error(f"Failed to cache {endpoint}: {e}")
             return False
     
+    @staticmethod
+    def is_fresh(cached_data):
+        """Check whether a cached entry is still within its fresh TTL"""
+        fetched_at = cached_data.get('fetched_at')
+        if fetched_at is None:
+            # Entries written before stale-while-revalidate are treated as stale
+            return False
+        return time.time() - fetched_at < cached_data.get('ttl', 0)
+    
     @staticmethod
     def invalidate_channel(channel_id):
         """Invalidate all cache entries for a specific channel"""
@@ -0,0 +1,47 @@
+"""
+Serializers for cached values (django-redis OPTIONS['SERIALIZER'])
+"""
+import pickle
+
+from django_redis.serializers.pickle import PickleSerializer
+
+# orjson is optional; without it everything is pickled as before.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# First byte of a pickle (PROTO opcode, protocol 2+); JSON never starts with it
+PICKLE_PROTO = b'\x80'
+
+
+class ORJSONSerializer(PickleSerializer):
+    """
+    Stores JSON-shaped values (the cached API responses: dicts, lists, strings,
+    numbers) as orjson, which is smaller and much faster to encode and decode
+    than pickle. Anything orjson cannot represent faithfully - datetimes,
+    dataclasses, subclasses of builtins, non-string keys - is pickled instead.
+    Tuples are the exception: orjson writes them as arrays, so they read back
+    as lists.
+    
+    The two formats are told apart by the first byte, so pickled values
+    written before the switch stay readable.
+    """
+    
+    JSON_OPTIONS = (
+        (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_SUBCLASS)
+        if orjson is not None else 0
+    )
+    
+    def dumps(self, value):
+        if orjson is not None:
+            try:
+                return orjson.dumps(value, option=self.JSON_OPTIONS)
+            except TypeError:
+                pass
+        return super().dumps(value)
+    
+    def loads(self, value):
+        if orjson is None or value[:1] == PICKLE_PROTO:
+            return pickle.loads(value)
+        return orjson.loads(value)
@@ -0,0 +1,23 @@
+"""
+Logging handlers
+"""
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+class QueueStreamHandler(QueueHandler):
+    """
+    Hands records to a background thread that writes them to stderr, so request
+    threads only pay for a queue put instead of a locked stream write.
+    """
+    
+    def __init__(self):
+        super().__init__(queue.SimpleQueue())
+        stream_handler = logging.StreamHandler()
+        self.listener = QueueListener(self.queue, stream_handler, respect_handler_level=True)
+        self.listener.start()
+        # Flush whatever is still queued on shutdown
+        atexit.register(self.listener.stop)
+
@@ -4,37 +4,173 @@ Tracks API quota usage and prevents exceeding limits
 """
 from django.core.cache import cache
 from datetime import datetime, timezone
+from functools import lru_cache
 import logging
+import os
+import time
 
 logger = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=4)
+def _bucket_names(hour, start, stop, bucket_seconds):
+    """
+    Names of the hourly buckets `start` to `stop - 1` hours before bucket number `hour`.
+    Cached: the names only change when the hour rolls over.
+    """
+    return tuple(
+        f'{datetime.fromtimestamp((hour - i) * bucket_seconds, timezone.utc):%Y%m%d-%H}'
+        for i in range(start, stop)
+    )
+
+
 class QuotaManager:
-    """Manages YouTube API quota usage and tracking"""
+    """
+    Manages YouTube API quota usage and tracking.
+    
+    Usage is counted with a sliding window counter: the 24h window is split
+    into hourly buckets, and the oldest bucket is weighted by how much of it
+    still falls inside the window. This avoids bursting on both sides of a
+    fixed daily boundary while keeping memory O(1).
+    
+    With Redis the hourly buckets are fields of a single hash (HINCRBY/HMGET),
+    so the whole window is one key. Other cache backends use one key per bucket
+    and worker-process shard: each process increments its own shard (picked by
+    pid) and reads sum the shards, so processes do not contend on (or, with
+    non-atomic backends like the database cache, overwrite) the same counter.
+    """
     
     CACHE_KEY_PREFIX = 'youtube_quota'
-    DAILY_QUOTA_KEY = f'{CACHE_KEY_PREFIX}:daily'
-    HOURLY_QUOTA_KEY = f'{CACHE_KEY_PREFIX}:hourly'
+    WINDOW_KEY = f'{CACHE_KEY_PREFIX}:window'
+    HOURS_KEY = f'{CACHE_KEY_PREFIX}:hours'
+    BUCKET_SECONDS = 3600
+    WINDOW_BUCKETS = 24
+    # Buckets must outlive the window they are counted in
+    BUCKET_TIMEOUT = 2 * WINDOW_BUCKETS * BUCKET_SECONDS
+    # Shards per bucket on non-Redis backends
+    WINDOW_SHARDS = 8
+    
+    _redis = None
+    # Last window usage this process saw as (time.monotonic(), units), see get_quota_status()
+    _last_used = (float('-inf'), 0)
     
     def __init__(self, daily_limit=10000, warning_threshold=8000):
         self.daily_limit = daily_limit
         self.warning_threshold = warning_threshold
+    
+    @classmethod
+    def get_redis(cls):
+        """Redis connection behind the cache (None if Redis is not the cache backend)"""
+        if cls._redis is None:
+            try:
+                from django_redis import get_redis_connection
+                cls._redis = get_redis_connection('default')
+            except Exception:
+                cls._redis = False
+        return cls._redis or None
+    
+    def _get_window_fields(self, now=None):
+        """
+        Get bucket names for the sliding window, newest first, plus the elapsed
+        fraction of the current bucket.
+        """
+        now_ts = now.timestamp() if now else time.time()
+        hour, offset = divmod(now_ts, self.BUCKET_SECONDS)
+        fields = _bucket_names(int(hour), 0, self.WINDOW_BUCKETS + 1, self.BUCKET_SECONDS)
+        return list(fields), offset / self.BUCKET_SECONDS
+    
+    def get_expired_fields(self, now=None):
+        """Bucket names that have left the window, pruned from the hash on each write"""
+        now_ts = now.timestamp() if now else time.time()
+        hour = int(now_ts // self.BUCKET_SECONDS)
+        return list(_bucket_names(hour, self.WINDOW_BUCKETS + 1, 2 * self.WINDOW_BUCKETS + 1, self.BUCKET_SECONDS))
+    
+    def _get_window_keys(self, now=None):
+        """
+        Get cache keys for the window buckets (non-Redis backends), newest first:
+        one list of shard keys per bucket.
+        """
+        fields, elapsed = self._get_window_fields(now)
+        shards = range(self.WINDOW_SHARDS)
+        return [[f'{self.WINDOW_KEY}:{field}:{shard}' for shard in shards] for field in fields], elapsed
+    
+    def _get_shard_key(self, field):
+        """This process's shard of a bucket (non-Redis backends)"""
+        return f'{self.WINDOW_KEY}:{field}:{os.getpid() % self.WINDOW_SHARDS}'
+    
+    def get_window_state(self):
+        """Get window bucket names (newest first) and the weight of the oldest bucket"""
+        fields, elapsed = self._get_window_fields()
+        return fields, 1 - elapsed
+    
+    def _add_units(self, units, field):
+        """Add (or with negative units, give back) units in the bucket named `field`"""
+        redis_conn = self.get_redis()
+        if redis_conn is not None:
+            hours_key = cache.make_key(self.HOURS_KEY)
+            pipe = redis_conn.pipeline()
+            pipe.hincrby(hours_key, field, units)
+            if units > 0:
+                pipe.hdel(hours_key, *self.get_expired_fields())
+                pipe.expire(hours_key, self.BUCKET_TIMEOUT)
+            pipe.execute()
+            return
         
-    def _get_today_key(self):
-        """Get cache key for today's date"""
-        today = datetime.now(timezone.utc).date().isoformat()
-        return f'{self.DAILY_QUOTA_KEY}:{today}'
+        key = self._get_shard_key(field)
+        if units < 0:
+            try:
+                cache.decr(key, -units)
+            except ValueError:
+                # Bucket expired - nothing to give back
+                pass
+            return
+        cache.add(key, 0, timeout=self.BUCKET_TIMEOUT)
+        try:
+            cache.incr(key, units)
+        except ValueError:
+            # Non-atomic backends (database cache) can lose the add under concurrency
+            cache.set(key, units, timeout=self.BUCKET_TIMEOUT)
     
-    def _get_current_hour_key(self):
-        """Get cache key for current hour"""
-        now = datetime.now(timezone.utc)
-        hour_key = f'{now.year}-{now.month:02d}-{now.day:02d}-{now.hour:02d}'
-        return f'{self.HOURLY_QUOTA_KEY}:{hour_key}'
+    def _reserve_units_redis(self, redis_conn, units):
+        """
+        Add units to the current bucket and read the window back in one
+        MULTI/EXEC round trip. Returns the bucket charged and the window usage
+        including the units.
+        """
+        fields, elapsed = self._get_window_fields()
+        hours_key = cache.make_key(self.HOURS_KEY)
+        pipe = redis_conn.pipeline(transaction=True)
+        pipe.hincrby(hours_key, fields[0], units)
+        pipe.hdel(hours_key, *self.get_expired_fields())
+        pipe.expire(hours_key, self.BUCKET_TIMEOUT)
+        pipe.hmget(hours_key, fields)
+        counts = pipe.execute()[-1]
+        return fields[0], self._window_total([int(count or 0) for count in counts], elapsed)
+    
+    def _window_total(self, counts, elapsed):
+        """Sum bucket counts (newest first) over the window and remember the result"""
+        used = sum(counts[:-1])
+        # Oldest bucket only partially overlaps the window
+        used += counts[-1] * (1 - elapsed)
+        used = int(used)
+        self.record_used(used)
+        return used
     
     def get_daily_quota_used(self):
-        """Get quota used today"""
-        key = self._get_today_key()
-        used = cache.get(key, 0)
-        return int(used)
+        """Get quota used in the sliding 24h window"""
+        redis_conn = self.get_redis()
+        if redis_conn is not None:
+            fields, elapsed = self._get_window_fields()
+            counts = [int(count or 0) for count in redis_conn.hmget(cache.make_key(self.HOURS_KEY), fields)]
+        else:
+            bucket_keys, elapsed = self._get_window_keys()
+            found = cache.get_many([key for keys in bucket_keys for key in keys])
+            counts = [sum(int(found.get(key, 0)) for key in keys) for keys in bucket_keys]
+        return self._window_total(counts, elapsed)
+    
+    def record_used(self, used):
+        """Remember the latest window usage seen by this process"""
+        QuotaManager._last_used = (time.monotonic(), used)
     
     def get_remaining_quota(self):
         """Get remaining quota for today"""
@@ -50,38 +186,45 @@ class QuotaManager:
     def consume_quota(self, units):
         """
         Consume quota units.
-        Returns True if quota was consumed successfully, False if quota exceeded.
-        """
-        key = self._get_today_key()
-        current_used = cache.get(key, 0)
-        new_used = current_used + units
+        Returns the bucket the units were charged to (pass it to release_quota),
+        or None if the quota would be exceeded.
         
+        The units are reserved with an atomic incr first and given back if the
+        window turns out to be over the limit, so concurrent callers can never
+        both pass a stale check and overshoot it. With Redis the reservation and
+        the window read go out as one transaction.
+        """
+        redis_conn = self.get_redis()
+        if redis_conn is not None:
+            field, new_used = self._reserve_units_redis(redis_conn, units)
+        else:
+            field = self._get_window_fields()[0][0]
+            self._add_units(units, field)
+            new_used = self.get_daily_quota_used()
         if new_used > self.daily_limit:
+            self._add_units(-units, field)
+            self.record_used(new_used - units)
             logger.warning(f"Quota would exceed limit: {new_used} > {self.daily_limit}")
-            return False
-        
-        # Set with expiration at end of day (Pacific Time)
-        # Calculate seconds until midnight PST (UTC-8 or UTC-7 for DST)
-        now = datetime.now(timezone.utc)
-        # Approximate: assume UTC-8 for simplicity (can be improved)
-        # Pacific midnight = 08:00 UTC next day
-        tomorrow_utc = now.replace(hour=8, minute=0, second=0, microsecond=0)
-        if tomorrow_utc <= now:
-            tomorrow_utc = tomorrow_utc.replace(day=tomorrow_utc.day + 1)
-        seconds_until_reset = (tomorrow_utc - now).total_seconds()
-        
-        cache.set(key, new_used, timeout=int(seconds_until_reset) + 3600)  # +1 hour buffer
-        
-        # Track hourly usage
-        hour_key = self._get_current_hour_key()
-        hourly_used = cache.get(hour_key, 0)
-        cache.set(hour_key, hourly_used + units, timeout=3600)
-        
-        # Log warning if approaching limit
-        if new_used >= self.warning_threshold:
-            logger.warning(f"Quota usage at {self.get_quota_percentage():.1f}%: {new_used}/{self.daily_limit}")
+            return None
         
-        return True
+        self.check_threshold(new_used)
+        return field
+    
+    def release_quota(self, units, field=None):
+        """
+        Give back units charged for a request that was never served.
+        `field` is the bucket the units were charged to (as returned by
+        consume_quota); refunding the current bucket instead would leave the
+        charged one over-counted if the hour rolled over in between.
+        """
+        if field is None:
+            field = self._get_window_fields()[0][0]
+        self._add_units(-units, field)
+    
+    def check_threshold(self, used):
+        """Log a warning if usage is approaching the limit"""
+        if used >= self.warning_threshold:
+            logger.warning(f"Quota usage at {(used / self.daily_limit) * 100:.1f}%: {used}/{self.daily_limit}")
     
     def can_make_request(self, estimated_units):
         """Check if we can make a request without exceeding quota"""
@@ -90,11 +233,18 @@ class QuotaManager:
             return False
         return True
     
-    def get_quota_status(self):
-        """Get detailed quota status"""
-        used = self.get_daily_quota_used()
-        remaining = self.get_remaining_quota()
-        percentage = self.get_quota_percentage()
+    def get_quota_status(self, since=None):
+        """
+        Get detailed quota status.
+        With `since` (a time.monotonic() value), usage this process saw after that
+        moment - e.g. from the quota charges of the current request - is reused
+        instead of being read again.
+        """
+        observed_at, used = QuotaManager._last_used
+        if since is None or observed_at < since:
+            used = self.get_daily_quota_used()
+        remaining = max(0, self.daily_limit - used)
+        percentage = (used / self.daily_limit) * 100
         
         return {
             'used': used,
@@ -107,7 +257,6 @@ class QuotaManager:
     
     def reset_quota(self):
         """Reset quota (for testing/admin purposes)"""
-        key = self._get_today_key()
-        cache.delete(key)
+        bucket_keys, _ = self._get_window_keys()
+        cache.delete_many([key for keys in bucket_keys for key in keys] + [self.HOURS_KEY])
         logger.info("Quota reset manually")
-
@@ -3,63 +3,219 @@ Rate Limiter for YouTube API Calls
 Prevents API call bursts that could trigger rate limits
 """
 from django.core.cache import cache
-from datetime import datetime, timezone
+import threading
 import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+# GCRA: the bucket is one value, the theoretical arrival time (TAT) at which it
+# would be full again. Check + advance happen in a single atomic step so all
+# workers share one bucket.
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+local tat = math.max(tonumber(redis.call('GET', KEYS[1])) or now, now)
+local new_tat = tat + cost / refill_rate
+local wait = new_tat - now - capacity / refill_rate
+if wait > 0 then
+    return tostring(wait)
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'EX', math.ceil(new_tat - now) + 1)
+return '0'
+"""
+
+# Quota check + GCRA bucket + quota charge in one atomic step.
+# KEYS[1] is the bucket; KEYS[2] is the quota hash of hourly buckets (see QuotaManager).
+# ARGV[9] is the number of window buckets, followed by their names (newest first) and
+# then the expired bucket names to prune.
+# Returns {status, wait, used}: 1 = acquired, 0 = wait and retry, -1 = quota exceeded.
+ACQUIRE_LUA = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+local units = tonumber(ARGV[5])
+local daily_limit = tonumber(ARGV[6])
+local oldest_weight = tonumber(ARGV[7])
+local quota_ttl = tonumber(ARGV[8])
+local window_size = tonumber(ARGV[9])
+local fields = {}
+for i = 1, window_size do
+    fields[i] = ARGV[9 + i]
+end
+local counts = redis.call('HMGET', KEYS[2], unpack(fields))
+local used = 0
+for i = 1, window_size do
+    local count = tonumber(counts[i]) or 0
+    if i == window_size then
+        count = count * oldest_weight
+    end
+    used = used + count
+end
+used = math.floor(used)
+if used + units > daily_limit then
+    return {-1, '0', used}
+end
+local tat = math.max(tonumber(redis.call('GET', KEYS[1])) or now, now)
+local new_tat = tat + cost / refill_rate
+local wait = new_tat - now - capacity / refill_rate
+if wait > 0 then
+    return {0, tostring(wait), used}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'EX', math.ceil(new_tat - now) + 1)
+redis.call('HINCRBY', KEYS[2], fields[1], units)
+for i = 10 + window_size, #ARGV do
+    redis.call('HDEL', KEYS[2], ARGV[i])
+end
+redis.call('EXPIRE', KEYS[2], quota_ttl)
+used = used + units
+return {1, '0', used}
+"""
+
+
+class TokenBucket:
+    """
+    Token bucket: callers may burst up to `capacity` tokens, and tokens
+    refill continuously at `refill_rate` per second.
+    
+    Implemented as GCRA (generic cell rate algorithm): instead of a token count
+    and refill timestamp, the only state is the theoretical arrival time (TAT)
+    at which the bucket would be full again. Each token moves it forward by
+    1 / refill_rate; a request fits while TAT stays within capacity / refill_rate
+    of now.
+    
+    State lives in Redis when django-redis is available (shared across
+    processes), otherwise in-process behind a lock.
+    """
+    
+    CACHE_KEY = 'ratelimit:gcra'
+    
+    # One bucket per (key, capacity, rate) in each worker process, see shared()
+    _shared = {}
+    _shared_lock = threading.Lock()
+    
+    @classmethod
+    def shared(cls, capacity, refill_rate, cache_key=None):
+        """
+        Get this process's bucket for the given settings, creating it on first use.
+        Short-lived callers (e.g. one service instance per request) share the local
+        fallback state and registered scripts instead of each starting a full bucket.
+        """
+        key = (cache_key or cls.CACHE_KEY, float(capacity), float(refill_rate))
+        with cls._shared_lock:
+            bucket = cls._shared.get(key)
+            if bucket is None:
+                bucket = cls._shared[key] = cls(capacity, refill_rate, cache_key)
+            return bucket
+    
+    def __init__(self, capacity, refill_rate, cache_key=None):
+        self.cache_key = cache_key or self.CACHE_KEY
+        self.capacity = float(capacity)
+        self.refill_rate = float(refill_rate)
+        self.tat = 0.0
+        self._lock = threading.Lock()
+        self._scripts = {}
+    
+    def _get_script(self, source=TOKEN_BUCKET_LUA):
+        """Register a Lua script on the Redis connection (None if Redis is not the cache backend)"""
+        if source not in self._scripts:
+            try:
+                from django_redis import get_redis_connection
+                self._scripts[source] = get_redis_connection('default').register_script(source)
+            except Exception:
+                self._scripts[source] = False
+        return self._scripts[source] or None
+    
+    def _consume_local(self, cost):
+        """In-process fallback: try to take `cost` tokens"""
+        with self._lock:
+            now = time.monotonic()
+            new_tat = max(self.tat, now) + cost / self.refill_rate
+            wait = new_tat - now - self.capacity / self.refill_rate
+            if wait > 0:
+                return wait
+            self.tat = new_tat
+            return 0.0
+    
+    def consume(self, cost=1):
+        """
+        Try to take `cost` tokens.
+        Returns 0 if the tokens were taken, otherwise the seconds to wait before retrying.
+        """
+        # A request larger than the bucket would never fit; it needs a full bucket instead
+        cost = min(float(cost), self.capacity)
+        script = self._get_script()
+        if script is not None:
+            try:
+                wait = script(
+                    keys=[cache.make_key(self.cache_key)],
+                    args=[self.capacity, self.refill_rate, cost, time.time()]
+                )
+                return float(wait)
+            except Exception as e:
+                logger.debug(f"Redis token bucket unavailable, using local bucket: {e}")
+        return self._consume_local(cost)
+
+
 class RateLimiter:
     """Rate limiting for API calls"""
     
     def __init__(self, max_per_second=5, max_per_minute=100):
         self.max_per_second = max_per_second
         self.max_per_minute = max_per_minute
+        # Average rate is max_per_second; bursts may spend up to max_per_minute
+        self.bucket = TokenBucket.shared(capacity=max_per_minute, refill_rate=max_per_second)
     
-    def _get_window_key(self, window_type):
-        """Get cache key for rate limit window"""
-        now = datetime.now(timezone.utc)
-        if window_type == 'second':
-            return f'ratelimit:second:{now.timestamp():.0f}'
-        elif window_type == 'minute':
-            return f'ratelimit:minute:{now.year}-{now.month:02d}-{now.day:02d}-{now.hour:02d}-{now.minute:02d}'
+    def wait_if_needed(self, cost=1):
+        """Wait until `cost` tokens are available, then consume them"""
+        while True:
+            wait = self.bucket.consume(cost)
+            if wait <= 0:
+                return
+            logger.debug(f"Rate limit: waiting {wait:.2f}s for {cost} tokens")
+            time.sleep(wait)
     
-    def can_make_request(self):
-        """Check if we can make a request without violating rate limits"""
-        # Check per-second limit
-        second_key = self._get_window_key('second')
-        second_count = cache.get(second_key, 0)
-        
-        if second_count >= self.max_per_second:
-            logger.warning(f"Rate limit: {second_count} requests in current second")
-            return False
-        
-        # Check per-minute limit
-        minute_key = self._get_window_key('minute')
-        minute_count = cache.get(minute_key, 0)
+    def acquire(self, quota_manager, cost=1, quota_units=None):
+        """
+        Wait for `cost` tokens and charge `quota_units` against the daily quota.
+        With Redis this is one atomic script call per attempt, so concurrent
+        workers cannot both pass the quota check and overshoot the limit.
+        Returns the quota bucket the units were charged to (see
+        QuotaManager.release_quota), or None (charging nothing) if the quota
+        would be exceeded.
+        """
+        quota_units = cost if quota_units is None else quota_units
+        cost = min(float(cost), self.bucket.capacity)
+        script = self.bucket._get_script(ACQUIRE_LUA)
+        if script is not None:
+            try:
+                while True:
+                    fields, oldest_weight = quota_manager.get_window_state()
+                    status, wait, used = script(
+                        keys=[cache.make_key(self.bucket.cache_key), cache.make_key(quota_manager.HOURS_KEY)],
+                        args=[
+                            self.bucket.capacity, self.bucket.refill_rate, cost, time.time(),
+                            quota_units, quota_manager.daily_limit, oldest_weight,
+                            quota_manager.BUCKET_TIMEOUT, len(fields),
+                        ] + fields + quota_manager.get_expired_fields()
+                    )
+                    if status < 0:
+                        quota_manager.record_used(used)
+                        return None
+                    if status > 0:
+                        quota_manager.record_used(used)
+                        quota_manager.check_threshold(used)
+                        # The script charges the newest bucket
+                        return fields[0]
+                    logger.debug(f"Rate limit: waiting {float(wait):.2f}s for {cost} tokens")
+                    time.sleep(float(wait))
+            except Exception as e:
+                logger.debug(f"Redis acquire script unavailable, using separate checks: {e}")
         
-        if minute_count >= self.max_per_minute:
-            logger.warning(f"Rate limit: {minute_count} requests in current minute")
-            return False
-        
-        return True
-    
-    def record_request(self):
-        """Record that a request was made"""
-        # Increment second counter (expires in 2 seconds)
-        second_key = self._get_window_key('second')
-        cache.set(second_key, cache.get(second_key, 0) + 1, timeout=2)
-        
-        # Increment minute counter (expires in 61 seconds)
-        minute_key = self._get_window_key('minute')
-        cache.set(minute_key, cache.get(minute_key, 0) + 1, timeout=61)
-    
-    def wait_if_needed(self):
-        """Wait if rate limit would be exceeded"""
-        if not self.can_make_request():
-            # Wait until next second
-            time.sleep(1)
-            # Retry once
-            if not self.can_make_request():
-                time.sleep(1)
-
+        if not quota_manager.can_make_request(quota_units):
+            return None
+        self.wait_if_needed(cost)
+        return quota_manager.consume_quota(quota_units)
@@ -4,8 +4,24 @@ Django REST Framework API Views
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from api.services.cached_youtube_service import CachedYouTubeService
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+from api.services.cached_youtube_service import get_cached_youtube_service
+from api.utils.api_cache import APICache
+import html
+import logging
+import re
 import requests
+import time
+
+logger = logging.getLogger(__name__)
+
+# Instagram usernames: letters, digits, underscores and dots (\Z: no trailing newline)
+_USERNAME_RE = re.compile(r'^[a-zA-Z0-9_.]+\Z')
+# Prefixes stripped from a channel's customUrl to build its @handle URL
+_HANDLE_CLEAN_RE = re.compile(r'@|youtube\.com/|c/')
+# Page <title>, read straight from the response bytes instead of building a parse tree
+_TITLE_RE = re.compile(rb'<title[^>]*>([^<]+)</title>', re.IGNORECASE)
 
 
 class YouTubeAnalyzerAPIView(APIView):
@@ -48,32 +64,24 @@ class YouTubeAnalyzerAPIView(APIView):
         
         try:
             # Use cached service wrapper for quota management and caching
-            youtube_service = CachedYouTubeService()
+            youtube_service = get_cached_youtube_service()
             
-            for channel_url in channel_urls:
-                try:
-                    # Check if real-time data requested (default to False to use cache)
-                    real_time_trending = request.data.get('real_time_trending', False)  # Default to False to use cache
-                    real_time_live = request.data.get('real_time_live', False)  # Default to False to use cache
-                    
-                    channel_data = youtube_service.fetch_channel_videos(
-                        channel_url.strip(),
-                        max_videos=5,  # Limited to 5
-                        max_shorts=5,  # Limited to 5
-                        real_time_trending=real_time_trending,
-                        real_time_live=real_time_live
-                    )
-                    # If quota error, make sure it's clear in the response
-                    if channel_data.get('error') and 'quota' in channel_data.get('error', '').lower():
-                        errors.append({
-                            'channel_url': channel_url,
-                            'error': channel_data.get('error'),
-                            'quota_exceeded': True
-                        })
-                    else:
-                        results.append(channel_data)
-                except Exception as e:
-                    error_str = str(e)
+            # Check if real-time data requested (default to False to use cache)
+            real_time_trending = request.data.get('real_time_trending', False)
+            real_time_live = request.data.get('real_time_live', False)
+            
+            started = time.monotonic()
+            # Channels are analyzed concurrently; each entry is channel data or the exception raised
+            channel_results = youtube_service.fetch_channels_videos(
+                [channel_url.strip() for channel_url in channel_urls],
+                max_videos=5,  # Limited to 5
+                max_shorts=5,  # Limited to 5
+                real_time_trending=real_time_trending,
+                real_time_live=real_time_live
+            )
+            for channel_url, channel_data in zip(channel_urls, channel_results):
+                if isinstance(channel_data, Exception):
+                    error_str = str(channel_data)
                     error_info = {
                         'channel_url': channel_url,
                         'error': error_str
@@ -82,6 +90,15 @@ class YouTubeAnalyzerAPIView(APIView):
                     if 'quota' in error_str.lower():
                         error_info['quota_exceeded'] = True
                     errors.append(error_info)
+                # If quota error, make sure it's clear in the response
+                elif channel_data.get('error') and 'quota' in channel_data.get('error', '').lower():
+                    errors.append({
+                        'channel_url': channel_url,
+                        'error': channel_data.get('error'),
+                        'quota_exceeded': True
+                    })
+                else:
+                    results.append(channel_data)
         
         except Exception as e:
             return Response(
@@ -89,10 +106,10 @@ class YouTubeAnalyzerAPIView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
         
-        # Get quota status from service
+        # Get quota status from service; usage seen while fetching is reused as is
         quota_status = None
         try:
-            quota_status = youtube_service.get_quota_status()
+            quota_status = youtube_service.get_quota_status(since=started)
         except:
             pass
         
@@ -113,11 +130,16 @@ class YouTubeAnalyzerAPIView(APIView):
 class QuotaStatusAPIView(APIView):
     """API endpoint to check YouTube API quota status"""
     
+    CACHE_MAX_AGE = 5
+    
     def get(self, request):
         try:
-            service = CachedYouTubeService()
+            service = get_cached_youtube_service()
             quota_status = service.get_quota_status()
-            return Response(quota_status, status=status.HTTP_200_OK)
+            response = Response(quota_status, status=status.HTTP_200_OK)
+            # Polling clients may reuse the status briefly (ETag/304 come from ConditionalGetMiddleware)
+            patch_cache_control(response, private=True, max_age=self.CACHE_MAX_AGE)
+            return response
         except Exception as e:
             return Response(
                 {'error': f'Could not retrieve quota status: {str(e)}'},
@@ -128,6 +150,13 @@ class QuotaStatusAPIView(APIView):
 class ChannelSearchAPIView(APIView):
     """API endpoint to search for YouTube channels with autocomplete"""
     
+    # Typeahead repeats the same queries in bursts; results are cached briefly and
+    # only one worker runs a given search while the others wait for its result
+    CACHE_ENDPOINT = 'channel_search'
+    LOCK_TIMEOUT = 10
+    LOCK_WAIT = 2.0
+    LOCK_POLL_INTERVAL = 0.1
+    
     def get(self, request):
         query = request.GET.get('q', '').strip()
         max_results = min(int(request.GET.get('max_results', 10)), 20)
@@ -135,6 +164,35 @@ class ChannelSearchAPIView(APIView):
         if not query or len(query) < 2:
             return Response({'results': []}, status=status.HTTP_200_OK)
         
+        cache_params = {'q': query.lower(), 'max_results': max_results}
+        cache_key = APICache._generate_cache_key(self.CACHE_ENDPOINT, cache_params)
+        cached_data, is_cached = APICache.get(self.CACHE_ENDPOINT, cache_params, cache_key=cache_key)
+        if is_cached:
+            return Response({'results': cached_data['data']}, status=status.HTTP_200_OK)
+        
+        lock_key = f'{cache_key}:lock'
+        locked = cache.add(lock_key, 1, timeout=self.LOCK_TIMEOUT)
+        if locked is None:
+            # Cache unreachable (error ignored by django-redis) - search without the lock
+            lock_key = None
+        elif not locked:
+            # Another request is running this search - wait briefly for its result
+            deadline = time.monotonic() + self.LOCK_WAIT
+            while time.monotonic() < deadline:
+                time.sleep(self.LOCK_POLL_INTERVAL)
+                cached_data, is_cached = APICache.get(self.CACHE_ENDPOINT, cache_params, cache_key=cache_key)
+                if is_cached:
+                    return Response({'results': cached_data['data']}, status=status.HTTP_200_OK)
+            lock_key = None
+        
+        try:
+            return self._search(query, max_results, cache_params, cache_key)
+        finally:
+            if lock_key:
+                cache.delete(lock_key)
+    
+    def _search(self, query, max_results, cache_params, cache_key):
+        """Run the channel search against the API and cache successful results"""
         channels = []
         
         try:
@@ -146,53 +204,56 @@ class ChannelSearchAPIView(APIView):
                 part='snippet',
                 q=query,
                 type='channel',
-                maxResults=max_results
+                maxResults=max_results,
+                fields='items(id/channelId,snippet(title,description,customUrl,thumbnails/default/url))'
             ).execute()
             
+            # When type='channel', the id structure is: item['id']['channelId']
+            items = [
+                item for item in search_response.get('items', [])
+                if item.get('id', {}).get('channelId')
+            ]
+            
+            # Subscriber counts for every result in one channels.list call (accepts up to 50 IDs)
+            subscriber_counts = {}
+            if items:
+                try:
+                    stats_response = service.youtube.channels().list(
+                        part='statistics',
+                        id=','.join(item['id']['channelId'] for item in items),
+                        maxResults=50,
+                        fields='items(id,statistics/subscriberCount)'
+                    ).execute()
+                    subscriber_counts = {
+                        stats_item['id']: int(stats_item.get('statistics', {}).get('subscriberCount', 0))
+                        for stats_item in stats_response.get('items', [])
+                    }
+                except Exception as stats_err:
+                    # Log but don't fail - subscriber count is optional
+                    logger.warning(f"Could not get subscriber counts for search results: {stats_err}")
+            
             # Process results
-            for item in search_response.get('items', []):
-                snippet = item.get('snippet', {})
-                # When type='channel', the id structure is: item['id']['channelId']
-                channel_id = item.get('id', {}).get('channelId')
+            for item in items:
+                snippet = item.get('snippet') or {}
+                channel_id = item['id']['channelId']
                 
-                if channel_id:
-                    # Get subscriber count
-                    subscriber_count = 0
-                    try:
-                        stats_response = service.youtube.channels().list(
-                            part='statistics',
-                            id=channel_id
-                        ).execute()
-                        if stats_response.get('items'):
-                            subscriber_count = int(stats_response['items'][0].get('statistics', {}).get('subscriberCount', 0))
-                    except Exception as stats_err:
-                        # Log but don't fail - subscriber count is optional
-                        print(f"Warning: Could not get subscriber count for {channel_id}: {stats_err}")
-                    
-                    custom_url = snippet.get('customUrl', '')
-                    handle_url = None
-                    if custom_url:
-                        # Clean up custom URL (remove @ and youtube.com/ if present)
-                        clean_handle = custom_url.replace('@', '').replace('youtube.com/', '').replace('c/', '')
-                        if clean_handle:
-                            handle_url = f"https://www.youtube.com/@{clean_handle}"
-                    
-                    channels.append({
-                        'channel_id': channel_id,
-                        'channel_name': snippet.get('title', ''),
-                        'description': snippet.get('description', '')[:100] if snippet.get('description') else '',
-                        'thumbnail': snippet.get('thumbnails', {}).get('default', {}).get('url', ''),
-                        'custom_url': custom_url,
-                        'subscriber_count': subscriber_count,
-                        'url': f"https://www.youtube.com/channel/{channel_id}",
-                        'handle_url': handle_url,
-                    })
+                custom_url = snippet.get('customUrl', '')
+                # Clean up custom URL (remove @ and youtube.com/ if present)
+                clean_handle = _HANDLE_CLEAN_RE.sub('', custom_url) if custom_url else ''
+                
+                channels.append({
+                    'channel_id': channel_id,
+                    'channel_name': snippet.get('title', ''),
+                    'description': (snippet.get('description') or '')[:100],
+                    'thumbnail': ((snippet.get('thumbnails') or {}).get('default') or {}).get('url', ''),
+                    'custom_url': custom_url,
+                    'subscriber_count': subscriber_counts.get(channel_id, 0),
+                    'url': f"https://www.youtube.com/channel/{channel_id}",
+                    'handle_url': f"https://www.youtube.com/@{clean_handle}" if clean_handle else None,
+                })
         except Exception as e:
-            # Log the error for debugging
-            import traceback
             error_msg = str(e)
-            print(f"Error in ChannelSearchAPIView: {error_msg}")
-            print(traceback.format_exc())
+            logger.exception(f"Error in ChannelSearchAPIView: {error_msg}")
             # Return error info in response for debugging
             return Response({
                 'results': [],
@@ -200,6 +261,7 @@ class ChannelSearchAPIView(APIView):
                 'debug': 'Check backend logs for details'
             }, status=status.HTTP_200_OK)  # Still return 200 so frontend can handle it
         
+        APICache.set(self.CACHE_ENDPOINT, cache_params, channels, cache_key=cache_key)
         return Response({'results': channels}, status=status.HTTP_200_OK)
 
 
@@ -242,26 +304,27 @@ class InstagramAnalyzerAPIView(APIView):
         errors = []
         
         try:
-            from api.services.instagram_service import InstagramService
-            instagram_service = InstagramService()
+            from api.services.instagram_service import get_instagram_service
+            instagram_service = get_instagram_service()
             
-            for page_url in page_urls:
-                try:
-                    page_data = instagram_service.fetch_page_full_data(
-                        page_url.strip(),
-                        max_posts=5,
-                        max_reels=5,
-                        max_videos=5
-                    )
-                    results.append(page_data)
-                except Exception as e:
-                    error_str = str(e)
+            # Pages are scraped concurrently; each entry is page data or the exception raised
+            page_results = instagram_service.fetch_pages_full_data(
+                [page_url.strip() for page_url in page_urls],
+                max_posts=5,
+                max_reels=5,
+                max_videos=5
+            )
+            for page_url, page_data in zip(page_urls, page_results):
+                if isinstance(page_data, Exception):
                     errors.append({
                         'page_url': page_url,
-                        'error': error_str
+                        'error': str(page_data)
                     })
+                else:
+                    results.append(page_data)
         
         except Exception as e:
+            logger.exception(f"Error in InstagramAnalyzerAPIView: {e}")
             return Response(
                 {'error': f'Service error: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -298,105 +361,114 @@ class InstagramPageSearchAPIView(APIView):
         max_results = min(int(request.GET.get('max_results', 10)), 20)  # Max 20 results
         
         try:
-            from api.services.instagram_service import InstagramService
-            from bs4 import BeautifulSoup
-            import json
-            import re
+            from api.services.instagram_service import get_instagram_service
             
-            instagram_service = InstagramService()
-            pages = []
+            instagram_service = get_instagram_service()
             
-            # Method 1: Try Instagram's internal search API (may require auth)
-            try:
-                # Instagram search endpoint - requires authentication now
-                search_url = f"https://www.instagram.com/web/search/topsearch/?query={query}"
-                # Use the session from the service which has proper headers
-                response = instagram_service.session.get(search_url, timeout=10)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    # Parse users from search results
-                    users = data.get('users', [])
-                    for user_item in users[:max_results]:
-                        user = user_item.get('user', {})
-                        username = user.get('username', '')
-                        full_name = user.get('full_name', '')
-                        profile_pic_url = user.get('profile_pic_url', '')
-                        follower_count = user.get('follower_count', 0)
-                        is_verified = user.get('is_verified', False)
-                        
-                        if username:
-                            pages.append({
-                                'username': username,
-                                'full_name': full_name or username,
-                                'profile_picture': profile_pic_url,
-                                'follower_count': follower_count,
-                                'is_verified': is_verified,
-                                'url': f"https://www.instagram.com/{username}/",
-                                'handle_url': f"https://www.instagram.com/{username}/",
-                            })
-            
-            except Exception as e:
-                print(f"Instagram search API error (likely requires auth): {e}")
-            
-            # Method 2: Use InstagramService's get_page_info method (better extraction)
-            # If query looks like a username, use the service method which has better parsing
-            if not pages and re.match(r'^[a-zA-Z0-9_.]+$', query) and len(query) > 2:
-                try:
-                    page_info = instagram_service.get_page_info(query)
-                    if page_info:
-                        pages.append({
-                            'username': page_info.get('username', query),
-                            'full_name': page_info.get('full_name', query),
-                            'profile_picture': page_info.get('profile_picture', ''),
-                            'follower_count': page_info.get('follower_count', 0),
-                            'is_verified': page_info.get('is_verified', False),
-                            'url': f"https://www.instagram.com/{query}/",
-                            'handle_url': f"https://www.instagram.com/{query}/",
-                        })
-                except Exception as e:
-                    print(f"Error fetching page info for {query}: {e}")
-                    
-                    # Fallback: Simple validation - just check if page exists
-                    try:
-                        username_url = f"https://www.instagram.com/{query}/"
-                        response = instagram_service.session.get(username_url, timeout=5)
-                        
-                        if response.status_code == 200 and 'login' not in response.url.lower():
-                            # Page exists, create basic entry
-                            soup = BeautifulSoup(response.text, 'html.parser')
-                            title = soup.find('title')
-                            full_name = query
-                            
-                            if title and title.string:
-                                title_text = title.string
-                                if '@' in title_text:
-                                    full_name = title_text.split('@')[0].strip().replace(' • Instagram', '').strip()
-                                elif '•' in title_text:
-                                    full_name = title_text.split('•')[0].strip()
-                            
-                            pages.append({
-                                'username': query,
-                                'full_name': full_name,
-                                'profile_picture': '',
-                                'follower_count': 0,
-                                'is_verified': False,
-                                'url': f"https://www.instagram.com/{query}/",
-                                'handle_url': f"https://www.instagram.com/{query}/",
-                            })
-                    except:
-                        pass
+            # Method 1 (topsearch); the direct username lookup (Method 2) scrapes a whole
+            # profile, so it only runs when topsearch finds nothing
+            pages = self._topsearch(instagram_service, query, max_results)
+            if not pages and _USERNAME_RE.match(query) and len(query) > 2:
+                pages = self._lookup_username(instagram_service, query)
             
             return Response({
                 'query': query,
                 'results': pages[:max_results],
                 'total_results': len(pages)
             }, status=status.HTTP_200_OK)
-            
+        
         except Exception as e:
+            logger.exception(f"Error in InstagramPageSearchAPIView: {e}")
             return Response(
                 {'error': f'Search error: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+    
+    @staticmethod
+    def _topsearch(instagram_service, query, max_results):
+        """Method 1: Try Instagram's internal search API (may require auth)"""
+        pages = []
+        try:
+            # Instagram search endpoint - requires authentication now
+            search_url = f"https://www.instagram.com/web/search/topsearch/?query={query}"
+            # Use the session from the service which has proper headers
+            response = instagram_service.session.get(search_url, timeout=10)
+            
+            if response.status_code == 200:
+                data = response.json()
+                
+                # Parse users from search results
+                users = data.get('users', [])
+                for user_item in users[:max_results]:
+                    user = user_item.get('user', {})
+                    username = user.get('username', '')
+                    full_name = user.get('full_name', '')
+                    profile_pic_url = user.get('profile_pic_url', '')
+                    follower_count = user.get('follower_count', 0)
+                    is_verified = user.get('is_verified', False)
+                    
+                    if username:
+                        pages.append({
+                            'username': username,
+                            'full_name': full_name or username,
+                            'profile_picture': profile_pic_url,
+                            'follower_count': follower_count,
+                            'is_verified': is_verified,
+                            'url': f"https://www.instagram.com/{username}/",
+                            'handle_url': f"https://www.instagram.com/{username}/",
+                        })
+        
+        except Exception as e:
+            logger.warning(f"Instagram search API error (likely requires auth): {e}")
+        return pages
+    
+    @staticmethod
+    def _lookup_username(instagram_service, query):
+        """Method 2: Use InstagramService's get_page_info method (better extraction)"""
+        pages = []
+        try:
+            # Interactive lookup: skip the pacing delay used for batch scrapes
+            page_info = instagram_service.get_page_info(query, delay=False)
+            if page_info:
+                pages.append({
+                    'username': page_info.get('username', query),
+                    'full_name': page_info.get('full_name', query),
+                    'profile_picture': page_info.get('profile_picture', ''),
+                    'follower_count': page_info.get('follower_count', 0),
+                    'is_verified': page_info.get('is_verified', False),
+                    'url': f"https://www.instagram.com/{query}/",
+                    'handle_url': f"https://www.instagram.com/{query}/",
+                })
+        except Exception as e:
+            logger.warning(f"Error fetching page info for {query}: {e}")
+            
+            # Fallback: Simple validation - just check if page exists
+            try:
+                username_url = f"https://www.instagram.com/{query}/"
+                response = instagram_service.session.get(username_url, timeout=5)
+                
+                if response.status_code == 200 and 'login' not in response.url.lower():
+                    # Page exists, create basic entry
+                    title = _TITLE_RE.search(response.content)
+                    full_name = query
+                    
+                    if title:
+                        title_text = html.unescape(title.group(1).decode('utf-8', 'ignore'))
+                        if '@' in title_text:
+                            full_name = title_text.split('@')[0].strip().replace(' • Instagram', '').strip()
+                        elif '•' in title_text:
+                            full_name = title_text.split('•')[0].strip()
+                    
+                    pages.append({
+                        'username': query,
+                        'full_name': full_name,
+                        'profile_picture': '',
+                        'follower_count': 0,
+                        'is_verified': False,
+                        'url': f"https://www.instagram.com/{query}/",
+                        'handle_url': f"https://www.instagram.com/{query}/",
+                    })
+            except:
+                pass
+        return pages
 
@@ -0,0 +1,23 @@
+"""
+Gunicorn settings for social_trends_backend; picked up when gunicorn is run
+from the backend directory.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+wsgi_app = 'social_trends_backend.wsgi:application'
+
+
+def post_worker_init(worker):
+    """
+    Open the worker's cache connection before it accepts requests, so its first
+    requests do not pay for the connect (and TCP/Redis handshake) themselves.
+    """
+    from django.core.cache import cache
+
+    try:
+        cache.get('__warmup__')
+    except Exception as e:
+        # The cache is optional for serving; the worker connects on demand later
+        logger.warning(f"Cache warm-up failed in worker {worker.pid}: {e}")
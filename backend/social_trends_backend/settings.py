@@ -4,14 +4,19 @@ Django settings for social_trends_backend project.
 
 from pathlib import Path
 import os
+import socket
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Load environment variables from backend/.env (development). Where the
+# environment is injected by the host, set DJANGO_LOAD_DOTENV=0 to skip it;
+# variables already set in the environment always win.
+DOTENV_PATH = BASE_DIR / '.env'
+if os.getenv('DJANGO_LOAD_DOTENV', '1') == '1' and DOTENV_PATH.exists():
+    load_dotenv(DOTENV_PATH, override=False)
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
@@ -20,35 +25,50 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'django-insecure-dev-key-change-in-production'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Development (admin, sessions, any host and CORS origin) is opt-in: DJANGO_DEBUG=1
+DEBUG = os.getenv('DJANGO_DEBUG', '0') == '1'
 
-ALLOWED_HOSTS = ['localhost', '127.0.0.1', '*']  # '*' for development only
+# Any host in development; otherwise the comma-separated ALLOWED_HOSTS env var
+ALLOWED_HOSTS = ('*',) if DEBUG else tuple(
+    host.strip() for host in os.getenv('ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',') if host.strip()
+)
 
 
 # Application definition
 
-INSTALLED_APPS = [
-    'django.contrib.admin',
+INSTALLED_APPS = (
     'django.contrib.auth',
     'django.contrib.contenttypes',
-    'django.contrib.sessions',
-    'django.contrib.messages',
-    'django.contrib.staticfiles',
     'rest_framework',
     'corsheaders',
     'api',
-]
+)
 
-MIDDLEWARE = [
+MIDDLEWARE = (
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    # Compress JSON responses; ETag + If-None-Match handling (304) sits inside it
+    'django.middleware.gzip.GZipMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
-]
+)
+
+# The API is stateless JSON; sessions, CSRF, auth, messages and clickjacking
+# protection only serve the admin, which is enabled in development only
+if DEBUG:
+    INSTALLED_APPS += (
+        'django.contrib.admin',
+        'django.contrib.sessions',
+        'django.contrib.messages',
+        'django.contrib.staticfiles',
+    )
+    MIDDLEWARE += (
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.middleware.csrf.CsrfViewMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+        'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    )
 
 ROOT_URLCONF = 'social_trends_backend.urls'
 
@@ -61,13 +81,18 @@ TEMPLATES = [
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
-                'django.contrib.auth.context_processors.auth',
-                'django.contrib.messages.context_processors.messages',
             ],
         },
     },
 ]
 
+# The admin's templates need the auth and messages context (messages is only installed with it)
+if DEBUG:
+    TEMPLATES[0]['OPTIONS']['context_processors'] += [
+        'django.contrib.auth.context_processors.auth',
+        'django.contrib.messages.context_processors.messages',
+    ]
+
 WSGI_APPLICATION = 'social_trends_backend.wsgi.application'
 
 
@@ -76,11 +101,23 @@ WSGI_APPLICATION = 'social_trends_backend.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # Django's SQLite backend, with transactions started as BEGIN IMMEDIATE
+        'ENGINE': 'api.db_backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 }
 
+# Applied to every SQLite connection (api.apps). WAL lets reads run alongside a write
+# and, with synchronous=NORMAL, commits skip the fsync - this matters most for the
+# database cache fallback, which writes cache_table on every cache set.
+SQLITE_PRAGMAS = (
+    'journal_mode=WAL',
+    'synchronous=NORMAL',
+    'cache_size=-20000',  # 20 MB page cache
+    'mmap_size=268435456',  # 256 MB memory-mapped I/O
+    'temp_store=MEMORY',
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -126,30 +163,32 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'api.renderers.ORJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
     ],
+    # Public, unauthenticated API: skip DRF's per-request session/basic auth lookups
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'UNAUTHENTICATED_USER': None,
 }
 
 # CORS settings
 # For development: Allow all origins to avoid CORS issues
-CORS_ALLOW_ALL_ORIGINS = True
+CORS_ALLOW_ALL_ORIGINS = DEBUG
 CORS_ALLOW_CREDENTIALS = True
 
-# Also specify allowed origins (for production/reference)
-CORS_ALLOWED_ORIGINS = [
+# Allowed origins when DEBUG is off; deployed frontends are added through
+# CORS_EXTRA_ORIGINS (comma-separated)
+CORS_ALLOWED_ORIGINS = (
     "http://localhost:3000",
     "http://127.0.0.1:3000",
     "http://localhost:5173",  # Vite default port
     "http://127.0.0.1:5173",
-]
-
-# Allow CORS from any origin in development (since CORS_ALLOW_ALL_ORIGINS = True, this is redundant but kept for reference)
+) + tuple(origin.strip() for origin in os.getenv('CORS_EXTRA_ORIGINS', '').split(',') if origin.strip())
 
 # Additional CORS headers
-CORS_ALLOW_HEADERS = [
+CORS_ALLOW_HEADERS = (
     'accept',
     'accept-encoding',
     'authorization',
@@ -159,50 +198,98 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
-]
+)
+
+# Logging: service modules log per-page/per-call progress at INFO and per-video
+# detail at DEBUG. Raise API_LOG_LEVEL to DEBUG when troubleshooting.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        # Records are written to stderr from a background thread (api.utils.log_handlers)
+        'console': {
+            'class': 'api.utils.log_handlers.QueueStreamHandler',
+        },
+    },
+    'loggers': {
+        'api': {
+            'handlers': ['console'],
+            'level': os.getenv('API_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
 
 # YouTube API Key (set in .env file)
 YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY', '')
 
 # Caching configuration
-# Use Redis if available, otherwise fall back to database cache
-REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/1')
-
-CACHES = {
-    'default': {
-        'BACKEND': 'django_redis.cache.RedisCache',
-        'LOCATION': REDIS_URL,
-        'OPTIONS': {
-            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
-            'SOCKET_CONNECT_TIMEOUT': 5,
-            'SOCKET_TIMEOUT': 5,
-            'CONNECTION_POOL_KWARGS': {
-                'retry_on_timeout': True,
-                'health_check_interval': 30
+# Redis when REDIS_URL is set, otherwise the database cache (python manage.py createcachetable).
+# Nothing is probed at import; django-redis turns Redis outages into cache misses.
+REDIS_URL = os.getenv('REDIS_URL', '')
+# Redis on the same host: connect over its Unix socket, skipping the loopback TCP stack
+REDIS_SOCKET = os.getenv('REDIS_SOCKET', '')
+if REDIS_SOCKET:
+    REDIS_URL = f"unix://{REDIS_SOCKET}?db={os.getenv('REDIS_DB', '1')}"
+
+if REDIS_URL:
+    from redis.backoff import ExponentialBackoff
+    from redis.retry import Retry
+    
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_URL,
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+                # The cache is optional: fail fast on a stalled Redis and fall back
+                # to a miss (IGNORE_EXCEPTIONS) instead of holding request threads
+                'SOCKET_CONNECT_TIMEOUT': 2,
+                'SOCKET_TIMEOUT': 1,
+                # Bounded pool: when all connections are busy, callers wait for one
+                # (up to 'timeout' seconds) instead of opening more
+                'CONNECTION_POOL_CLASS': 'redis.connection.BlockingConnectionPool',
+                'CONNECTION_POOL_KWARGS': {
+                    'max_connections': 50,
+                    'timeout': 20,
+                    'retry_on_timeout': True,
+                    # One quick retry on connection errors/timeouts
+                    'retry': Retry(ExponentialBackoff(cap=0.1, base=0.01), 1),
+                    'health_check_interval': 30
+                },
+                'SERIALIZER': 'api.utils.cache_serializers.ORJSONSerializer',  # orjson, pickle for the rest
+                'COMPRESSOR': 'api.utils.cache_compressors.ZstdCompressor',  # zstd, reads old zlib values
+                # Optional zstd dictionary trained on cached values (manage.py train_cache_dict)
+                'ZSTD_DICT': os.getenv('CACHE_ZSTD_DICT', ''),
+                'IGNORE_EXCEPTIONS': True,  # Gracefully handle Redis failures
             },
-            'COMPRESSOR': 'django_redis.compressors.zlib.ZlibCompressor',
-            'IGNORE_EXCEPTIONS': True,  # Gracefully handle Redis failures
-        },
-        'KEY_PREFIX': 'social_trends',
-        'TIMEOUT': None,  # Default timeout (use TTL in cache calls)
+            'KEY_PREFIX': 'social_trends',
+            'TIMEOUT': None,  # Default timeout (use TTL in cache calls)
+        }
     }
-}
-
-# Fallback to database cache if Redis is not available
-# This will automatically fall back if Redis connection fails
-try:
-    import redis
-    r = redis.from_url(REDIS_URL, socket_connect_timeout=1)
-    r.ping()
-    print("✅ Redis cache enabled")
-except:
-    print("⚠️ Redis not available, using database cache fallback")
-    CACHES['default'] = {
-        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
-        'LOCATION': 'cache_table',
-        'TIMEOUT': None,
+    if not REDIS_SOCKET:
+        # TCP keepalive so idle pooled connections are kept alive instead of being
+        # dropped by middleboxes (redis-py already sets TCP_NODELAY itself).
+        # Not every platform has all three options (macOS lacks TCP_KEEPIDLE).
+        CACHES['default']['OPTIONS']['CONNECTION_POOL_KWARGS'].update({
+            'socket_keepalive': True,
+            'socket_keepalive_options': {
+                getattr(socket, name): value
+                for name, value in (('TCP_KEEPIDLE', 60), ('TCP_KEEPINTVL', 30), ('TCP_KEEPCNT', 3))
+                if hasattr(socket, name)
+            },
+        })
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'cache_table',
+            'TIMEOUT': None,
+        }
     }
 
+DJANGO_REDIS_IGNORE_EXCEPTIONS = True
+DJANGO_REDIS_LOG_IGNORED_EXCEPTIONS = True
+
 # YouTube API Quota Configuration
 YOUTUBE_QUOTA_LIMIT = int(os.getenv('YOUTUBE_QUOTA_LIMIT', '10000'))  # Daily quota limit
 YOUTUBE_QUOTA_WARNING_THRESHOLD = int(os.getenv('YOUTUBE_QUOTA_WARNING_THRESHOLD', '8000'))  # Warn at 80%
@@ -210,17 +297,44 @@ YOUTUBE_QUOTA_RESET_TIME = os.getenv('YOUTUBE_QUOTA_RESET_TIME', '00:00:00')  #
 
 # Cache TTL Configuration (in seconds)
 CACHE_TTL = {
-    'channel_videos': 86400,  # 24 hours (increased to save quota)
-    'video_statistics': 86400,  # 24 hours (increased to save quota)
-    'channel_info': 86400,  # 24 hours - channel info rarely changes
+    'channel_videos': 600,  # 10 minutes fresh
+    'channel_videos_live': 300,  # 5 minutes when the channel has a live stream
+    'video_statistics': 300,  # 5 minutes - view counts move quickly
+    'video_statistics_realtime': 60,  # 1 minute max age for real-time refreshes
+    'channel_info': 3600,  # 1 hour - channel info rarely changes
     'trending_videos': 300,  # 5 minutes (reduced cache for trending)
     'live_videos': 60,  # 1 minute (short cache for live)
-    'playlist_items': 86400,  # 24 hours (increased to save quota)
+    'playlist_items': 600,  # 10 minutes
+    'channel_id': 86400,  # 24 hours - handle/username to channel ID mappings
+    'channel_search': 120,  # 2 minutes - autocomplete search results
+}
+
+# Stale-while-revalidate window (in seconds)
+# Entries older than CACHE_TTL but younger than this are served immediately
+# while a background refresh repopulates the cache
+CACHE_STALE_TTL = {
+    'channel_videos': 1800,  # 30 minutes
+    'video_statistics': 900,  # 15 minutes
+    'channel_info': 21600,  # 6 hours
+    # Short-TTL entries keep a wide stale window (10x TTL) so requests rarely wait on a cold fetch
+    'trending_videos': 3000,  # 50 minutes
+    'live_videos': 600,  # 10 minutes
+    'playlist_items': 1800,  # 30 minutes
 }
 
+# Worker threads used to refresh stale cache entries in the background
+CACHE_REFRESH_WORKERS = int(os.getenv('CACHE_REFRESH_WORKERS', '4'))
+
 # Use web scraping as fallback when quota exceeded
 USE_WEB_SCRAPING_FALLBACK = True
 
+# On-disk HTTP cache for scraped YouTube pages (used when requests-cache is installed).
+# Watch pages are never cached: they are only read as far as the stats fields.
+SCRAPER_HTTP_CACHE = os.getenv('SCRAPER_HTTP_CACHE', str(BASE_DIR / 'yt_scraper_cache'))
+SCRAPER_HTTP_CACHE_TTL = {
+    '*': 21600,  # 6 hours - channel and handle pages
+}
+
 # Disable expensive Search API by default (saves 100 units per channel)
 # Set to True to enable Search API, but it costs 100 quota units per channel
 USE_SEARCH_API = False  # Disabled by default to save quota
@@ -1,21 +1,29 @@
 """
 URL configuration for social_trends_backend project.
 """
-from django.contrib import admin
+from django.conf import settings
 from django.urls import path, include
-from django.http import JsonResponse
+from django.http import HttpResponse
+import json
+
+# The health check payload never changes; serialize it once
+HEALTH_CHECK_BODY = json.dumps({
+    'status': 'ok',
+    'project': 'social_trends_backend',
+    'message': 'API is running correctly'
+}).encode()
 
 def health_check(request):
     """Simple health check endpoint"""
-    return JsonResponse({
-        'status': 'ok',
-        'project': 'social_trends_backend',
-        'message': 'API is running correctly'
-    })
+    return HttpResponse(HEALTH_CHECK_BODY, content_type='application/json')
 
 urlpatterns = [
     path('', health_check, name='health-check'),
-    path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
 ]
 
+# Admin is only installed in development (see settings.INSTALLED_APPS)
+if settings.DEBUG:
+    from django.contrib import admin
+    urlpatterns.append(path('admin/', admin.site.urls))
+
@@ -13,5 +13,22 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'social_trends_backend.settings')
 
-application = get_wsgi_application()
+django_application = get_wsgi_application()
+
+# Load balancer / liveness probes are answered here, before Django's middleware
+# and URL resolver ever see them
+HEALTH_CHECK_PATH = '/healthz'
+HEALTH_CHECK_BODY = b'{"status":"ok"}'
+HEALTH_CHECK_HEADERS = [
+    ('Content-Type', 'application/json'),
+    ('Content-Length', str(len(HEALTH_CHECK_BODY))),
+    ('Cache-Control', 'no-store'),
+]
+
+
+def application(environ, start_response):
+    if environ.get('PATH_INFO') == HEALTH_CHECK_PATH:
+        start_response('200 OK', HEALTH_CHECK_HEADERS)
+        return [HEALTH_CHECK_BODY]
+    return django_application(environ, start_response)
 